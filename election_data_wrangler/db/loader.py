@@ -0,0 +1,380 @@
+"""Defines a bulk loader of election results into the db
+
+The rows of many states, or years, are streamed into temporary staging tables with COPY FROM
+STDIN, then moved into elections, state_election_results and district_election_results by one
+set-based statement per table, rather than by statements per row. The statements are upserts on
+the tables' unique keys, created by create_unique_indexes, so results already in the db are
+updated if they changed.
+
+Rows written are counted from what the statements return rather than by counting the tables'
+rows before and after, and are reported by a LoadReport.
+"""
+
+import io
+import json
+from collections import OrderedDict
+
+# Columns of the staging tables. A state's results are keyed by state and year until they're
+# merged and have an election_id
+STATE_STAGING_COLUMNS = ['state', 'year', 'votes_dem', 'votes_rep', 'votes_other', 'votes_total', 'votes_wasted_dem',
+    'votes_wasted_rep', 'votes_wasted_net', 'efficiency_gap', 'mean_median', 'partisan_bias', 'declination']
+
+DISTRICT_STAGING_COLUMNS = ['state', 'year', 'number', 'votes_dem', 'votes_rep', 'votes_other', 'votes_total',
+    'votes_wasted_dem', 'votes_wasted_rep', 'votes_wasted_net']
+
+CREATE_STAGING_TABLES = """
+    create temporary table if not exists staging_state_election_results (
+        state               char(2)         not null,
+        year                smallint        not null,
+        votes_dem           int             not null,
+        votes_rep           int             not null,
+        votes_other         int             not null,
+        votes_total         int             not null,
+        votes_wasted_dem    int             not null,
+        votes_wasted_rep    int             not null,
+        votes_wasted_net    int             not null,
+        efficiency_gap      numeric(3,3)    not null,
+        mean_median         numeric(4,3),
+        partisan_bias       numeric(4,3),
+        declination         numeric(4,3)
+    ) on commit delete rows;
+
+    create temporary table if not exists staging_district_election_results (
+        state               char(2)         not null,
+        year                smallint        not null,
+        number              smallint        not null,
+        votes_dem           int             not null,
+        votes_rep           int             not null,
+        votes_other         int             not null,
+        votes_total         int             not null,
+        votes_wasted_dem    int             not null,
+        votes_wasted_rep    int             not null,
+        votes_wasted_net    int             not null
+    ) on commit delete rows;
+"""
+
+# The unique keys the merges conflict on
+CREATE_UNIQUE_INDEXES = """
+    create unique index if not exists states_iso_a2_key on states (iso_a2);
+    create unique index if not exists elections_state_year_key on elections (state, year);
+    create unique index if not exists district_election_results_election_id_number_key
+        on district_election_results (election_id, number);
+"""
+
+# Statements deleting the rows duplicated in tables created before the unique indexes, keeping
+# the rows with the lowest ids, and what they delete. Results of duplicate elections are
+# deleted before the elections
+DEDUPLICATE_STATEMENTS = [
+    ('states', """
+        delete from states a using states b
+        where a.iso_a2 = b.iso_a2 and a.state_id > b.state_id;
+    """),
+    ('district results of duplicate elections', """
+        delete from district_election_results d
+        using elections a, elections b
+        where d.election_id = a.election_id
+            and a.state = b.state and a.year = b.year and a.election_id > b.election_id;
+    """),
+    ('state results of duplicate elections', """
+        delete from state_election_results r
+        using elections a, elections b
+        where r.election_id = a.election_id
+            and a.state = b.state and a.year = b.year and a.election_id > b.election_id;
+    """),
+    ('elections', """
+        delete from elections a using elections b
+        where a.state = b.state and a.year = b.year and a.election_id > b.election_id;
+    """),
+    ('district results', """
+        delete from district_election_results a using district_election_results b
+        where a.election_id = b.election_id and a.number = b.number
+            and a.district_election_results_id > b.district_election_results_id;
+    """)
+]
+
+LOAD_REPORT_TABLES = ['elections', 'state_election_results', 'district_election_results']
+
+# Skipped rows were staged but neither inserted nor updated, e.g. elections already in the db or
+# results that didn't change
+LOAD_REPORT_COUNTS = ['staged', 'inserted', 'updated', 'skipped', 'deleted']
+
+# Returns the number of elections inserted
+MERGE_ELECTIONS = """
+    with inserted as (
+        insert into elections (state, year)
+        select distinct s.state, s.year
+        from staging_state_election_results s
+        on conflict (state, year) do nothing
+        returning 1
+    )
+    select count(*) from inserted;
+"""
+
+# Deletes the districts of the staged elections that aren't staged, e.g. districts that were
+# merged into others by a correction
+DELETE_UNSTAGED_DISTRICTS = """
+    delete from district_election_results d
+    using elections e, staging_state_election_results s
+    where d.election_id = e.election_id and e.state = s.state and e.year = s.year
+        and not exists (
+            select 1 from staging_district_election_results sd
+            where sd.state = s.state and sd.year = s.year and sd.number = d.number
+        );
+"""
+
+
+# Delete the results and elections of states of a year, e.g. states no longer in its results
+# file. Results are deleted before the elections they reference
+DELETE_STATES = [
+    ('district_election_results', """
+        delete from district_election_results d using elections e
+        where d.election_id = e.election_id and e.year = %s and e.state in %s;
+    """),
+    ('state_election_results', """
+        delete from state_election_results r using elections e
+        where r.election_id = e.election_id and e.year = %s and e.state in %s;
+    """),
+    ('elections', """
+        delete from elections where year = %s and state in %s;
+    """)
+]
+
+
+def upsert_statement(table, staging_table, columns, conflict_columns):
+    """Returns an insert of a staging table's rows into table, joined to their election_id, that
+        updates the rows whose conflict_columns already exist if any of their other columns
+        changed. Rows that didn't change aren't written. It returns the number of rows inserted
+        and updated, telling them apart by xmax, which is 0 for inserted rows.
+    """
+    updated_columns = [column for column in columns if column not in conflict_columns]
+
+    return """
+        with upserted as (
+            insert into {table} as t (election_id, {columns})
+            select e.election_id, {staged_columns}
+            from {staging_table} s
+            join elections e on e.state = s.state and e.year = s.year
+            on conflict ({conflict_columns}) do update set {updates}
+            where ({current_columns}) is distinct from ({excluded_columns})
+            returning (xmax = 0) as inserted
+        )
+        select count(*) filter (where inserted), count(*) filter (where not inserted) from upserted;
+    """.format(
+        table=table,
+        staging_table=staging_table,
+        columns=', '.join(columns),
+        staged_columns=', '.join('s.' + column for column in columns),
+        conflict_columns=', '.join(conflict_columns),
+        updates=', '.join('{0} = excluded.{0}'.format(column) for column in updated_columns),
+        current_columns=', '.join('t.' + column for column in updated_columns),
+        excluded_columns=', '.join('excluded.' + column for column in updated_columns)
+    )
+
+
+MERGE_STATE_ELECTION_RESULTS = upsert_statement('state_election_results', 'staging_state_election_results',
+    STATE_STAGING_COLUMNS[2:], ['election_id'])
+
+MERGE_DISTRICT_ELECTION_RESULTS = upsert_statement('district_election_results', 'staging_district_election_results',
+    DISTRICT_STAGING_COLUMNS[2:], ['election_id', 'number'])
+
+
+class LoadReport:
+    """Counts the rows a load wrote per table and the time it took
+
+    Staged rows that didn't change aren't written, so a reload of unchanged results counts them
+    all as skipped.
+
+    Attributes:
+        counts (OrderedDict) - LOAD_REPORT_TABLES to OrderedDicts of LOAD_REPORT_COUNTS
+        seconds (Float) - Duration of the load
+    """
+
+    __slots__ = ('counts', 'seconds')
+
+    def __init__(self):
+        self.counts = OrderedDict(
+            (table, OrderedDict((count, 0) for count in LOAD_REPORT_COUNTS)) for table in LOAD_REPORT_TABLES
+        )
+        self.seconds = 0
+
+    def count(self, table, staged, inserted, updated=0, deleted=0):
+        counts = self.counts[table]
+        counts['staged'] += staged
+        counts['inserted'] += inserted
+        counts['updated'] += updated
+        counts['skipped'] += staged - inserted - updated
+        counts['deleted'] += deleted
+
+    def add(self, report):
+        """Adds the counts and duration of another LoadReport, e.g. of another batch
+        """
+        for table in LOAD_REPORT_TABLES:
+            for count in LOAD_REPORT_COUNTS:
+                self.counts[table][count] += report.counts[table][count]
+
+        self.seconds += report.seconds
+
+    def rows_written(self):
+        return sum(c['inserted'] + c['updated'] + c['deleted'] for c in self.counts.values())
+
+    def rows_per_second(self):
+        return self.rows_written() / self.seconds if self.seconds > 0 else None
+
+    def as_dict(self):
+        return OrderedDict([
+            ('tables', self.counts),
+            ('rows_written', self.rows_written()),
+            ('seconds', self.seconds),
+            ('rows_per_second', self.rows_per_second())
+        ])
+
+    def print_summary(self):
+        for table, counts in self.counts.items():
+            print('{}: {} inserted, {} updated, {} skipped, {} deleted'.format(
+                table, counts['inserted'], counts['updated'], counts['skipped'], counts['deleted']))
+
+        print('Wrote {} rows in {:.2f}s{}'.format(
+            self.rows_written(),
+            self.seconds,
+            '' if self.rows_per_second() is None else ' ({:.0f} rows/s)'.format(self.rows_per_second())
+        ))
+
+    def write(self, filepath):
+        with open(filepath, 'w') as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+
+def state_row(sr):
+    """Returns the staging row of a StateElectionResults
+    """
+    return (sr.state, int(sr.year), sr.votes_total_dem, sr.votes_total_rep, sr.votes_total_other, sr.votes_total,
+        sr.votes_wasted_total_dem, sr.votes_wasted_total_rep, sr.votes_wasted_net, sr.efficiency_gap,
+        sr.mean_median, sr.partisan_bias, sr.declination)
+
+
+def district_rows(sr):
+    """Returns the staging rows of the districts of a StateElectionResults
+    """
+    return [
+        (sr.state, int(sr.year), int(dr.district), dr.votes_dem, dr.votes_rep, dr.votes_other, dr.votes_total,
+            dr.votes_wasted_dem, dr.votes_wasted_rep, dr.votes_wasted_net)
+        for dr in sr.districts_won_dem + sr.districts_won_rep
+    ]
+
+
+def copy_text(rows):
+    """Returns rows in the text format of COPY: tab-separated values, one row per line, with
+        None as \\N. Values are numbers or state abbreviations, so none need escaping.
+    """
+    return ''.join(
+        '\t'.join('\\N' if value is None else str(value) for value in row) + '\n'
+        for row in rows
+    )
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Streams rows into a table with COPY FROM STDIN
+    """
+    cursor.copy_expert(
+        'copy {} ({}) from stdin'.format(table, ', '.join(columns)),
+        io.StringIO(copy_text(rows))
+    )
+
+
+def deduplicate_tables(cursor):
+    """Deletes the duplicate rows of tables created before the unique indexes, printing how many
+        rows each statement deleted. Doesn't commit
+    """
+    print('WARNING: Deleting duplicate rows, keeping the rows with the lowest ids...')
+
+    for description, statement in DEDUPLICATE_STATEMENTS:
+        cursor.execute(statement)
+        print('Deleted {} duplicate {}'.format(cursor.rowcount, description))
+
+
+def create_unique_indexes(cursor, deduplicate=False):
+    """Creates the unique indexes the merges conflict on. Tables created before them may have
+        duplicate rows, which make creating them fail with an IntegrityError unless deduplicate
+        is set and they're deleted first. See deduplicate_tables. Doesn't commit
+    """
+    if deduplicate:
+        deduplicate_tables(cursor)
+
+    cursor.execute(CREATE_UNIQUE_INDEXES)
+
+
+def load_state_results(cursor, state_results, replace=False):
+    """Loads StateElectionResults, of one or many years, with one COPY per staging table and one
+        merge per table. Doesn't commit.
+
+    Attributes:
+        cursor (cursor) - psycopg2 cursor
+        state_results (Iterable) - StateElectionResults
+        replace (Bool) - Option indicating districts of the same states and years that aren't
+            in state_results are deleted. Existing results are updated either way
+
+    Returns a LoadReport of the rows written. Its duration isn't set
+    """
+    report = LoadReport()
+    states = []
+    districts = []
+
+    for sr in state_results:
+        states.append(state_row(sr))
+        districts += district_rows(sr)
+
+    if len(states) == 0:
+        return report
+
+    cursor.execute(CREATE_STAGING_TABLES)
+    copy_rows(cursor, 'staging_state_election_results', STATE_STAGING_COLUMNS, states)
+    copy_rows(cursor, 'staging_district_election_results', DISTRICT_STAGING_COLUMNS, districts)
+
+    cursor.execute(MERGE_ELECTIONS)
+    report.count('elections', len(set(row[:2] for row in states)), cursor.fetchone()[0])
+
+    deleted = 0
+    if replace:
+        cursor.execute(DELETE_UNSTAGED_DISTRICTS)
+        deleted = cursor.rowcount
+
+    cursor.execute(MERGE_STATE_ELECTION_RESULTS)
+    report.count('state_election_results', len(states), *cursor.fetchone())
+
+    cursor.execute(MERGE_DISTRICT_ELECTION_RESULTS)
+    report.count('district_election_results', len(districts), *cursor.fetchone(), deleted=deleted)
+
+    # Staged rows are deleted on commit, but the staging tables may be reused before then
+    cursor.execute('truncate staging_state_election_results, staging_district_election_results;')
+
+    return report
+
+
+def delete_states(cursor, year, states):
+    """Deletes the results and elections of states of a year. Doesn't commit
+
+    Returns a LoadReport of the rows deleted. Its duration isn't set
+    """
+    report = LoadReport()
+
+    if len(states) == 0:
+        return report
+
+    for table, statement in DELETE_STATES:
+        cursor.execute(statement, (int(year), tuple(states)))
+        report.count(table, 0, 0, deleted=cursor.rowcount)
+
+    return report
+
+
+def rollback(db_connection):
+    """Rolls back the connection's transaction unless the connection broke. Errors rolling back
+        are ignored so they don't hide the error that failed the transaction
+    """
+    if db_connection.closed:
+        return
+
+    try:
+        db_connection.rollback()
+    except Exception:
+        pass
@@ -0,0 +1,104 @@
+"""Defines a loader of many years of results into the db over a pool of connections
+
+Each year is bulk loaded by load_state_results in its own transaction on a connection of the
+pool, with up to jobs years loading at once. Years don't share elections or results rows, so
+they rarely conflict, but a year whose transaction fails with a serialization failure or a
+deadlock is rolled back and retried after a backoff that doubles with each attempt.
+
+A year that fails otherwise, or runs out of retries, stops the load. Years already committed
+stay in the db.
+"""
+
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from db.loader import load_state_results, rollback, LoadReport
+
+# SQLSTATEs of serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = ['40001', '40P01']
+
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.1       # seconds before the first retry
+
+
+def connection_pool(jobs, **connect_kwargs):
+    """Returns a psycopg2 ThreadedConnectionPool of up to jobs connections, opened with
+        connect_kwargs as they're needed
+    """
+    # Only imported when loading in parallel, like psycopg2 in main.py
+    from psycopg2.pool import ThreadedConnectionPool
+
+    return ThreadedConnectionPool(1, jobs, **connect_kwargs)
+
+
+def is_retryable(error):
+    """Returns whether an error is a psycopg2.Error whose transaction can be retried
+    """
+    return getattr(error, 'pgcode', None) in RETRYABLE_SQLSTATES
+
+
+def load_year(pool, state_results, replace=False, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, sleep=time.sleep):
+    """Loads the StateElectionResults of a year in one transaction on a connection of the pool,
+        retrying it if it fails with a serialization failure or a deadlock
+
+    Returns a LoadReport of the rows written by the attempt that committed. Its duration
+    includes the retries
+    """
+    start = time.time()
+    attempt = 0
+
+    while True:
+        db_connection = pool.getconn()
+
+        try:
+            report = load_state_results(db_connection.cursor(), state_results, replace=replace)
+            db_connection.commit()
+            report.seconds = time.time() - start
+            return report
+
+        except Exception as e:
+            rollback(db_connection)
+
+            if not is_retryable(e) or attempt == retries:
+                raise
+
+        finally:
+            # Broken connections are closed rather than handed out again
+            pool.putconn(db_connection, close=bool(db_connection.closed))
+
+        sleep(backoff * 2 ** attempt)
+        attempt += 1
+
+
+def parallel_load(pool, all_results, jobs, replace=False, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Loads many years of results concurrently, one transaction per year
+
+    Attributes:
+        pool (AbstractConnectionPool) - psycopg2 connection pool of at least jobs connections.
+            See connection_pool
+        all_results (Dict) - Years to NationalElectionResults
+        jobs (Int) - Number of years loaded at once
+        replace (Bool) - See load_state_results
+        retries (Int) - Number of times a year is retried after a serialization failure or a
+            deadlock
+        backoff (Float) - Seconds before the first retry of a year
+
+    Returns a tuple of a LoadReport of every year, whose duration is the load's, and an
+    OrderedDict of years, in order, to their LoadReports
+    """
+    start = time.time()
+    years = sorted(all_results)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(load_year, pool, list(all_results[year].state_results.values()), replace, retries, backoff)
+            for year in years
+        ]
+        reports = OrderedDict((year, future.result()) for year, future in zip(years, futures))
+
+    total = LoadReport()
+    for report in reports.values():
+        total.add(report)
+    total.seconds = time.time() - start
+
+    return total, reports
@@ -0,0 +1,168 @@
+"""Defines a pipelined ingest of results files into the db
+
+A parser thread reads results files and puts each StateElectionResults into a bounded queue as
+soon as its state is read, while a writer thread takes them off the queue and bulk loads them
+in batches, so reading and the db's latency overlap. The queue's bound keeps the parser from
+getting further ahead of the writer than queue_size states.
+"""
+
+import time
+import queue
+import threading
+from collections import OrderedDict
+import election_results.utils as utils
+from election_results.state import StateElectionResults
+from db.loader import load_state_results, rollback, LoadReport
+
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_BATCH_SIZE = 10     # states
+
+# Seconds each stage spent working and waiting on the other
+PIPELINE_TIMINGS = ['parse', 'parse_blocked', 'write', 'write_waiting', 'commit', 'wall']
+
+# Put on the queue by the parser once it has read every file
+DONE = object()
+
+
+def load_state_ids(cursor):
+    """Returns a dict of two-letter state abbreviations to their state_id in the states table
+    """
+    cursor.execute('select iso_a2, state_id from states;')
+    return dict(cursor.fetchall())
+
+
+class Pipeline:
+    """Runs a pipelined ingest. See pipelined_ingest
+
+    Attributes:
+        states (Queue) - StateElectionResults read by the parser, then DONE or the exception
+            that stopped it
+        stop (Event) - Set if the writer failed, so the parser stops
+        timings (OrderedDict) - PIPELINE_TIMINGS to seconds
+        report (LoadReport) - Rows written by the writer
+        error (Exception) - Exception that stopped the writer, if any
+    """
+
+    def __init__(self, db_connection, processors_and_filepaths, queue_size=DEFAULT_QUEUE_SIZE,
+        batch_size=DEFAULT_BATCH_SIZE, replace=False):
+        self.db_connection = db_connection
+        self.processors_and_filepaths = processors_and_filepaths
+        self.batch_size = batch_size
+        self.replace = replace
+
+        self.states = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.timings = OrderedDict((timing, 0.0) for timing in PIPELINE_TIMINGS)
+        self.report = LoadReport()
+        self.error = None
+
+    def put(self, item):
+        """Puts an item on the queue unless the writer stopped. Returns whether it was put
+        """
+        start = time.time()
+
+        while not self.stop.is_set():
+            try:
+                self.states.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+
+        self.timings['parse_blocked'] += time.time() - start
+        return not self.stop.is_set()
+
+    def parse(self):
+        start = time.time()
+
+        try:
+            for processor, filepath in self.processors_and_filepaths:
+                for r in processor.iter_results(filepath):
+                    if isinstance(r, StateElectionResults):
+                        # Calculated here since the parser's states aren't summarized nationally
+                        r.update_metrics()
+
+                        if not self.put(r):
+                            return
+
+            self.put(DONE)
+
+        except Exception as e:
+            self.put(e)
+
+        finally:
+            self.timings['parse'] = time.time() - start - self.timings['parse_blocked']
+
+    def write(self):
+        cursor = self.db_connection.cursor()
+
+        try:
+            state_ids = load_state_ids(cursor)
+            batch = []
+            item = None
+
+            while item is not DONE:
+                start = time.time()
+                item = self.states.get()
+                self.timings['write_waiting'] += time.time() - start
+
+                if isinstance(item, Exception):
+                    raise item
+
+                if item is not DONE:
+                    if item.state not in state_ids:
+                        raise utils.USStateError(item.state)
+                    batch.append(item)
+
+                if len(batch) == self.batch_size or (item is DONE and len(batch) > 0):
+                    start = time.time()
+                    self.report.add(load_state_results(cursor, batch, replace=self.replace))
+                    self.timings['write'] += time.time() - start
+                    batch = []
+
+            start = time.time()
+            self.db_connection.commit()
+            self.timings['commit'] = time.time() - start
+
+        except Exception as e:
+            # Raised by run
+            self.error = e
+            self.stop.set()
+            rollback(self.db_connection)
+
+    def run(self):
+        start = time.time()
+        threads = [threading.Thread(target=self.parse), threading.Thread(target=self.write)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.timings['wall'] = time.time() - start
+        self.report.seconds = self.timings['wall']
+
+        if self.error is not None:
+            raise self.error
+
+
+def pipelined_ingest(db_connection, processors_and_filepaths, queue_size=DEFAULT_QUEUE_SIZE,
+    batch_size=DEFAULT_BATCH_SIZE, replace=False):
+    """Reads results files and loads their states into the db in one transaction, overlapping
+        the reading and the writing
+
+    Attributes:
+        db_connection (connection) - psycopg2 connection
+        processors_and_filepaths (List) - Tuples of a HouseElectionsProcessor, or a subclass, and
+            the path of the results file it reads. Read in order
+        queue_size (Int) - Number of states read but not yet written after which the parser waits
+        batch_size (Int) - Number of states the writer loads at once. See load_state_results
+        replace (Bool) - See load_state_results
+
+    Returns a tuple of a LoadReport and an OrderedDict of PIPELINE_TIMINGS to seconds. parse
+    doesn't include the time the parser waited for the writer to catch up, and write_waiting
+    is the time the writer waited for the parser.
+    """
+    pipeline = Pipeline(db_connection, processors_and_filepaths, queue_size, batch_size, replace)
+    pipeline.run()
+
+    return pipeline.report, pipeline.timings
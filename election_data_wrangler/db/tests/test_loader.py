@@ -0,0 +1,148 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from election_results.tests.factories import ResultsTestCase
+from db.loader import (load_state_results, LoadReport, state_row, district_rows, copy_text, upsert_statement,
+    create_unique_indexes, delete_states, STATE_STAGING_COLUMNS, DISTRICT_STAGING_COLUMNS, DELETE_UNSTAGED_DISTRICTS,
+    CREATE_UNIQUE_INDEXES, DEDUPLICATE_STATEMENTS, DELETE_STATES)
+
+class RecordingCursor:
+    """Records the statements and COPY data it's given instead of running them. Every statement
+        returns the row (written, written) and affects written rows
+    """
+
+    def __init__(self, written=1):
+        self.statements = []
+        self.copies = []
+        self.written = written
+        self.rowcount = written
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def fetchone(self):
+        return (self.written, self.written)
+
+    def copy_expert(self, statement, file):
+        self.copies.append((statement, file.read()))
+
+class TestLoader(ResultsTestCase):
+
+    votes = {'NY': [(60, 40), (30, 70)], 'WY': [(30, 70)]}
+
+    def setUp(self):
+        super(__class__, self).setUp()
+        self.cursor = RecordingCursor()
+
+    def test_rows(self):
+        ny = self.results.state_results['NY']
+
+        self.assertEqual(len(state_row(ny)), len(STATE_STAGING_COLUMNS))
+        self.assertEqual(state_row(ny)[:3], ('NY', 2014, 90))
+        self.assertEqual(district_rows(ny), [
+            ('NY', 2014, 1, 60, 40, 0, 100, 9, 40, -31),
+            ('NY', 2014, 2, 30, 70, 0, 100, 30, 19, 11)
+        ])
+        self.assertEqual(len(district_rows(ny)[0]), len(DISTRICT_STAGING_COLUMNS))
+
+    def test_copy_text(self):
+        self.assertEqual(copy_text([('NY', 2014, None, -0.2), ('WY', 2014, 1, 0)]), 'NY\t2014\t\\N\t-0.2\nWY\t2014\t1\t0\n')
+        self.assertEqual(copy_text([]), '')
+
+    def test_upsert_statement(self):
+        statement = upsert_statement('district_election_results', 'staging', ['number', 'votes_dem'], ['election_id', 'number'])
+
+        self.assertIn('select e.election_id, s.number, s.votes_dem', statement)
+        self.assertIn('insert into district_election_results as t (election_id, number, votes_dem)', statement)
+        self.assertIn('on conflict (election_id, number) do update set votes_dem = excluded.votes_dem\n', statement)
+        self.assertIn('where (t.votes_dem) is distinct from (excluded.votes_dem)\n', statement)
+        self.assertIn('returning (xmax = 0) as inserted', statement)
+
+    def test_loads_states_with_one_copy_per_table(self):
+        report = load_state_results(self.cursor, self.results.state_results.values())
+
+        self.assertEqual(report.counts['state_election_results']['staged'], 2)
+        self.assertEqual(len(self.cursor.copies), 2)
+        self.assertIn('staging_state_election_results', self.cursor.copies[0][0])
+        self.assertEqual(self.cursor.copies[0][1].count('\n'), 2)
+        self.assertEqual(self.cursor.copies[1][1].count('\n'), 3)
+        self.assertNotIn(DELETE_UNSTAGED_DISTRICTS, self.cursor.statements)
+
+    def test_replaces_staged_states(self):
+        report = load_state_results(self.cursor, self.results.state_results.values(), replace=True)
+
+        self.assertIn(DELETE_UNSTAGED_DISTRICTS, self.cursor.statements)
+        self.assertEqual(report.counts['district_election_results']['deleted'], 1)
+
+    def test_counts_rows_returned_by_statements(self):
+        report = load_state_results(self.cursor, self.results.state_results.values())
+
+        self.assertEqual(list(report.counts['elections'].values()), [2, 1, 0, 1, 0])
+        self.assertEqual(list(report.counts['state_election_results'].values()), [2, 1, 1, 0, 0])
+        self.assertEqual(list(report.counts['district_election_results'].values()), [3, 1, 1, 1, 0])
+
+        report.seconds = 0.5
+        total = LoadReport()
+        total.add(report)
+        total.add(report)
+
+        self.assertEqual(total.counts['district_election_results']['skipped'], 2)
+        self.assertEqual(total.rows_written(), 10)
+        self.assertEqual(total.as_dict()['rows_per_second'], 10)
+        self.assertEqual(LoadReport().rows_per_second(), None)
+
+    def test_counts_unchanged_rows_as_skipped(self):
+        # Rows that didn't change aren't returned by the upserts, e.g. on a reload
+        report = load_state_results(RecordingCursor(written=0), self.results.state_results.values(), replace=True)
+
+        self.assertEqual(list(report.counts['elections'].values()), [2, 0, 0, 2, 0])
+        self.assertEqual(list(report.counts['state_election_results'].values()), [2, 0, 0, 2, 0])
+        self.assertEqual(list(report.counts['district_election_results'].values()), [3, 0, 0, 3, 0])
+        self.assertEqual(report.rows_written(), 0)
+
+    def test_loads_nothing_without_states(self):
+        self.assertEqual(load_state_results(self.cursor, []).rows_written(), 0)
+        self.assertEqual(self.cursor.statements, [])
+
+    def test_deletes_states(self):
+        report = delete_states(self.cursor, '2014', ['LA', 'NY'])
+
+        self.assertEqual(self.cursor.statements, [statement for _, statement in DELETE_STATES])
+        self.assertEqual([table for table, _ in DELETE_STATES][-1], 'elections')
+        self.assertEqual([counts['deleted'] for counts in report.counts.values()], [1, 1, 1])
+        self.assertEqual(report.rows_written(), 3)
+
+        self.assertEqual(delete_states(self.cursor, '2014', []).rows_written(), 0)
+        self.assertEqual(len(self.cursor.statements), len(DELETE_STATES))
+
+    def test_creates_unique_indexes(self):
+        create_unique_indexes(self.cursor)
+        self.assertEqual(self.cursor.statements, [CREATE_UNIQUE_INDEXES])
+
+    def test_deletes_duplicate_rows_before_creating_unique_indexes(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            create_unique_indexes(self.cursor, deduplicate=True)
+
+        self.assertEqual(self.cursor.statements, [statement for _, statement in DEDUPLICATE_STATEMENTS] + [CREATE_UNIQUE_INDEXES])
+        self.assertIn('Deleted 1 duplicate elections\n', output.getvalue())
+
+        # Results of duplicate elections are deleted before the elections they reference
+        descriptions = [description for description, _ in DEDUPLICATE_STATEMENTS]
+        self.assertLess(descriptions.index('state results of duplicate elections'), descriptions.index('elections'))
+        self.assertLess(descriptions.index('district results of duplicate elections'), descriptions.index('elections'))
+
+    def test_raises_error_creating_unique_indexes(self):
+        error = Exception('could not create unique index "elections_state_year_key"')
+
+        def execute(statement, params=None):
+            raise error
+
+        self.cursor.execute = execute
+
+        with self.assertRaises(Exception) as context:
+            create_unique_indexes(self.cursor)
+        self.assertIs(context.exception, error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import threading
+import unittest
+from election_results.tests.factories import national_results
+from db.parallel import parallel_load, load_year, is_retryable
+
+class DatabaseError(Exception):
+    """Stands in for a psycopg2.Error with a SQLSTATE
+    """
+
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+class FakeCursor:
+    """Records the years copied into the staging table, and fails the first COPYs of a year
+        with the errors its connection was given
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, statement, params=None):
+        pass
+
+    def fetchone(self):
+        return (1, 0)
+
+    def copy_expert(self, statement, file):
+        if 'staging_state_election_results' in statement:
+            year = int(file.read().split('\t')[1])
+            errors = self.connection.pool.errors.get(year, [])
+
+            if len(errors) > 0:
+                error = errors.pop(0)
+                # A connection error breaks the connection
+                if error.pgcode.startswith('08'):
+                    self.connection.closed = 2
+                raise error
+
+            self.connection.copied.append(year)
+
+class FakeConnection:
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.copied = []
+        self.commits = []
+        self.rollbacks = 0
+        self.closed = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        with self.pool.lock:
+            self.commits.extend(self.copied)
+            self.pool.committed.extend(self.copied)
+        self.copied = []
+
+    def rollback(self):
+        if self.closed:
+            raise DatabaseError('08003')
+
+        self.copied = []
+        self.rollbacks += 1
+
+class FakePool:
+    """Hands out connections like a psycopg2 connection pool, checking none is used twice at
+        once
+    """
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.lock = threading.Lock()
+        self.free = []
+        self.in_use = set()
+        self.committed = []
+        self.connections = 0
+        self.discarded = []
+
+    def getconn(self):
+        with self.lock:
+            if len(self.free) == 0:
+                self.free.append(FakeConnection(self))
+                self.connections += 1
+
+            connection = self.free.pop()
+            self.in_use.add(connection)
+            return connection
+
+    def putconn(self, connection, close=False):
+        with self.lock:
+            assert connection in self.in_use
+            self.in_use.remove(connection)
+
+            if close:
+                self.discarded.append(connection)
+            else:
+                self.free.append(connection)
+
+class TestParallelLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.all_results = dict(
+            (year, national_results({'NY': [(60, 40), (30, 70)], 'WY': [(30, 70)]}, year=year))
+            for year in [2010, 2012, 2014, 2016]
+        )
+
+    def tearDown(self):
+        del self.all_results
+
+    def test_loads_each_year_in_its_own_transaction(self):
+        pool = FakePool()
+        total, reports = parallel_load(pool, self.all_results, jobs=2)
+
+        self.assertEqual(sorted(pool.committed), [2010, 2012, 2014, 2016])
+        self.assertEqual(list(reports.keys()), [2010, 2012, 2014, 2016])
+        self.assertLessEqual(pool.connections, 2)
+        self.assertEqual(pool.in_use, set())
+
+        self.assertEqual(total.counts['state_election_results']['staged'], 8)
+        self.assertEqual(total.counts['district_election_results']['inserted'], 4)
+        self.assertGreater(total.seconds, 0)
+
+    def test_retries_serialization_failures_and_deadlocks(self):
+        pool = FakePool({2012: [DatabaseError('40001'), DatabaseError('40P01')]})
+        delays = []
+
+        report = load_year(pool, list(self.all_results[2012].state_results.values()), backoff=0.5, sleep=delays.append)
+
+        self.assertEqual(pool.committed, [2012])
+        self.assertEqual(delays, [0.5, 1.0])
+        self.assertEqual(pool.free[0].rollbacks, 2)
+        self.assertEqual(report.counts['elections']['staged'], 2)
+
+    def test_raises_after_retries(self):
+        pool = FakePool({2012: [DatabaseError('40001')] * 3})
+
+        self.assertRaises(DatabaseError, load_year, pool, list(self.all_results[2012].state_results.values()),
+            retries=2, sleep=lambda seconds: None)
+        self.assertEqual(pool.committed, [])
+        self.assertEqual(pool.in_use, set())
+
+    def test_raises_other_errors_without_retrying(self):
+        pool = FakePool({2014: [DatabaseError('23505'), DatabaseError('40001')]})
+
+        self.assertRaises(DatabaseError, parallel_load, pool, self.all_results, jobs=4, backoff=0)
+        self.assertNotIn(2014, pool.committed)
+        self.assertEqual(len(pool.errors[2014]), 1)
+
+    def test_closes_broken_connections(self):
+        pool = FakePool({2012: [DatabaseError('08006')]})
+
+        with self.assertRaises(DatabaseError) as context:
+            load_year(pool, list(self.all_results[2012].state_results.values()))
+
+        # The error that broke the connection is raised rather than the rollback's
+        self.assertEqual(context.exception.pgcode, '08006')
+        self.assertEqual(len(pool.discarded), 1)
+        self.assertEqual(pool.free, [])
+
+    def test_is_retryable(self):
+        self.assertTrue(is_retryable(DatabaseError('40P01')))
+        self.assertFalse(is_retryable(DatabaseError('23505')))
+        self.assertFalse(is_retryable(ValueError()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import election_results.utils as utils
+from election_results.tests.factories import state_results
+from db.pipeline import pipelined_ingest, PIPELINE_TIMINGS
+
+class ListProcessor:
+    """Yields the results it was given as if it read them from a file
+    """
+
+    def __init__(self, results, error=None):
+        self.results = results
+        self.error = error
+
+    def iter_results(self, filepath):
+        for r in self.results:
+            yield r
+
+        if self.error is not None:
+            raise self.error
+
+class RecordingCursor:
+    """Records the states copied into the staging table instead of loading them
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, statement, params=None):
+        pass
+
+    def fetchone(self):
+        return (0, 0)
+
+    def fetchall(self):
+        return [('NY', 1), ('AL', 2), ('WY', 3)]
+
+    def copy_expert(self, statement, file):
+        if 'staging_state_election_results' in statement:
+            self.connection.batches.append([line.split('\t')[0] for line in file.read().splitlines()])
+
+class RecordingConnection:
+
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.failed_rollbacks = 0
+        self.closed = 0
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        if self.closed:
+            self.failed_rollbacks += 1
+            raise utils.ElectionResultsError('connection already closed')
+
+        self.rollbacks += 1
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = RecordingConnection()
+        self.results = [
+            state_results('AL', [(20, 80), (45, 55)]),
+            state_results('NY', [(60, 40), (30, 70), (55, 45)]),
+            state_results('WY', [(30, 70)])
+        ]
+
+    def test_writes_states_in_batches(self):
+        processor = ListProcessor(self.results[:1] + self.results[1].districts_won_dem + self.results[1:])
+        report, timings = pipelined_ingest(self.connection, [(processor, '2014.csv')], queue_size=1, batch_size=2)
+
+        self.assertEqual(self.connection.batches, [['AL', 'NY'], ['WY']])
+        self.assertEqual(self.connection.commits, 1)
+        self.assertEqual(report.counts['state_election_results']['staged'], 3)
+        self.assertEqual(list(timings.keys()), PIPELINE_TIMINGS)
+        self.assertGreater(timings['wall'], 0)
+        self.assertEqual(self.results[1].mean_median, -0.067)
+
+    def test_reads_files_in_order(self):
+        pipelined_ingest(self.connection, [
+            (ListProcessor(self.results[2:]), '2012.csv'),
+            (ListProcessor(self.results[:2]), '2014.csv')
+        ], batch_size=10)
+
+        self.assertEqual(self.connection.batches, [['WY', 'AL', 'NY']])
+
+    def test_raises_parser_errors(self):
+        processor = ListProcessor(self.results, error=utils.ElectionResultsError('unhandled election'))
+
+        self.assertRaises(utils.ElectionResultsError, pipelined_ingest, self.connection, [(processor, '2014.csv')])
+        self.assertEqual((self.connection.commits, self.connection.rollbacks), (0, 1))
+
+    def test_raises_writer_errors(self):
+        processor = ListProcessor(self.results + [state_results('CA', [(60, 40)])] * 100)
+
+        self.assertRaises(utils.USStateError, pipelined_ingest, self.connection, [(processor, '2014.csv')], queue_size=2)
+        self.assertEqual((self.connection.commits, self.connection.rollbacks), (0, 1))
+
+    def test_raises_writer_errors_of_broken_connections(self):
+        def commit():
+            self.connection.closed = 2
+            raise utils.ElectionResultsError('server closed the connection unexpectedly')
+
+        self.connection.commit = commit
+
+        # The error that broke the connection is raised rather than the rollback's
+        with self.assertRaises(utils.ElectionResultsError) as context:
+            pipelined_ingest(self.connection, [(ListProcessor(self.results), '2014.csv')])
+        self.assertEqual(str(context.exception), 'server closed the connection unexpectedly')
+        self.assertEqual((self.connection.rollbacks, self.connection.failed_rollbacks), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
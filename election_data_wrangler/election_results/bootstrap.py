@@ -0,0 +1,114 @@
+"""Defines bootstrap confidence intervals of efficiency gaps
+
+Each draw resamples every state's districts with replacement, as many as the state has, and
+recomputes the state's efficiency gap from the resampled districts' net wasted votes and total
+votes. The national efficiency gap of a draw is that of all the resampled districts, so its
+resampling is stratified by state. Districts that ended in a tie aren't resampled since they
+aren't in the results' frame. Draws are sharded as described in election_results/simulation.py
+"""
+
+import numpy as np
+from election_results.simulation import shards, run_shards, SHARD_SIZE
+
+DEFAULT_CONFIDENCE = 0.95
+
+
+def bootstrap_shard(seed, draws, votes_wasted_net, votes_total, state_offsets):
+    """Resamples districts within their states. Runs in a worker process when sharded.
+
+    Attributes:
+        seed (Int) - Seed of the shard's RandomState
+        draws (Int) - Number of draws
+        votes_wasted_net, votes_total (Array of Int) - Of each district, sorted by state
+        state_offsets (Array of Int) - A state's districts are those from state_offsets[i] to
+            state_offsets[i + 1]
+
+    Returns a tuple of arrays of the net wasted votes and total votes of each state per draw, of
+    shape (draws, number of states)
+    """
+    random_state = np.random.RandomState(seed)
+    number_of_districts = np.diff(state_offsets)
+    state_index = np.repeat(np.arange(len(number_of_districts)), number_of_districts)
+
+    # Each district's slot draws one of its state's districts
+    offsets = np.floor(random_state.random_sample((draws, len(state_index))) * number_of_districts[state_index])
+    samples = state_offsets[:-1][state_index] + offsets.astype(np.int64)
+
+    states = np.zeros((len(state_index), len(number_of_districts)), dtype=np.int64)
+    states[np.arange(len(state_index)), state_index] = 1
+
+    return votes_wasted_net[samples].dot(states), votes_total[samples].dot(states)
+
+
+def bootstrap_efficiency_gaps(national_results, draws=2000, seed=None, jobs=1, shard_size=SHARD_SIZE):
+    """Resamples the districts of a year's states to estimate the distribution of their
+        efficiency gaps
+
+    Attributes:
+        national_results (NationalElectionResults) - A year's results
+        draws (Int) - Number of draws
+        seed (Int) - Seed of the resampling. Random if None
+        jobs (Int) - Number of worker processes the shards are resampled across. Defaults to the
+            number of CPUs if None
+        shard_size (Int) - Number of draws per shard
+
+    Returns a dict of states, a list of two-letter state abbreviations, state_gaps, an array of
+    each state's efficiency gap per draw of shape (draws, number of states), and national_gaps,
+    an array of the national efficiency gap per draw. Gaps aren't rounded.
+    """
+    frame = national_results.frame
+
+    shard_args = [
+        (shard_seed, n, frame.districts['votes_wasted_net'], frame.districts['votes_total'], frame.state_offsets)
+        for shard_seed, n in shards(draws, seed, shard_size)
+    ]
+    results = run_shards(bootstrap_shard, shard_args, jobs)
+
+    def concatenate(arrays):
+        return np.concatenate(arrays) if arrays else np.empty((0, len(frame.states)), dtype=np.int64)
+
+    votes_wasted_net = concatenate([n for n, _ in results])
+    votes_total = concatenate([t for _, t in results])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'states': frame.states,
+            'state_gaps': votes_wasted_net / np.where(votes_total == 0, np.nan, votes_total),
+            'national_gaps': votes_wasted_net.sum(axis=1) / votes_total.sum(axis=1)
+        }
+
+
+def confidence_interval(gaps, confidence=DEFAULT_CONFIDENCE, axis=None):
+    """Returns the percentile interval of gaps holding a confidence share of them
+    """
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(gaps, [tail, 100 - tail], axis=axis)
+
+
+def set_confidence_intervals(national_results, bootstrap, confidence=DEFAULT_CONFIDENCE):
+    """Sets the efficiency_gap_interval of national_results and its StateElectionResults from the
+        result of bootstrap_efficiency_gaps. Not set for states with one district, whose
+        resampled districts are always the same.
+    """
+    low, high = confidence_interval(bootstrap['state_gaps'], confidence, axis=0)
+    number_of_districts = national_results.frame.number_of_districts()
+
+    for i, state in enumerate(bootstrap['states']):
+        defined = number_of_districts[i] > 1 and not np.isnan(low[i])
+        national_results.state_results[state].efficiency_gap_interval = (
+            (round(low[i].item(), 3), round(high[i].item(), 3)) if defined else None
+        )
+
+    low, high = confidence_interval(bootstrap['national_gaps'], confidence).tolist()
+    national_results.efficiency_gap_interval = (round(low, 3), round(high, 3))
+
+
+def significance(interval):
+    """Returns how far a confidence interval is from an efficiency gap of 0, i.e. the magnitude of
+        the bound nearest to 0 if the interval doesn't contain 0, and 0 if it does or is None
+    """
+    if interval is None:
+        return 0
+
+    low, high = interval
+    return max(low, -high, 0)
@@ -1,11 +1,47 @@
 """Defines a class for representing a legislative district's elections
 """
 
+import sys
 import math
+import numpy as np
 import election_results.utils as utils
 from warnings import warn
+from fixtures.states import states
+from fixtures.legislative_body_codes import legislative_body_codes
 from election_results.election_results import ElectionResults
 
+WINNER_FIELDS = ('party', 'last_name', 'first_name')
+
+# Winner data of districts whose winner wasn't read, shared by all of them
+NO_WINNER = ('', '', '')
+
+# Codes of the ways a district's votes may have been imputed, for storing them in arrays
+IMPUTED_CODES = [None, 'rep_unopposed', 'dem_unopposed']
+
+
+def calc_wasted_votes_arrays(votes_rep, votes_dem, votes_total):
+    """Calculates the wasted votes of many districts at once. See
+        DistrictElectionResults.calc_wasted_votes
+
+    Returns a tuple of arrays of wasted votes for Rep and Dem candidates and the net wasted votes
+    """
+    votes_rep = np.asarray(votes_rep, dtype=np.int64)
+    votes_dem = np.asarray(votes_dem, dtype=np.int64)
+    votes_total = np.asarray(votes_total, dtype=np.int64)
+
+    votes_winner = np.maximum(votes_rep, votes_dem)
+    votes_loser = np.minimum(votes_rep, votes_dem)
+    majority_votes = votes_total // 2 + 1
+
+    votes_wasted_winner = votes_winner - np.minimum(votes_winner, majority_votes)
+    won_rep = votes_rep > votes_dem
+
+    votes_wasted_rep = np.where(won_rep, votes_wasted_winner, votes_loser)
+    votes_wasted_dem = np.where(won_rep, votes_loser, votes_wasted_winner)
+
+    return votes_wasted_rep, votes_wasted_dem, votes_wasted_dem - votes_wasted_rep
+
+
 class DistrictElectionResults(ElectionResults):
     """Represents the general election results for a legislative district for
        a given state and election year
@@ -27,9 +63,14 @@ class DistrictElectionResults(ElectionResults):
         votes_wasted_net (Int) - The difference in wasted votes between the
             Democratic and republican candidates
         winner (Dict) - Contains party (three-letter lowercase abbreviation),
-            last_name and first_name of the winner
+            last_name and first_name of the winner. Created when it's first accessed
+        imputed (String) - 'rep_unopposed' or 'dem_unopposed' if the candidate ran unopposed and
+            the votes were imputed, None otherwise. See HouseElectionsProcessor
     """
 
+    __slots__ = ('votes_dem', 'votes_rep', 'votes_other', 'votes_scattered', 'votes_total',
+        'votes_wasted_dem', 'votes_wasted_rep', 'votes_wasted_net', 'imputed', '_winner')
+
     def __init__(self, year, state, legislative_body_code, district, data=None):
         """Instantiate a DistrictElectionResults object
 
@@ -52,16 +93,106 @@ class DistrictElectionResults(ElectionResults):
         self.votes_wasted_dem = None
         self.votes_wasted_rep = None
         self.votes_wasted_net = None
+        self.imputed = None if data is None else data.get('imputed')
+
+        # Tuple of WINNER_FIELDS until winner is accessed. None if there's no winner data
+        self._winner = None if data is None or 'winner' not in data else \
+            tuple(data['winner'][field] for field in WINNER_FIELDS)
 
-        self.winner = {
-            "party": None if data is None else (data['winner']['party'] if 'winner' in data else None),
-            "last_name": None if data is None else (data['winner']['last_name'] if 'winner' in data else None),
-            "first_name": None if data is None else (data['winner']['first_name'] if 'winner' in data else None),
-        }
+        if self._winner == NO_WINNER:
+            self._winner = NO_WINNER
 
         if data is not None:
             self.calc_wasted_votes(self.votes_rep, self.votes_dem, self.votes_total)
 
+    @classmethod
+    def from_arrays(cls, year, legislative_body_code, state, district, votes_dem, votes_rep, votes_other,
+        votes_scattered, votes_total, imputed=None):
+        """Returns a list of DistrictElectionResults with an element per element of the arrays
+
+        The whole batch is validated once with vectorized checks rather than by each object's
+        __init__, which is what makes this faster than constructing each object.
+
+        Attributes:
+            year (Int) - The election year
+            legislative_body_code (Int) - Int that maps to a legislative body
+            state (Array of String) - Two-letter abbreviation of each district's state
+            district (Array of Int) - Legislative district numbers
+            votes_dem, votes_rep, votes_other, votes_scattered, votes_total (Array of Int) - Votes
+                of each district
+            imputed (Array of Int) - Index in IMPUTED_CODES of how each district's votes were
+                imputed. None if none were
+        """
+        try:
+            int(year)
+        except ValueError:
+            raise ValueError("Invalid year {}".format(year))
+
+        year = sys.intern(str(year))
+        code = sys.intern(str(legislative_body_code))
+        if code not in legislative_body_codes.keys():
+            raise utils.LegislativeBodyError(legislative_body_code)
+
+        state = np.asarray(state)
+        district = np.asarray(district, dtype=np.int64)
+        votes = [np.asarray(v, dtype=np.int64) for v in (votes_dem, votes_rep, votes_other, votes_scattered, votes_total)]
+        votes_dem, votes_rep, votes_other, votes_scattered, votes_total = votes
+
+        invalid_states = ~np.isin(state, list(states.keys()))
+        if invalid_states.any():
+            raise utils.USStateError(state[invalid_states][0])
+
+        if (district <= 0).any():
+            raise utils.DistrictError(district[district <= 0][0])
+
+        invalid_votes = votes_total < votes_rep + votes_dem
+        if invalid_votes.any():
+            i = np.flatnonzero(invalid_votes)[0]
+            raise utils.VotesError(votes_dem=votes_dem[i], votes_rep=votes_rep[i], votes_total=votes_total[i],
+                year=year, state=state[i], legislative_body_code=code, district=district[i])
+
+        votes_wasted_rep, votes_wasted_dem, votes_wasted_net = calc_wasted_votes_arrays(votes_rep, votes_dem, votes_total)
+        imputed = np.zeros(len(state), dtype=np.int64) if imputed is None else np.asarray(imputed, dtype=np.int64)
+
+        # Shared by the districts with the same state or number
+        state_names = dict((s, sys.intern(s)) for s in np.unique(state).tolist())
+        district_names = dict((d, sys.intern(str(d))) for d in np.unique(district).tolist())
+
+        results = []
+        for row in zip(state.tolist(), district.tolist(), votes_dem.tolist(), votes_rep.tolist(), votes_other.tolist(),
+            votes_scattered.tolist(), votes_total.tolist(), votes_wasted_dem.tolist(), votes_wasted_rep.tolist(),
+            votes_wasted_net.tolist(), imputed.tolist()):
+
+            r = cls.__new__(cls)
+            r.year = year
+            r.legislative_body_code = code
+            r.state = state_names[row[0]]
+            r.district = district_names[row[1]]
+            r.votes_dem, r.votes_rep, r.votes_other, r.votes_scattered, r.votes_total, \
+                r.votes_wasted_dem, r.votes_wasted_rep, r.votes_wasted_net = row[2:10]
+            r.imputed = IMPUTED_CODES[row[10]]
+            r._winner = NO_WINNER
+            results.append(r)
+
+        return results
+
+    @property
+    def winner(self):
+        if not isinstance(self._winner, dict):
+            self._winner = dict(zip(WINNER_FIELDS, self._winner or (None, None, None)))
+
+        return self._winner
+
+    @winner.setter
+    def winner(self, winner):
+        self._winner = winner
+
+    def as_dict(self):
+        d = super(__class__, self).as_dict()
+        d['winner'] = self.winner
+
+        return d
+
     def calc_wasted_votes(self, votes_rep, votes_dem, votes_total):
         """Calculates the wasted votes of Republican and Democratic candidates
 
@@ -2,13 +2,17 @@
 """
 
 import abc
+import sys
 import election_results.utils as utils
 from fixtures.states import states
 from fixtures.legislative_body_codes import legislative_body_codes
 
-class ElectionResults(abc.ABC):
+class ElectionResults(metaclass=abc.ABCMeta):
     """Abstract class to be implemented by DistrictElectionResults and StateElectionResults
 
+    Subclasses declare their attributes in __slots__ rather than keeping a __dict__ per object,
+    since there can be hundreds of thousands of them. See as_dict.
+
     Attributes:
         type (String) - Indicates whether it's for state or district
             'd' or 'district' for district
@@ -20,6 +24,8 @@ class ElectionResults(abc.ABC):
         district (Int/String) - Legislative district number
     """
 
+    __slots__ = ('year', 'state', 'legislative_body_code', 'district')
+
     def __init__(self, type, year, legislative_body_code, state=None, district=None):
         """Initializes an ElectionResults object. Validates year, state,
             district and legislative_body_code.
@@ -36,7 +42,8 @@ class ElectionResults(abc.ABC):
 
         try:
             int(year)
-            self.year = str(year)
+            # Interned since every district of a year has the same year, code and few district numbers
+            self.year = sys.intern(str(year))
         except ValueError as e:
             raise ValueError("Invalid year {}".format(year))
 
@@ -51,7 +58,7 @@ class ElectionResults(abc.ABC):
             raise e
 
         try:
-            code = str(legislative_body_code)
+            code = sys.intern(str(legislative_body_code))
             if code in legislative_body_codes.keys():
                 self.legislative_body_code = code
             else:
@@ -61,7 +68,7 @@ class ElectionResults(abc.ABC):
 
         try:
             if (type == 'd' or type == 'district') and district is not None and int(district) > 0:
-                self.district = str(district)
+                self.district = sys.intern(str(district))
             elif (type == 's' or type == 'state'):
                 self.district = None
             elif (type == 'n' or type == 'national'):
@@ -71,3 +78,16 @@ class ElectionResults(abc.ABC):
                 raise utils.DistrictError(district)
         except (utils.DistrictError, ValueError) as e:
             raise e
+
+    def as_dict(self):
+        """Returns a dict of the object's attributes, for printing. Attributes that aren't set are None.
+        """
+        d = {}
+
+        for cls in reversed(self.__class__.__mro__):
+            for name in cls.__dict__.get('__slots__', ()):
+                if name.startswith('_'):
+                    continue
+                d[name] = getattr(self, name, None)
+
+        return d
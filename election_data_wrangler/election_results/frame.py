@@ -0,0 +1,189 @@
+"""Defines a columnar representation of a year's district election results
+"""
+
+import numpy as np
+from election_results.district import DistrictElectionResults, IMPUTED_CODES
+from election_results.state import StateElectionResults
+from election_results.metrics import METRICS
+
+DISTRICT_COLUMNS = ['district', 'votes_dem', 'votes_rep', 'votes_other', 'votes_scattered', 'votes_total',
+    'votes_wasted_dem', 'votes_wasted_rep', 'votes_wasted_net', 'imputed']
+
+STATE_COLUMNS = ['votes_total_dem', 'votes_total_rep', 'votes_total_other', 'votes_total_scattered', 'votes_total',
+    'votes_wasted_total_dem', 'votes_wasted_total_rep', 'votes_wasted_net'] + METRICS
+
+
+def district_rows(state_results):
+    """Returns a list of tuples of the DISTRICT_COLUMNS of a state's districts, sorted by district
+        number
+    """
+    districts = sorted(state_results.districts_won_dem + state_results.districts_won_rep, key=lambda d: int(d.district))
+
+    return [
+        (int(d.district), d.votes_dem, d.votes_rep, d.votes_other, d.votes_scattered, d.votes_total,
+            d.votes_wasted_dem, d.votes_wasted_rep, d.votes_wasted_net, IMPUTED_CODES.index(d.imputed))
+        for d in districts
+    ]
+
+
+def state_total(state_results, column):
+    """Returns a state's value of a STATE_COLUMN. A state without district results has no totals,
+        and a metric that isn't defined is nan
+    """
+    value = getattr(state_results, column, None)
+
+    if value is None:
+        return np.nan if column in METRICS else 0
+
+    return value
+
+
+class ResultsFrame:
+    """Holds the results of a year's districts in arrays, a struct of arrays, rather than in
+    DistrictElectionResults objects
+
+    Districts are sorted by state then district number, so a state's districts are a contiguous
+    slice of every district column and can be read without copying. See state_view.
+
+    Attributes:
+        year (String) - The election year
+        legislative_body_code (String) - Maps to a legislative body
+        states (List) - Two-letter state abbreviations in alphabetical order
+        state_offsets (Array of Int) - A state's districts are those from state_offsets[i] to
+            state_offsets[i + 1]
+        districts (Dict) - DISTRICT_COLUMNS to arrays with an element per district. imputed is an
+            index in IMPUTED_CODES
+        state_totals (Dict) - STATE_COLUMNS to arrays with an element per state. Taken from
+            StateElectionResults, so they include districts that ended in a tie
+    """
+
+    __slots__ = ('year', 'legislative_body_code', 'states', 'state_offsets', 'districts', 'state_totals')
+
+    def __init__(self, year, legislative_body_code, states, state_offsets, districts, state_totals):
+        self.year = year
+        self.legislative_body_code = legislative_body_code
+        self.states = states
+        self.state_offsets = state_offsets
+        self.districts = districts
+        self.state_totals = state_totals
+
+    @classmethod
+    def from_state_results(cls, year, legislative_body_code, state_results):
+        """Builds a ResultsFrame from a dict of two-letter state abbreviations to StateElectionResults
+        """
+        states = sorted(state_results)
+        rows = []
+        number_of_districts = []
+
+        for state in states:
+            state_rows = district_rows(state_results[state])
+            number_of_districts.append(len(state_rows))
+            rows.extend(state_rows)
+
+        # Fortran order so each column is contiguous
+        matrix = np.array(rows, dtype=np.int64, order='F').reshape(len(rows), len(DISTRICT_COLUMNS))
+        districts = dict((column, matrix[:, i]) for i, column in enumerate(DISTRICT_COLUMNS))
+
+        # A state without district results has no totals
+        state_totals = {}
+        for column in STATE_COLUMNS:
+            values = [state_total(state_results[state], column) for state in states]
+            state_totals[column] = np.array(values, dtype=np.float64 if column in METRICS else np.int64)
+
+        state_offsets = np.zeros(len(states) + 1, dtype=np.int64)
+        np.cumsum(np.array(number_of_districts, dtype=np.int64), out=state_offsets[1:])
+
+        return cls(year, legislative_body_code, states, state_offsets, districts, state_totals)
+
+    def replace_state(self, state_results):
+        """Writes a state's districts and totals over the state's in place. Returns False, leaving
+            the frame unchanged, if the state isn't in the frame, has a different number of
+            districts, or the columns are read-only, e.g. memory-mapped from a results file
+        """
+        if state_results.state not in self.states:
+            return False
+
+        s = self.state_slice(state_results.state)
+        rows = district_rows(state_results)
+        columns = list(self.districts.values()) + list(self.state_totals.values())
+
+        if len(rows) != s.stop - s.start or not all(values.flags.writeable for values in columns):
+            return False
+
+        for i, column in enumerate(DISTRICT_COLUMNS):
+            self.districts[column][s] = [row[i] for row in rows]
+
+        i = self.states.index(state_results.state)
+        for column in STATE_COLUMNS:
+            self.state_totals[column][i] = state_total(state_results, column)
+
+        return True
+
+    def __len__(self):
+        return len(self.districts['district'])
+
+    def state_slice(self, state):
+        """Returns the slice of the district columns holding a state's districts
+        """
+        i = self.states.index(state)
+        return slice(int(self.state_offsets[i]), int(self.state_offsets[i + 1]))
+
+    def state_view(self, state):
+        """Returns a dict of DISTRICT_COLUMNS to views of a state's districts. The arrays share
+            memory with the frame.
+        """
+        s = self.state_slice(state)
+        return dict((column, values[s]) for column, values in self.districts.items())
+
+    def state_results(self, state):
+        """Returns the StateElectionResults of a state built from its columns, reading only its
+            districts. Its totals and metrics are the frame's.
+        """
+        i = self.states.index(state)
+        view = self.state_view(state)
+
+        sr = StateElectionResults(year=self.year, state=state, legislative_body_code=self.legislative_body_code, data=dict(
+            (column, int(self.state_totals[column][i])) for column in STATE_COLUMNS if column not in METRICS
+        ))
+
+        for d in DistrictElectionResults.from_arrays(
+            year=self.year,
+            legislative_body_code=self.legislative_body_code,
+            state=np.full(len(view['district']), state, dtype='<U2'),
+            district=view['district'],
+            votes_dem=view['votes_dem'],
+            votes_rep=view['votes_rep'],
+            votes_other=view['votes_other'],
+            votes_scattered=view['votes_scattered'],
+            votes_total=view['votes_total'],
+            imputed=view['imputed']
+        ):
+            if d.votes_rep > d.votes_dem:
+                sr.districts_won_rep.append(d)
+            elif d.votes_dem > d.votes_rep:
+                sr.districts_won_dem.append(d)
+
+        sr.update_eff_gap()
+        sr.set_metrics(self.state_totals, i)
+
+        return sr
+
+    def state_index(self):
+        """Returns an array of the index in states of each district's state
+        """
+        return np.repeat(np.arange(len(self.states)), self.number_of_districts())
+
+    def number_of_districts(self):
+        """Returns an array of the number of districts won by either major party per state
+        """
+        return np.diff(self.state_offsets)
+
+    def efficiency_gaps(self):
+        return self.state_totals['efficiency_gap']
+
+    def seat_advantages(self):
+        """Returns an array of each state's efficiency gap multiplied by its number of districts,
+            i.e. the seats it's worth
+        """
+        # Python's round, since np.round rounds halves of the scaled product to even
+        return np.array([round(x, 2) for x in (self.efficiency_gaps() * self.number_of_districts()).tolist()])
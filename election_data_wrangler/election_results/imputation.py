@@ -0,0 +1,175 @@
+"""Defines a Monte Carlo simulation of the uncertainty of the votes imputed for uncontested elections
+
+HouseElectionsProcessor imputes the votes of a candidate who ran unopposed from the fixed vote
+shares of its imputation rules. The paper that defined the efficiency gap reports a range of shares
+instead, so each draw of the simulation draws a Democratic vote share for every uncontested district
+from a beta distribution with the mean of the rules and the paper's 90 percent range, re-imputes the
+district's votes and recomputes every state's efficiency gap. Only the uncontested districts are simulated; the other districts add the
+same net wasted votes to every draw. Draws are sharded as described in election_results/simulation.py
+"""
+
+import numpy as np
+from collections import OrderedDict
+from election_results.district import calc_wasted_votes_arrays, IMPUTED_CODES
+from election_results.simulation import shards, run_shards, SHARD_SIZE
+
+# Democratic vote share of uncontested elections. From the paper: "For uncontested Democrats, this
+# procedure resulted in a mean Democratic vote share of 70 percent, with 90 percent of values falling
+# between 56 percent and 87 percent. For uncontested Republicans, it produced a mean Democratic vote
+# share of 32 percent, with 90 percent of values falling between 22 percent and 43 percent."
+IMPUTATION_DISTRIBUTIONS = {
+    'rep_unopposed': {'mean': 0.32, 'interval': (0.22, 0.43)},
+    'dem_unopposed': {'mean': 0.7, 'interval': (0.56, 0.87)}
+}
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Standard deviations from the mean bounding 90 percent of a normal distribution
+Z_90 = 1.645
+
+
+def beta_parameters(mean, interval):
+    """Returns the alpha and beta parameters of a beta distribution with a mean and a 90 percent
+        interval, by the method of moments. The interval's width gives the standard deviation as
+        if it were a normal distribution's, so the fitted distribution's 90 percent interval only
+        approximates a skewed one.
+    """
+    variance = ((interval[1] - interval[0]) / (2 * Z_90)) ** 2
+    concentration = mean * (1 - mean) / variance - 1
+
+    if concentration <= 0:
+        raise ValueError('No beta distribution has a mean of {} and an interval of {}'.format(mean, interval))
+
+    return mean * concentration, (1 - mean) * concentration
+
+
+def imputation_distribution(imputed, imputation_rules=None, distributions=None):
+    """Returns a tuple of the alpha and beta parameters of the Democratic share of the two-party
+        vote of districts imputed by a rule, and the share of their vote total the rule gives the
+        two parties. The distribution's mean is the rule's share, so the draws are around the
+        votes the processor imputed, and its interval is the one of distributions moved by the
+        difference of the means.
+
+    Attributes:
+        imputed (String) - The rule, e.g. dem_unopposed. See DistrictElectionResults.imputed
+        imputation_rules (Dict) - The rules the processor imputed with. See IMPUTATION_RULES in
+            processor/house_election_results.py. The means of distributions if None
+        distributions (Dict) - Overrides IMPUTATION_DISTRIBUTIONS
+    """
+    distribution = (IMPUTATION_DISTRIBUTIONS if distributions is None else distributions)[imputed]
+
+    if imputation_rules is None:
+        mean, two_party_share = distribution['mean'], 1.0
+    else:
+        shares = imputation_rules[imputed]
+        two_party_share = shares['votes_dem'] + shares['votes_rep']
+        mean = shares['votes_dem'] / two_party_share
+
+    shift = mean - distribution['mean']
+    alpha, beta = beta_parameters(mean, (distribution['interval'][0] + shift, distribution['interval'][1] + shift))
+
+    return alpha, beta, two_party_share
+
+
+def simulate_shard(seed, draws, alpha, beta, two_party_shares, votes_total, votes_wasted_net, state_index,
+    number_of_states):
+    """Simulates draws of the imputed districts. Runs in a worker process when sharded.
+
+    Attributes:
+        seed (Int) - Seed of the shard's RandomState
+        draws (Int) - Number of draws
+        alpha, beta (Array of Float) - Parameters of each district's Democratic share of the
+            two-party vote
+        two_party_shares (Array of Float) - Share of each district's vote total given to the two
+            parties
+        votes_total, votes_wasted_net (Array of Int) - Of each district as imputed by the processor
+        state_index (Array of Int) - Index of each district's state
+        number_of_states (Int) - Number of states
+
+    Returns a tuple of arrays of the change in each state's net wasted votes per draw, of shape
+    (draws, number_of_states), and of the change in the national net wasted votes per draw
+    """
+    random_state = np.random.RandomState(seed)
+    shares_dem = random_state.beta(alpha, beta, size=(draws, len(votes_total)))
+
+    # As in HouseElectionsProcessor.modify_votes_for_D_unopposed
+    votes_two_party = two_party_shares * votes_total
+    votes_dem = np.floor(shares_dem * votes_two_party).astype(np.int64)
+    votes_rep = np.floor((1 - shares_dem) * votes_two_party).astype(np.int64)
+    _, _, net = calc_wasted_votes_arrays(votes_rep, votes_dem, np.broadcast_to(votes_total, votes_dem.shape))
+
+    delta = net - votes_wasted_net
+
+    states = np.zeros((len(votes_total), number_of_states), dtype=np.int64)
+    states[np.arange(len(votes_total)), state_index] = 1
+
+    return delta.dot(states), delta.sum(axis=1)
+
+
+def simulate_imputation(national_results, draws=10000, seed=None, jobs=1, imputation_rules=None, distributions=None,
+    shard_size=SHARD_SIZE):
+    """Simulates the efficiency gaps of a year's states over draws of the votes imputed for its
+        uncontested elections
+
+    Attributes:
+        national_results (NationalElectionResults) - A year's results, whose districts record how
+            their votes were imputed. See DistrictElectionResults.imputed
+        draws (Int) - Number of draws
+        seed (Int) - Seed of the simulation. Random if None
+        jobs (Int) - Number of worker processes the shards are simulated across. Defaults to the
+            number of CPUs if None
+        imputation_rules (Dict) - The rules the processor imputed the districts with. See
+            imputation_distribution
+        distributions (Dict) - Overrides IMPUTATION_DISTRIBUTIONS
+        shard_size (Int) - Number of draws per shard
+
+    Returns a dict of states, a list of two-letter state abbreviations, state_gaps, an array of
+    each state's efficiency gap per draw of shape (draws, number of states), and national_gaps,
+    an array of the national efficiency gap per draw. Gaps aren't rounded.
+    """
+    frame = national_results.frame
+
+    rows = np.flatnonzero(frame.districts['imputed'])
+    codes = frame.districts['imputed'][rows]
+
+    alpha = np.empty(len(rows))
+    beta = np.empty(len(rows))
+    two_party_shares = np.empty(len(rows))
+    for code, imputed in enumerate(IMPUTED_CODES):
+        if imputed is not None:
+            alpha[codes == code], beta[codes == code], two_party_shares[codes == code] = imputation_distribution(
+                imputed, imputation_rules, distributions)
+
+    shard_args = [
+        (shard_seed, n, alpha, beta, two_party_shares, frame.districts['votes_total'][rows],
+            frame.districts['votes_wasted_net'][rows], frame.state_index()[rows], len(frame.states))
+        for shard_seed, n in shards(draws, seed, shard_size)
+    ]
+    results = run_shards(simulate_shard, shard_args, jobs)
+
+    state_delta = np.concatenate([s for s, _ in results]) if results else np.empty((0, len(frame.states)), dtype=np.int64)
+    national_delta = np.concatenate([n for _, n in results]) if results else np.empty(0, dtype=np.int64)
+
+    # States without votes have no efficiency gap
+    state_votes_total = frame.state_totals['votes_total'].astype(np.float64)
+    state_votes_total[state_votes_total == 0] = np.nan
+
+    return {
+        'states': frame.states,
+        'state_gaps': (frame.state_totals['votes_wasted_net'] + state_delta) / state_votes_total,
+        'national_gaps': (national_results.votes_wasted_net + national_delta) / national_results.votes_total
+    }
+
+
+def imputation_bands(simulation, percentiles=DEFAULT_PERCENTILES):
+    """Returns the percentiles of the efficiency gaps of a simulation. See simulate_imputation
+
+    Returns a dict of states, an OrderedDict of each state to a tuple of its percentiles, and
+    national, a tuple of the national percentiles
+    """
+    state_bands = np.percentile(simulation['state_gaps'], percentiles, axis=0).T.tolist()
+
+    return {
+        'states': OrderedDict(zip(simulation['states'], [tuple(band) for band in state_bands])),
+        'national': tuple(np.percentile(simulation['national_gaps'], percentiles).tolist())
+    }
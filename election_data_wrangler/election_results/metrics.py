@@ -0,0 +1,89 @@
+"""Defines the partisan metrics of a state's election, computed for every state at once from the
+vote arrays of a ResultsFrame
+
+Every metric is positive when the election favored Republicans, like the efficiency gap, and is
+nan when it isn't defined for a state. Each uses the Democratic share of a district's two-party
+vote:
+
+    efficiency_gap - Net wasted votes as a share of the state's votes. See StateElectionResults
+    mean_median - Mean minus median of the districts' shares
+    partisan_bias - Half minus the share of districts Democrats would win if the districts were
+        uniformly swung so their mean share were half
+    declination - Difference of the angles from the 50 percent point to the centroids of the
+        districts won by each party, scaled to [-1, 1], as defined by Warrington, "Quantifying
+        Gerrymandering Using the Vote Distribution" (2018). Not defined if a party won no districts
+"""
+
+import numpy as np
+
+METRICS = ['efficiency_gap', 'mean_median', 'partisan_bias', 'declination']
+
+
+def calc_metrics(state_index, number_of_states, votes_dem, votes_rep, votes_wasted_net, votes_total):
+    """Calculates the METRICS of many states in one pass over their districts
+
+    Attributes:
+        state_index (Array of Int) - Index of each district's state
+        number_of_states (Int) - Number of states
+        votes_dem, votes_rep (Array of Int) - Votes of each district. Districts that ended in a
+            tie are left out
+        votes_wasted_net, votes_total (Array of Int) - Of each state, including its ties
+
+    Returns a dict of METRICS to arrays of floats with an element per state
+    """
+    state_index = np.asarray(state_index, dtype=np.int64)
+    votes_dem = np.asarray(votes_dem, dtype=np.float64)
+    shares = votes_dem / (votes_dem + np.asarray(votes_rep, dtype=np.float64))
+
+    def state_sums(weights):
+        return np.bincount(state_index, weights=weights, minlength=number_of_states).astype(np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        number_of_districts = state_sums(None)
+        mean_shares = state_sums(shares) / number_of_districts
+
+        # Medians of each state's sorted shares
+        order = np.lexsort((shares, state_index))
+        sorted_shares = shares[order]
+        offsets = np.zeros(number_of_states + 1, dtype=np.int64)
+        np.cumsum(number_of_districts.astype(np.int64), out=offsets[1:])
+
+        has_districts = number_of_districts > 0
+        low = (offsets[:-1] + (number_of_districts.astype(np.int64) - 1) // 2)[has_districts]
+        high = (offsets[:-1] + number_of_districts.astype(np.int64) // 2)[has_districts]
+        median_shares = np.full(number_of_states, np.nan)
+        median_shares[has_districts] = (sorted_shares[low] + sorted_shares[high]) / 2
+
+        swung_shares = shares + (0.5 - mean_shares)[state_index]
+        seats_dem = state_sums(swung_shares > 0.5) + state_sums(swung_shares == 0.5) / 2
+
+        won_dem = shares > 0.5
+        won_rep = shares < 0.5
+        seats_won_dem = state_sums(won_dem)
+        seats_won_rep = state_sums(won_rep)
+        # Each party's centroid is at half its seat fraction, so the slopes from the 50 percent
+        # point at the seat fraction of Democrats are (2 * mean share - 1) / seat fraction
+        angle_dem = np.arctan((2 * state_sums(shares * won_dem) / seats_won_dem - 1) / (seats_won_dem / number_of_districts))
+        angle_rep = np.arctan((1 - 2 * state_sums(shares * won_rep) / seats_won_rep) / (seats_won_rep / number_of_districts))
+
+        votes_total = np.asarray(votes_total, dtype=np.float64)
+
+        return {
+            'efficiency_gap': np.asarray(votes_wasted_net, dtype=np.float64) / np.where(votes_total == 0, np.nan, votes_total),
+            'mean_median': mean_shares - median_shares,
+            'partisan_bias': 0.5 - seats_dem / number_of_districts,
+            'declination': 2 * (angle_dem - angle_rep) / np.pi
+        }
+
+
+def calc_frame_metrics(frame):
+    """Calculates the METRICS of every state of a ResultsFrame
+    """
+    return calc_metrics(
+        state_index=frame.state_index(),
+        number_of_states=len(frame.states),
+        votes_dem=frame.districts['votes_dem'],
+        votes_rep=frame.districts['votes_rep'],
+        votes_wasted_net=frame.state_totals['votes_wasted_net'],
+        votes_total=frame.state_totals['votes_total']
+    )
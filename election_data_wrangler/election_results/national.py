@@ -3,6 +3,59 @@
 
 from election_results.election_results import ElectionResults
 import election_results.utils as utils
+import numpy as np
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from election_results.frame import ResultsFrame
+from election_results.metrics import METRICS, calc_frame_metrics
+from election_results.table import StateMetricsTable
+from election_results.state import TOTAL_FIELDS
+
+# Fields of NationalElectionResults that total the same field of its StateElectionResults
+STATE_TOTAL_FIELDS = [field for field, _ in TOTAL_FIELDS]
+
+class FrameStateResults(MutableMapping):
+    """A dict of two-letter state abbreviations to StateElectionResults that builds a state's
+    results from a ResultsFrame the first time they're accessed, so results loaded from a results
+    file don't build objects for states that aren't used
+
+    Attributes:
+        national_results (NationalElectionResults) - The results the states belong to
+        frame (ResultsFrame) - The frame the states are built from
+    """
+
+    def __init__(self, national_results, frame):
+        self.national_results = national_results
+        self.frame = frame
+        # States to their results, None until they're built
+        self._states = OrderedDict((state, None) for state in frame.states)
+
+    def __getitem__(self, state):
+        results = self._states[state]
+
+        if results is None:
+            results = self.frame.state_results(state)
+            results._national_results = self.national_results
+            self._states[state] = results
+
+        return results
+
+    def __setitem__(self, state, results):
+        self._states[state] = results
+
+    def __delitem__(self, state):
+        del self._states[state]
+
+    def __iter__(self):
+        return iter(self._states)
+
+    def __len__(self):
+        return len(self._states)
+
+    def built(self):
+        """Returns a list of the StateElectionResults built so far
+        """
+        return [results for results in self._states.values() if results is not None]
 
 class NationalElectionResults(ElectionResults):
     """Represents the summary of national elections for a legislative body
@@ -26,9 +79,20 @@ class NationalElectionResults(ElectionResults):
             Republican candidate
         votes_wasted_net (Int) - Net wasted votes; difference between the Democratic
             and Republican numbers
-        state_results (Dict) - Dict of two-letter state abbreviations to StateElectionResults
+        state_results (Dict) - Dict of two-letter state abbreviations to StateElectionResults. A
+            FrameStateResults for results built from a frame. See from_frame
+        frame (ResultsFrame) - The district results in arrays. Built when it's first accessed,
+            and again once a state's districts change
+        metrics_table (StateMetricsTable) - The states' metrics with cached sort orders. Built
+            from the frame when it's first accessed
+        efficiency_gap_interval (Tuple) - Bootstrap confidence interval of the national efficiency
+            gap. See election_results/bootstrap.py
     """
 
+    __slots__ = ('state_results', 'votes_total_dem', 'votes_total_rep', 'votes_total_other', 'votes_total_scattered',
+        'votes_total', 'votes_wasted_total_dem', 'votes_wasted_total_rep', 'votes_wasted_net', 'efficiency_gap_interval', '_frame',
+        '_metrics_table', '_state_totals')
+
     def __init__(self, year, legislative_body_code, data=None, state_results=None):
         """Initializes a NationalElectionResults object
 
@@ -41,6 +105,9 @@ class NationalElectionResults(ElectionResults):
             type='n', year=year, legislative_body_code=legislative_body_code)
 
         self.state_results = {}
+        self._frame = None
+        self._metrics_table = None
+        self._state_totals = {}
         self.votes_total_dem = None
         self.votes_total_rep = None
         self.votes_total_other = None
@@ -49,52 +116,205 @@ class NationalElectionResults(ElectionResults):
         self.votes_wasted_total_dem = None
         self.votes_wasted_total_rep = None
         self.votes_wasted_net = None
+        self.efficiency_gap_interval = None
 
         if state_results is not None:
             self.summarize_votes(state_results)
 
-    def summarize_votes(self, state_results_dict):
-        """Collects the results of state legislative elections
+    @property
+    def frame(self):
+        if self._frame is None:
+            self._frame = ResultsFrame.from_state_results(self.year, self.legislative_body_code, self.state_results)
+
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame):
+        self._frame = frame
+
+    @property
+    def metrics_table(self):
+        # Rebuilt once the frame is
+        if self._metrics_table is None or self._metrics_table.frame is not self.frame:
+            self._metrics_table = StateMetricsTable(self.frame)
+
+        return self._metrics_table
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Returns NationalElectionResults of a ResultsFrame whose state totals include the METRICS,
+            e.g. one read from a results file, without building StateElectionResults. They're
+            built from the frame as they're accessed.
         """
-        self.votes_total_dem = 0
-        self.votes_total_rep = 0
-        self.votes_total_other = 0
-        self.votes_total_scattered = 0
-        self.votes_total = 0
-        self.votes_wasted_total_dem = 0
-        self.votes_wasted_total_rep = 0
-        self.votes_wasted_net = 0
+        results = cls(year=frame.year, legislative_body_code=frame.legislative_body_code)
+        results._frame = frame
+        results.state_results = FrameStateResults(results, frame)
+
+        for field in STATE_TOTAL_FIELDS:
+            setattr(results, field, int(frame.state_totals[field].sum()))
+
+        results._state_totals = dict(
+            (state, tuple(int(frame.state_totals[field][i]) for field in STATE_TOTAL_FIELDS))
+            for i, state in enumerate(frame.states)
+        )
+
+        return results
+
+    def save(self, filepath):
+        """Saves the results to a results file. See election_results/storage.py
+        """
+        # Imported here since storage imports this module
+        from election_results.storage import save_results
+        save_results(filepath, self)
+
+    @classmethod
+    def load(cls, filepath, year=None, mmap=True):
+        """Loads a year's results from a results file. year may be omitted if the file holds
+            one year. See election_results/storage.py
+        """
+        from election_results.storage import load_results
+        results = load_results(filepath, mmap=mmap)
+
+        if year is None and len(results) == 1:
+            return next(iter(results.values()))
+
+        try:
+            return results[str(year)]
+        except KeyError:
+            raise utils.ElectionResultsError('No results for {} in {}'.format(year, filepath))
+
+    def summarize_votes(self, state_results_dict, frame=None):
+        """Collects the results of state legislative elections and calculates their metrics
+
+        Attributes:
+            state_results_dict (Dict) - Two-letter state abbreviations to StateElectionResults
+            frame (ResultsFrame) - The district results of state_results_dict in arrays, if they
+                already are. Built from state_results_dict if None
+        """
+        if isinstance(self.state_results, FrameStateResults):
+            previous_results = self.state_results.built()
+        else:
+            previous_results = self.state_results.values()
+
+        for results in previous_results:
+            results._national_results = None
+
+        self._frame = frame
+        self._state_totals = {}
         self.state_results = {}
 
-        def generate_err_msg(state_results):
-            return "{} {} body_code {} StateElectionResults does not belong in \
-                    {} {} body_code {} NationalElectionResults".format(
-                        state_results.year,
-                        state_results.state,
-                        state_results.legislative_body_code,
-                        self.year,
-                        self.state,
-                        self.legislative_body_code
-                    )
+        for field in STATE_TOTAL_FIELDS:
+            setattr(self, field, 0)
 
         for results in state_results_dict.values():
-            if results.year != self.year:
-                raise utils.ElectionResultsError(generate_err_msg(results))
-
-            if results.legislative_body_code != self.legislative_body_code:
-                raise utils.ElectionResultsError(generate_err_msg(results))
-
-            try:
-                self.votes_total_dem += results.votes_total_dem
-                self.votes_total_rep += results.votes_total_rep
-                self.votes_total_other += results.votes_total_other
-                self.votes_total_scattered += results.votes_total_scattered
-                self.votes_total += results.votes_total
-                self.votes_wasted_total_dem += results.votes_wasted_total_dem
-                self.votes_wasted_total_rep += results.votes_wasted_total_rep
-                self.votes_wasted_net += results.votes_wasted_net
-                self.state_results[results.state] = results
-            except Exception as e:
-                print('\nError in {} {} {}'.format(results.year, results.state, results.district))
-                print('{}\n'.format(results.__dict__))
-                raise e
+            self.add_state_to_totals(results)
+
+        self.update_metrics()
+
+    def update_metrics(self):
+        """Calculates the METRICS of every state in one pass over the frame and sets them on the
+            StateElectionResults and in the frame's state totals. A state's efficiency gap is the
+            one it calculated.
+        """
+        frame = self.frame
+        metrics = calc_frame_metrics(frame)
+
+        for i, state in enumerate(frame.states):
+            self.state_results[state].set_metrics(metrics, i)
+
+        for metric in METRICS:
+            frame.state_totals[metric] = np.array(
+                [np.nan if v is None else v for v in (getattr(self.state_results[s], metric, None) for s in frame.states)],
+                dtype=np.float64
+            )
+
+    def generate_err_msg(self, state_results):
+        return "{} {} body_code {} StateElectionResults does not belong in \
+                {} {} body_code {} NationalElectionResults".format(
+                    state_results.year,
+                    state_results.state,
+                    state_results.legislative_body_code,
+                    self.year,
+                    self.state,
+                    self.legislative_body_code
+                )
+
+    def add_state_to_totals(self, results):
+        """Adds a state's votes to the totals and keeps what it added, so they can be subtracted
+            if the state is replaced
+        """
+        if results.year != self.year:
+            raise utils.ElectionResultsError(self.generate_err_msg(results))
+
+        if results.legislative_body_code != self.legislative_body_code:
+            raise utils.ElectionResultsError(self.generate_err_msg(results))
+
+        totals = tuple(getattr(results, field) for field in STATE_TOTAL_FIELDS)
+
+        if None in totals:
+            print('{}\n'.format(results.as_dict()))
+            raise utils.ElectionResultsError('{} {} StateElectionResults has no vote totals'.format(
+                results.year, results.state))
+
+        for field, total in zip(STATE_TOTAL_FIELDS, totals):
+            setattr(self, field, getattr(self, field) + total)
+
+        previous_results = self.state_results.get(results.state)
+        if previous_results is not None and previous_results is not results:
+            previous_results._national_results = None
+
+        self._state_totals[results.state] = totals
+        self.state_results[results.state] = results
+        results._national_results = self
+
+    def upsert_state(self, results):
+        """Adds a state's results, or replaces its previous results, without re-summarizing the
+            other states or recalculating their metrics. Can also be called with a state's results
+            after they were changed in place. States tell it when their districts change, see
+            state_changed.
+        """
+        self.replace_state_totals(results)
+        results.update_metrics()
+        self.update_frame_state(results)
+
+    def state_changed(self, results):
+        """Updates the totals and the frame after districts of one of the states were added,
+            removed or replaced. Called by the StateElectionResults, which calculates its own
+            metrics.
+        """
+        self.replace_state_totals(results)
+        self.update_frame_state(results)
+
+    def update_frame_state(self, results):
+        """Writes a state's results into the frame, if it's built, in place. The frame is dropped,
+            and rebuilt when it's next accessed, if they can't be, e.g. for a new state or one
+            whose number of districts changed.
+        """
+        if self._frame is not None and not self._frame.replace_state(results):
+            self._frame = None
+
+        # Its sort orders are stale either way
+        self._metrics_table = None
+
+    def replace_state_totals(self, results):
+        """Adds a state's results to the totals, subtracting the state's previous totals if it
+            was added before. Leaves the totals unchanged if the state doesn't belong
+        """
+        if self.votes_total is None:
+            for field in STATE_TOTAL_FIELDS:
+                setattr(self, field, 0)
+
+        previous_totals = self._state_totals.pop(results.state, None)
+
+        if previous_totals is not None:
+            for field, total in zip(STATE_TOTAL_FIELDS, previous_totals):
+                setattr(self, field, getattr(self, field) - total)
+
+        try:
+            self.add_state_to_totals(results)
+        except Exception as e:
+            if previous_totals is not None:
+                for field, total in zip(STATE_TOTAL_FIELDS, previous_totals):
+                    setattr(self, field, getattr(self, field) + total)
+                self._state_totals[results.state] = previous_totals
+            raise e
@@ -0,0 +1,168 @@
+"""Defines a container of many years of election results
+"""
+
+import numpy as np
+import election_results.utils as utils
+from election_results.frame import DISTRICT_COLUMNS, STATE_COLUMNS
+from election_results.metrics import METRICS
+from election_results.storage import load_results, STATE_CODES
+
+
+class ElectionPanel:
+    """Holds the results of many years in arrays indexed by year, state and district, so questions
+    across years are answered in memory with array operations rather than database queries
+
+    District rows are sorted by year, state and district number, and state rows by year and state.
+    States are numbered by their index in STATE_CODES.
+
+    Attributes:
+        years (List) - Election years in ascending order, as ints
+        districts (Dict) - DISTRICT_COLUMNS, 'year' and 'state' to arrays with an element per
+            district per year
+        states (Dict) - STATE_COLUMNS, 'year' and 'state' to arrays with an element per state per year
+        year_offsets (Array of Int) - A year's district rows are those from year_offsets[i] to
+            year_offsets[i + 1], i being the year's index in years
+        district_keys (Array of Int) - Sorted key of each district row. See key
+        state_order (Array of Int) - State rows sorted by state then year
+        state_offsets (Array of Int) - A state's rows in state_order are those from
+            state_offsets[i] to state_offsets[i + 1], i being the state's index in STATE_CODES
+    """
+
+    __slots__ = ('years', 'districts', 'states', 'year_offsets', 'district_width', 'district_keys',
+        'state_order', 'state_offsets')
+
+    def __init__(self, national_results):
+        """Initializes an ElectionPanel from NationalElectionResults of different years
+        """
+        national_results = sorted(national_results, key=lambda r: int(r.year))
+        frames = [r.frame for r in national_results]
+
+        self.years = [int(r.year) for r in national_results]
+        if len(set(self.years)) != len(self.years):
+            raise utils.ElectionResultsError('A panel holds one NationalElectionResults per year: {}'.format(self.years))
+
+        def concatenate(arrays, dtype=np.int64):
+            return np.concatenate(arrays) if len(arrays) > 0 else np.empty(0, dtype=dtype)
+
+        state_codes = [np.array([STATE_CODES.index(s) for s in f.states], dtype=np.int64) for f in frames]
+
+        self.districts = dict((column, concatenate([f.districts[column] for f in frames])) for column in DISTRICT_COLUMNS)
+        self.districts['year'] = concatenate([np.full(len(f), year, dtype=np.int64) for f, year in zip(frames, self.years)])
+        self.districts['state'] = concatenate([codes[f.state_index()] for f, codes in zip(frames, state_codes)])
+
+        self.states = dict(
+            (column, concatenate([f.state_totals[column] for f in frames],
+                dtype=np.float64 if column in METRICS else np.int64))
+            for column in STATE_COLUMNS
+        )
+        self.states['year'] = concatenate([np.full(len(f.states), year, dtype=np.int64) for f, year in zip(frames, self.years)])
+        self.states['state'] = concatenate(state_codes)
+
+        self.year_offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+        np.cumsum(np.array([len(f) for f in frames], dtype=np.int64), out=self.year_offsets[1:])
+
+        # Rows are already sorted by year, state and district, so keys are too
+        self.district_width = int(self.districts['district'].max()) + 1 if len(self.districts['district']) > 0 else 1
+        self.district_keys = self.key(self.districts['year'], self.districts['state'], self.districts['district'])
+
+        self.state_order = np.lexsort((self.states['year'], self.states['state']))
+        self.state_offsets = np.searchsorted(self.states['state'][self.state_order], np.arange(len(STATE_CODES) + 1))
+
+    @classmethod
+    def load(cls, filepath, mmap=True):
+        """Returns an ElectionPanel of every year in a results file. See election_results/storage.py
+        """
+        return cls(load_results(filepath, mmap=mmap).values())
+
+    def key(self, year, state, district):
+        return (np.asarray(year, dtype=np.int64) * len(STATE_CODES) + state) * self.district_width + district
+
+    def state_code(self, state):
+        try:
+            return STATE_CODES.index(state)
+        except ValueError:
+            raise utils.USStateError(state)
+
+    def state_names(self, codes):
+        return np.array(STATE_CODES)[codes]
+
+    def year_slice(self, year):
+        """Returns the slice of the district columns holding a year's districts
+        """
+        try:
+            i = self.years.index(int(year))
+        except ValueError:
+            raise utils.ElectionResultsError('No results for {}'.format(year))
+
+        return slice(int(self.year_offsets[i]), int(self.year_offsets[i + 1]))
+
+    def district(self, year, state, district):
+        """Returns a dict of the district columns of a district in a year
+        """
+        key = self.key(int(year), self.state_code(state), int(district))
+        i = int(np.searchsorted(self.district_keys, key))
+
+        if i == len(self.district_keys) or self.district_keys[i] != key:
+            raise KeyError((year, state, district))
+
+        return dict((column, values[i].item()) for column, values in self.districts.items())
+
+    def state_time_series(self, state, column='efficiency_gap'):
+        """Returns a tuple of arrays of the years a state has results for and a column of
+            STATE_COLUMNS in each of them
+        """
+        i = self.state_code(state)
+        rows = self.state_order[self.state_offsets[i]:self.state_offsets[i + 1]]
+
+        return self.states['year'][rows], self.states[column][rows]
+
+    def gaps_vs_year(self):
+        """Returns a dict of each state to a list of (year, efficiency gap) tuples in ascending order
+            of year
+        """
+        years = self.states['year'][self.state_order].tolist()
+        gaps = self.states['efficiency_gap'][self.state_order].tolist()
+
+        data = {}
+        for i in np.flatnonzero(np.diff(self.state_offsets)).tolist():
+            start, end = int(self.state_offsets[i]), int(self.state_offsets[i + 1])
+            data[STATE_CODES[i]] = list(zip(years[start:end], gaps[start:end]))
+
+        return data
+
+    def districts_above(self, threshold, column='votes_wasted_net', magnitude=False):
+        """Returns a dict like districts, with state names rather than codes, of the districts of
+            every year whose column is greater than threshold
+
+        Attributes:
+            threshold (Int) - Number of votes
+            column (String) - One of DISTRICT_COLUMNS, e.g. votes_wasted_dem
+            magnitude (Bool) - Option indicating the column's absolute value is compared, e.g. to
+                find districts with many net wasted votes favoring either party
+        """
+        values = self.districts[column]
+        rows = np.flatnonzero((np.abs(values) if magnitude else values) > threshold)
+
+        above = dict((c, v[rows]) for c, v in self.districts.items())
+        above['state'] = self.state_names(above['state'])
+
+        return above
+
+    def year_over_year(self, column='efficiency_gap'):
+        """Returns the change in a column of STATE_COLUMNS between each state's consecutive
+            years of results
+
+        Returns a dict of arrays of state, year, previous_year and delta
+        """
+        state = self.states['state'][self.state_order]
+        year = self.states['year'][self.state_order]
+        values = self.states[column][self.state_order]
+
+        same_state = state[1:] == state[:-1]
+
+        return {
+            'state': self.state_names(state[1:][same_state]),
+            'year': year[1:][same_state],
+            'previous_year': year[:-1][same_state],
+            'delta': (values[1:] - values[:-1])[same_state]
+        }
@@ -0,0 +1,33 @@
+"""Defines helpers for splitting the draws of a simulation into shards that can run in worker
+processes
+
+Each shard gets its own seed taken from the simulation's seed, so a seeded simulation's draws
+don't depend on the number of processes it ran on.
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+SHARD_SIZE = 1000
+
+
+def shards(draws, seed=None, shard_size=SHARD_SIZE):
+    """Returns a list of (seed, number of draws) tuples of the shards of a simulation. seed is
+        random if None
+    """
+    sizes = [shard_size] * (draws // shard_size) + ([draws % shard_size] if draws % shard_size else [])
+    seeds = np.random.RandomState(seed).randint(0, 2 ** 31 - 1, size=len(sizes)).tolist()
+
+    return list(zip(seeds, sizes))
+
+
+def run_shards(function, shard_args, jobs=1):
+    """Calls function with each tuple of arguments of shard_args, across a pool of jobs processes
+        unless jobs is 1, and returns the results in order. jobs defaults to the number of CPUs
+        if None
+    """
+    if jobs == 1:
+        return [function(*args) for args in shard_args]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(function, *zip(*shard_args)))
@@ -3,9 +3,22 @@
 
 import math
 import election_results.utils as utils
+from election_results.metrics import METRICS, calc_metrics
 from election_results.election_results import ElectionResults
 from election_results.district import DistrictElectionResults
 
+# Fields of StateElectionResults that total a field of its DistrictElectionResults
+TOTAL_FIELDS = [
+    ('votes_total_dem', 'votes_dem'),
+    ('votes_total_rep', 'votes_rep'),
+    ('votes_total_other', 'votes_other'),
+    ('votes_total_scattered', 'votes_scattered'),
+    ('votes_total', 'votes_total'),
+    ('votes_wasted_total_dem', 'votes_wasted_dem'),
+    ('votes_wasted_total_rep', 'votes_wasted_rep'),
+    ('votes_wasted_net', 'votes_wasted_net')
+]
+
 class StateElectionResults(ElectionResults):
     """Represents the summary of elections for a legislative body for a US state
 
@@ -31,8 +44,20 @@ class StateElectionResults(ElectionResults):
             and Republican numbers
         districts_won_dem (List) - List of DistrictElectionResults won by Democrats
         districts_won_rep (List) - List of DistrictElectionResults won by Republicans
+        efficiency_gap (Float) - Net wasted votes as a share of votes_total. Set once district
+            results are summarized
+        mean_median, partisan_bias, declination (Float) - Partisan metrics of the state's
+            districts, positive if they favored Republicans. None if not defined for the state. Set
+            for every state at once by NationalElectionResults. See election_results/metrics.py
+        efficiency_gap_interval (Tuple) - Bootstrap confidence interval of the efficiency gap. See
+            election_results/bootstrap.py
     """
 
+    __slots__ = ('votes_total_dem', 'votes_total_rep', 'votes_total_other', 'votes_total_scattered', 'votes_total',
+        'votes_wasted_total_dem', 'votes_wasted_total_rep', 'votes_wasted_net', 'districts_won_dem',
+        'districts_won_rep', 'efficiency_gap', 'mean_median', 'partisan_bias', 'declination',
+        'efficiency_gap_interval', '_national_results', '_districts_tied')
+
     def __init__(self, year, state, legislative_body_code, data=None, district_results=None):
         """Initializes a StateElectionResults object
 
@@ -47,6 +72,8 @@ class StateElectionResults(ElectionResults):
 
         self.districts_won_dem = []
         self.districts_won_rep = []
+        # Counted in the totals but not won by either party, kept so they can be removed
+        self._districts_tied = []
         self.votes_total_dem = None if data is None else data["votes_total_dem"]
         self.votes_total_rep = None if data is None else data["votes_total_rep"]
         self.votes_total_other = None if data is None else data["votes_total_other"]
@@ -55,6 +82,12 @@ class StateElectionResults(ElectionResults):
         self.votes_wasted_total_dem = None if data is None else data["votes_wasted_total_dem"]
         self.votes_wasted_total_rep = None if data is None else data["votes_wasted_total_rep"]
         self.votes_wasted_net = None if data is None else data["votes_wasted_net"]
+        self.mean_median = None
+        self.partisan_bias = None
+        self.declination = None
+        self.efficiency_gap_interval = None
+        # NationalElectionResults the state was added to, told when its districts change
+        self._national_results = None
 
         if district_results is not None and len(district_results) > 0:
             self.summarize_votes(district_results)
@@ -62,38 +95,135 @@ class StateElectionResults(ElectionResults):
     def summarize_votes(self, districts_results):
         """Collects the results for a state's district elections
         """
-        self.votes_total_dem = 0
-        self.votes_total_rep = 0
-        self.votes_total_other = 0
-        self.votes_total_scattered = 0
-        self.votes_total = 0
-        self.votes_wasted_total_dem = 0
-        self.votes_wasted_total_rep = 0
-        self.votes_wasted_net = 0
+        self.districts_won_dem = []
+        self.districts_won_rep = []
+        self._districts_tied = []
+
+        for field, _ in TOTAL_FIELDS:
+            setattr(self, field, 0)
 
         for results in districts_results:
-            if not isinstance(results, DistrictElectionResults):
-                raise utils.ElectionResultsError("Object is not an instance of\
-                 DistrictElectionResults: {}".format(district))
-
-            self.votes_total_dem += results.votes_dem
-            self.votes_total_rep += results.votes_rep
-            self.votes_total_other += results.votes_other
-            self.votes_total_scattered += results.votes_scattered
-            self.votes_total += results.votes_total
-            self.votes_wasted_total_dem += results.votes_wasted_dem
-            self.votes_wasted_total_rep += results.votes_wasted_rep
-            self.votes_wasted_net += results.votes_wasted_net
-
-            if results.votes_rep > results.votes_dem:
-                self.districts_won_rep.append(results)
-            elif results.votes_dem > results.votes_rep:
-                self.districts_won_dem.append(results)
-
-            self.efficiency_gap = self.calc_eff_gap(
-                votes_total=self.votes_total,
-                votes_wasted_net=self.votes_wasted_net
-            )
+            self.add_to_totals(results, 1)
+
+        self.update_eff_gap()
+
+    def add_to_totals(self, results, sign):
+        """Adds a district's votes to the totals, or subtracts them if sign is -1, and adds it to or
+            removes it from the districts it won
+        """
+        if not isinstance(results, DistrictElectionResults):
+            raise utils.ElectionResultsError("Object is not an instance of\
+             DistrictElectionResults: {}".format(results))
+
+        if results.votes_rep > results.votes_dem:
+            districts_won = self.districts_won_rep
+        elif results.votes_dem > results.votes_rep:
+            districts_won = self.districts_won_dem
+        else:
+            districts_won = self._districts_tied
+
+        # Compared by identity since ElectionResults don't define equality
+        i = None if sign > 0 else next((i for i, d in enumerate(districts_won) if d is results), None)
+        if sign < 0 and i is None:
+            raise utils.ElectionResultsError('{} {} district {} is not in the state results'.format(
+                results.year, results.state, results.district))
+
+        # Calculated before anything is changed so the state is unchanged if they can't be
+        totals = [
+            (0 if self.votes_total is None else getattr(self, field)) + sign * getattr(results, district_field)
+            for field, district_field in TOTAL_FIELDS
+        ]
+
+        if sign > 0:
+            districts_won.append(results)
+        else:
+            districts_won.pop(i)
+
+        for (field, _), total in zip(TOTAL_FIELDS, totals):
+            setattr(self, field, total)
+
+    def update_eff_gap(self):
+        self.efficiency_gap = None if self.votes_total == 0 else self.calc_eff_gap(
+            votes_total=self.votes_total,
+            votes_wasted_net=self.votes_wasted_net
+        )
+
+    def update_metrics(self):
+        """Calculates the state's partisan metrics from its districts, e.g. for a state streamed on
+            its own. NationalElectionResults calculates those of all its states at once.
+        """
+        districts = self.districts_won_dem + self.districts_won_rep
+
+        self.set_metrics(calc_metrics(
+            state_index=[0] * len(districts),
+            number_of_states=1,
+            votes_dem=[d.votes_dem for d in districts],
+            votes_rep=[d.votes_rep for d in districts],
+            votes_wasted_net=[self.votes_wasted_net],
+            votes_total=[self.votes_total]
+        ), 0)
+
+    def set_metrics(self, metrics, i):
+        """Sets the partisan metrics from element i of the arrays returned by calc_metrics. The
+            efficiency gap is the one the state calculated.
+        """
+        for metric in METRICS:
+            if metric != 'efficiency_gap':
+                value = float(metrics[metric][i])
+                # Rounded like calc_eff_gap
+                setattr(self, metric, None if math.isnan(value) else round(value, 3))
+
+    def check_district(self, results):
+        """Raises an ElectionResultsError unless results are a district's of the state's election
+        """
+        if not isinstance(results, DistrictElectionResults):
+            raise utils.ElectionResultsError("Object is not an instance of\
+             DistrictElectionResults: {}".format(results))
+
+        if results.state != self.state or results.year != self.year:
+            raise utils.ElectionResultsError('{} {} district {} does not belong in {} {}'.format(
+                results.year, results.state, results.district, self.year, self.state))
+
+    def districts_changed(self):
+        """Updates the efficiency gap, and the metrics and national results if the state was added
+            to national results, after districts were added, removed or replaced
+        """
+        self.update_eff_gap()
+
+        if self._national_results is not None:
+            self.update_metrics()
+            self._national_results.state_changed(self)
+
+    def add_district(self, results):
+        """Adds a district's results to the state's totals without re-summarizing its other districts
+        """
+        self.check_district(results)
+        self.add_to_totals(results, 1)
+        self.districts_changed()
+
+    def remove_district(self, results):
+        """Removes a district's results, which were added to the state, from its totals. Raises an
+            ElectionResultsError if they weren't, including for districts that ended in a tie
+        """
+        self.check_district(results)
+        self.add_to_totals(results, -1)
+        self.districts_changed()
+
+    def replace_district(self, old_results, new_results):
+        """Replaces a district's results, e.g. with corrected ones. Leaves the state unchanged if
+            either can't be
+        """
+        self.check_district(old_results)
+        self.check_district(new_results)
+        self.add_to_totals(old_results, -1)
+
+        try:
+            self.add_to_totals(new_results, 1)
+        except Exception as e:
+            self.add_to_totals(old_results, 1)
+            raise e
+
+        self.districts_changed()
 
     def calc_eff_gap(self, votes_total, votes_wasted_net):
         """Calculates the efficiency gap of the election
@@ -0,0 +1,180 @@
+"""Defines a binary file format for saving NationalElectionResults of one or many years
+
+A results file is a single .npy array of int64 in Fortran order, so each column is contiguous
+and can be read from a memory map without copying. It has RESULTS_COLUMNS and the rows
+
+    a header row, holding FORMAT_MARKER in the year column, RESULTS_FORMAT_VERSION in the
+        legislative_body_code column and the number of years in the state column
+    a year row per year, in ascending order, holding the year, its legislative body code and
+        YEAR_ROW_COLUMNS in the columns from the state column on. first_row is counted from the
+        first year row
+    then for each year
+        district rows, sorted by state then district number
+        state rows, sorted by state, with district STATE_ROW
+        metric rows, sorted by state, with district METRICS_ROW
+
+A year is loaded from its year row and state rows alone. Its district columns are views of the
+file, which aren't read until they're used, and its StateElectionResults and
+DistrictElectionResults are only built for the states that are accessed. See load_results.
+
+States are stored as their index in STATE_CODES. Winners and districts that ended in a tie
+aren't stored, though ties are counted in their state's totals.
+"""
+
+import numpy as np
+import election_results.utils as utils
+from fixtures.states import states
+from election_results.frame import ResultsFrame, DISTRICT_COLUMNS, STATE_COLUMNS
+from election_results.metrics import METRICS
+from election_results.national import NationalElectionResults
+
+RESULTS_COLUMNS = ['year', 'legislative_body_code', 'state'] + DISTRICT_COLUMNS
+
+# Of a year's rows, in the columns from the state column on
+YEAR_ROW_COLUMNS = ['first_row', 'number_of_districts', 'number_of_states']
+
+# District of the rows holding a state's totals. The state totals are in the columns of the
+# district votes they total, e.g. votes_total_dem in votes_dem, and the state's number of
+# districts is in the imputed column
+STATE_ROW = 0
+STATE_TOTAL_COLUMNS = [column for column in STATE_COLUMNS if column not in METRICS]
+
+# District of the rows holding a state's METRICS, as the bits of float64s, in the columns from
+# votes_dem on
+METRICS_ROW = -1
+
+STATE_CODES = sorted(states.keys())
+
+# Bump when RESULTS_COLUMNS or the layout of the rows change, and migrate files of the previous
+# versions in read_rows
+RESULTS_FORMAT_VERSION = 1
+FORMAT_MARKER = -1
+
+
+def results_rows(national_results):
+    """Returns the district, state and metric rows of a year's results as an array with
+        RESULTS_COLUMNS
+    """
+    frame = national_results.frame
+    state_codes = np.array([STATE_CODES.index(state) for state in frame.states], dtype=np.int64)
+
+    district_rows = np.empty((len(frame), len(RESULTS_COLUMNS)), dtype=np.int64)
+    district_rows[:, 2] = state_codes[frame.state_index()]
+    for i, column in enumerate(DISTRICT_COLUMNS):
+        district_rows[:, 3 + i] = frame.districts[column]
+
+    state_rows = np.zeros((len(frame.states), len(RESULTS_COLUMNS)), dtype=np.int64)
+    state_rows[:, 2] = state_codes
+    state_rows[:, 3] = STATE_ROW
+    for i, column in enumerate(STATE_TOTAL_COLUMNS):
+        state_rows[:, 4 + i] = frame.state_totals[column]
+    state_rows[:, RESULTS_COLUMNS.index('imputed')] = frame.number_of_districts()
+
+    metric_rows = np.zeros((len(frame.states), len(RESULTS_COLUMNS)), dtype=np.int64)
+    metric_rows[:, 2] = state_codes
+    metric_rows[:, 3] = METRICS_ROW
+    for i, metric in enumerate(METRICS):
+        metric_rows[:, 4 + i] = np.asarray(frame.state_totals[metric], dtype=np.float64).view(np.int64)
+
+    rows = np.concatenate([district_rows, state_rows, metric_rows])
+    rows[:, 0] = int(national_results.year)
+    rows[:, 1] = int(national_results.legislative_body_code)
+
+    return rows
+
+
+def save_results(filepath, national_results):
+    """Saves the NationalElectionResults of one year, or a list of them for many years, to a
+        results file at filepath, which is used as is rather than given a .npy suffix
+    """
+    if isinstance(national_results, NationalElectionResults):
+        national_results = [national_results]
+
+    years = [r.year for r in national_results]
+    if len(set(years)) != len(years):
+        raise utils.ElectionResultsError('A results file holds one NationalElectionResults per year: {}'.format(years))
+
+    national_results = sorted(national_results, key=lambda r: int(r.year))
+    year_rows = [results_rows(r) for r in national_results]
+
+    header = np.zeros((1 + len(national_results), len(RESULTS_COLUMNS)), dtype=np.int64)
+    header[0, :3] = [FORMAT_MARKER, RESULTS_FORMAT_VERSION, len(national_results)]
+
+    # Counted from the first year row
+    first_row = len(national_results)
+    for i, (r, rows) in enumerate(zip(national_results, year_rows)):
+        number_of_states = len(r.frame.states)
+        header[1 + i, :5] = [int(r.year), int(r.legislative_body_code), first_row, len(rows) - 2 * number_of_states,
+            number_of_states]
+        first_row += len(rows)
+
+    # Written to an open file since np.save appends .npy to paths without it
+    with open(filepath, 'wb') as file:
+        np.save(file, np.asfortranarray(np.concatenate([header] + year_rows)))
+
+
+def year_frame(rows, year_row):
+    """Returns the ResultsFrame of a year of a results file, reading only its state and metric
+        rows. The district columns are views of rows.
+    """
+    year, legislative_body_code, first_row, number_of_districts, number_of_states = year_row[:5]
+    district_rows = rows[first_row:first_row + number_of_districts]
+    # Read into memory, since there are few
+    state_rows = np.array(rows[first_row + number_of_districts:first_row + number_of_districts + number_of_states])
+    metric_rows = np.array(rows[first_row + number_of_districts + number_of_states:
+        first_row + number_of_districts + 2 * number_of_states])
+
+    districts = dict((name, district_rows[:, 3 + i]) for i, name in enumerate(DISTRICT_COLUMNS))
+
+    state_offsets = np.zeros(number_of_states + 1, dtype=np.int64)
+    np.cumsum(state_rows[:, RESULTS_COLUMNS.index('imputed')], out=state_offsets[1:])
+
+    state_totals = dict((name, state_rows[:, 4 + i]) for i, name in enumerate(STATE_TOTAL_COLUMNS))
+    for i, metric in enumerate(METRICS):
+        state_totals[metric] = np.ascontiguousarray(metric_rows[:, 4 + i]).view(np.float64)
+
+    return ResultsFrame(str(year), str(legislative_body_code), [STATE_CODES[i] for i in state_rows[:, 2].tolist()],
+        state_offsets, districts, state_totals)
+
+
+def read_rows(filepath, mmap=True):
+    """Returns the rows of a results file without its header
+    """
+    rows = np.load(filepath, mmap_mode='r' if mmap else None)
+
+    if rows.ndim != 2 or len(rows) == 0 or rows[0, 0] != FORMAT_MARKER:
+        raise utils.ResultsFileError(filepath, 'not a results file')
+
+    version = int(rows[0, 1])
+    if version != RESULTS_FORMAT_VERSION:
+        raise utils.ResultsFileError(filepath, 'saved by results format version {}, not {}'.format(
+            version, RESULTS_FORMAT_VERSION))
+
+    if rows.shape[1] != len(RESULTS_COLUMNS):
+        raise utils.ResultsFileError(filepath, 'results format version {} should have {} columns, not {}'.format(
+            version, len(RESULTS_COLUMNS), rows.shape[1]))
+
+    return rows[1:]
+
+
+def load_results(filepath, mmap=True):
+    """Loads a results file
+
+    Attributes:
+        filepath (String) - Path of the results file
+        mmap (Bool) - Option indicating the file will be memory-mapped rather than read, so the
+            district columns of the results' frames are read from disk as they're used
+
+    Returns a dict of election years to NationalElectionResults. Their frames are read from the
+    year and state rows, and their StateElectionResults are built from the frames as they're
+    accessed. See NationalElectionResults.from_frame.
+    """
+    rows = read_rows(filepath, mmap=mmap)
+
+    if len(rows) == 0:
+        return {}
+
+    year_rows = np.array(rows[:int(rows[0, 2])])
+    frames = [year_frame(rows, year_row) for year_row in year_rows.tolist()]
+
+    return dict((frame.year, NationalElectionResults.from_frame(frame)) for frame in frames)
@@ -0,0 +1,113 @@
+"""Defines a sweep of a year's results over uniform partisan swings
+"""
+
+import numpy as np
+import election_results.utils as utils
+from election_results.district import calc_wasted_votes_arrays
+
+
+def swing_grid(low=-0.1, high=0.1, step=0.001):
+    """Returns an array of swings from low to high inclusive, e.g. the default -10 to +10 points
+        in steps of 0.1 points
+    """
+    return np.linspace(low, high, int(round((high - low) / step)) + 1)
+
+
+class SwingSweep:
+    """Holds a year's results under each of many uniform swings, computed for every swing and
+    district at once in arrays of shape (number of swings, number of districts)
+
+    A swing moves that share of each district's two-party vote from Republican to Democratic
+    candidates, or the other way if negative. Votes for other candidates and each district's
+    total aren't changed, and a party's votes don't go below 0.
+
+    Districts that ended in a tie aren't in the results' frame, so their wasted votes are the
+    same under every swing. See ResultsFrame.
+
+    Attributes:
+        swings (Array of Float) - Swings toward Democratic candidates, e.g. 0.02 for 2 points
+        states (List) - Two-letter state abbreviations in alphabetical order
+        seats_dem, seats_rep (Array of Int) - Districts won by each party per swing and state
+        votes_dem, votes_rep (Array of Int) - Votes for each party per swing and state
+        votes_wasted_net (Array of Int) - Net wasted votes per swing and state
+        votes_total (Array of Int) - Total votes of each state
+    """
+
+    __slots__ = ('swings', 'states', 'seats_dem', 'seats_rep', 'votes_dem', 'votes_rep', 'votes_wasted_net',
+        'votes_total')
+
+    def __init__(self, national_results, swings=None):
+        """Initializes a SwingSweep of a NationalElectionResults. swings defaults to swing_grid()
+        """
+        frame = national_results.frame
+        self.swings = swing_grid() if swings is None else np.asarray(swings, dtype=np.float64)
+        self.states = frame.states
+
+        votes_dem = frame.districts['votes_dem']
+        votes_rep = frame.districts['votes_rep']
+        votes_two_party = votes_dem + votes_rep
+
+        shift = np.rint(self.swings[:, np.newaxis] * votes_two_party).astype(np.int64)
+        swung_dem = np.clip(votes_dem + shift, 0, votes_two_party)
+        swung_rep = votes_two_party - swung_dem
+
+        _, _, net = calc_wasted_votes_arrays(swung_rep, swung_dem,
+            np.broadcast_to(frame.districts['votes_total'], swung_dem.shape))
+
+        # Sums each state's districts
+        states = np.zeros((len(frame), len(frame.states)), dtype=np.int64)
+        states[np.arange(len(frame)), frame.state_index()] = 1
+
+        self.seats_dem = (swung_dem > swung_rep).astype(np.int64).dot(states)
+        self.seats_rep = (swung_rep > swung_dem).astype(np.int64).dot(states)
+        self.votes_dem = swung_dem.dot(states)
+        self.votes_rep = swung_rep.dot(states)
+
+        # Net wasted votes of the districts that aren't in the frame
+        unswung_net = frame.state_totals['votes_wasted_net'] - frame.districts['votes_wasted_net'].dot(states)
+        self.votes_wasted_net = net.dot(states) + unswung_net
+        self.votes_total = frame.state_totals['votes_total']
+
+    def state_index(self, state):
+        try:
+            return self.states.index(state)
+        except ValueError:
+            raise utils.USStateError(state)
+
+    def totals(self, state=None):
+        """Returns the columns of one state, or summed over every state if state is None
+        """
+        columns = [self.seats_dem, self.seats_rep, self.votes_dem, self.votes_rep, self.votes_wasted_net]
+
+        if state is None:
+            return [c.sum(axis=1) for c in columns] + [self.votes_total.sum()]
+
+        i = self.state_index(state)
+        return [c[:, i] for c in columns] + [self.votes_total[i]]
+
+    def seats_votes_curve(self, state=None):
+        """Returns a tuple of arrays of the Democratic share of the two-party vote and of the
+            districts won per swing, of one state or of the nation if state is None
+        """
+        seats_dem, seats_rep, votes_dem, votes_rep, _, _ = self.totals(state)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return votes_dem / (votes_dem + votes_rep), seats_dem / (seats_dem + seats_rep)
+
+    def gap_curve(self, state=None):
+        """Returns an array of the efficiency gap per swing, of one state or of the nation if
+            state is None. Gaps aren't rounded.
+        """
+        _, _, _, _, votes_wasted_net, votes_total = self.totals(state)
+
+        if votes_total == 0:
+            return np.full(len(self.swings), np.nan)
+
+        return votes_wasted_net / votes_total
+
+    def efficiency_gaps(self):
+        """Returns an array of every state's efficiency gap per swing, of shape (number of swings,
+            number of states)
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.votes_wasted_net / np.where(self.votes_total == 0, np.nan, self.votes_total)
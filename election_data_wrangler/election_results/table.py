@@ -0,0 +1,76 @@
+"""Defines a table of per-state metrics with cached sort orders
+"""
+
+import numpy as np
+import election_results.utils as utils
+from election_results.metrics import METRICS
+
+
+class StateMetricsTable:
+    """Holds a column per metric with an element per state, built once from a ResultsFrame, and
+    answers ranking queries from sort orders computed the first time each is needed
+
+    Orders are descending, of the values or of their magnitudes. Ties keep the alphabetical
+    order of states and nan values come last.
+
+    Attributes:
+        frame (ResultsFrame) - The frame the table was built from
+        states (List) - Two-letter state abbreviations in alphabetical order
+        columns (Dict) - Names to arrays with an element per state: METRICS,
+            number_of_districts and seat_advantage. See ResultsFrame.seat_advantages
+    """
+
+    __slots__ = ('frame', 'states', 'columns', '_orders', '_ranks')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.states = frame.states
+
+        self.columns = dict((metric, frame.state_totals[metric]) for metric in METRICS)
+        self.columns['number_of_districts'] = frame.number_of_districts()
+        self.columns['seat_advantage'] = frame.seat_advantages()
+
+        # (column, magnitude) to arrays of state indexes in rank order, and their inverses
+        self._orders = {}
+        self._ranks = {}
+
+    def column(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise utils.ElectionResultsError('No column {} in the state metrics table'.format(name))
+
+    def order(self, name, magnitude=False):
+        """Returns an array of the indexes of states in descending order of a column, or of its
+            magnitude
+        """
+        key = (name, magnitude)
+
+        if key not in self._orders:
+            values = self.column(name)
+            self._orders[key] = np.argsort(-(np.abs(values) if magnitude else values), kind='mergesort')
+
+        return self._orders[key]
+
+    def top_k(self, name, k=None, magnitude=False):
+        """Returns a list of (state, value) tuples of the k states ranked first by a column, or of
+            every state if k is None
+        """
+        values = self.column(name)
+        return [(self.states[i], values[i].item()) for i in self.order(name, magnitude)[:k].tolist()]
+
+    def rank(self, name, state, magnitude=False):
+        """Returns the 0-based rank of a state by a column
+        """
+        key = (name, magnitude)
+
+        if key not in self._ranks:
+            order = self.order(name, magnitude)
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            self._ranks[key] = ranks
+
+        try:
+            return int(self._ranks[key][self.states.index(state)])
+        except ValueError:
+            raise utils.USStateError(state)
@@ -0,0 +1,62 @@
+"""Builds election results from the votes of their districts for tests
+"""
+
+import unittest
+from election_results.district import DistrictElectionResults
+from election_results.state import StateElectionResults
+from election_results.national import NationalElectionResults
+
+
+def district_results(state, district, votes_dem, votes_rep, votes_other=0, imputed=None, year=2014):
+    """Returns the DistrictElectionResults of a House district. An imputed district has a scattered
+        vote, like the votes HouseElectionsProcessor imputes
+    """
+    votes_scattered = 1 if imputed else 0
+
+    return DistrictElectionResults(year=year, state=state, legislative_body_code=0, district=district, data={
+        'votes_dem': votes_dem,
+        'votes_rep': votes_rep,
+        'votes_other': votes_other,
+        'votes_scattered': votes_scattered,
+        'votes_total': votes_dem + votes_rep + votes_other + votes_scattered,
+        'imputed': imputed
+    })
+
+
+def state_results(state, votes, votes_other=0, year=2014):
+    """Returns the StateElectionResults of a list of (votes_dem, votes_rep) tuples of districts
+        numbered from 1
+    """
+    return StateElectionResults(year=year, state=state, legislative_body_code=0, district_results=[
+        district_results(state, i + 1, votes_dem, votes_rep, votes_other=votes_other, year=year)
+        for i, (votes_dem, votes_rep) in enumerate(votes)
+    ])
+
+
+def national_results(votes, votes_other=0, year=2014):
+    """Returns the NationalElectionResults of a dict of two-letter state abbreviations to lists of
+        (votes_dem, votes_rep) tuples of their districts
+    """
+    return NationalElectionResults(year=year, legislative_body_code=0, state_results=dict(
+        (state, state_results(state, district_votes, votes_other=votes_other, year=year))
+        for state, district_votes in votes.items()
+    ))
+
+
+class ResultsTestCase(unittest.TestCase):
+    """A TestCase whose tests start with self.results, the NationalElectionResults of votes
+
+    Attributes:
+        votes (Dict) - Two-letter state abbreviations to lists of (votes_dem, votes_rep) tuples of
+            their districts
+        votes_other (Int) - Votes for other candidates in every district
+    """
+
+    votes = {}
+    votes_other = 0
+
+    def setUp(self):
+        self.results = national_results(self.votes, votes_other=self.votes_other)
+
+    def tearDown(self):
+        del self.results
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from election_results.bootstrap import (bootstrap_efficiency_gaps, set_confidence_intervals, confidence_interval,
+    significance)
+
+from election_results.tests.factories import ResultsTestCase
+
+class TestBootstrap(ResultsTestCase):
+
+    votes = {
+        'NY': [(60, 40), (30, 70), (55, 45), (80, 20)],
+        # Every district has the same efficiency gap
+        'AL': [(20, 80), (20, 80), (20, 80)],
+        'WY': [(30, 70)]
+    }
+
+    def test_is_reproducible_across_shards_and_processes(self):
+        bootstrap = bootstrap_efficiency_gaps(self.results, draws=300, seed=3, shard_size=100)
+
+        self.assertEqual(bootstrap['states'], ['AL', 'NY', 'WY'])
+        self.assertEqual(bootstrap['state_gaps'].shape, (300, 3))
+        self.assertEqual(bootstrap['national_gaps'].shape, (300,))
+
+        sharded = bootstrap_efficiency_gaps(self.results, draws=300, seed=3, shard_size=100, jobs=2)
+        self.assertTrue(np.array_equal(bootstrap['state_gaps'], sharded['state_gaps']))
+        self.assertTrue(np.array_equal(bootstrap['national_gaps'], sharded['national_gaps']))
+
+    def test_resamples_districts_within_states(self):
+        bootstrap = bootstrap_efficiency_gaps(self.results, draws=500, seed=0)
+        al = self.results.state_results['AL']
+        wy = self.results.state_results['WY']
+
+        self.assertTrue(np.all(bootstrap['state_gaps'][:, 0] == al.votes_wasted_net / al.votes_total))
+        self.assertTrue(np.all(bootstrap['state_gaps'][:, 2] == wy.votes_wasted_net / wy.votes_total))
+        self.assertGreater(bootstrap['state_gaps'][:, 1].std(), 0)
+
+        # Every resample of NY is one of the 35 multisets of its 4 districts
+        self.assertLessEqual(len(np.unique(bootstrap['state_gaps'][:, 1])), 35)
+
+    def test_sets_confidence_intervals(self):
+        set_confidence_intervals(self.results, bootstrap_efficiency_gaps(self.results, draws=500, seed=0))
+
+        al = self.results.state_results['AL']
+        self.assertEqual(al.efficiency_gap_interval, (al.efficiency_gap, al.efficiency_gap))
+        self.assertEqual(self.results.state_results['WY'].efficiency_gap_interval, None)
+
+        low, high = self.results.state_results['NY'].efficiency_gap_interval
+        self.assertLess(low, high)
+
+        low, high = self.results.efficiency_gap_interval
+        self.assertLessEqual(low, round(self.results.votes_wasted_net / self.results.votes_total, 3))
+        self.assertGreaterEqual(high, round(self.results.votes_wasted_net / self.results.votes_total, 3))
+
+    def test_confidence_interval(self):
+        self.assertEqual(confidence_interval(np.arange(101), 0.5).tolist(), [25, 75])
+
+    def test_significance(self):
+        self.assertEqual(significance(None), 0)
+        self.assertEqual(significance((-0.1, 0.2)), 0)
+        self.assertEqual(significance((0.05, 0.2)), 0.05)
+        self.assertEqual(significance((-0.3, -0.1)), 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from election_results.election_results import ElectionResults
 from election_results.district import DistrictElectionResults as Results
+from election_results.district import calc_wasted_votes_arrays
 import election_results.utils as utils
 
 class DistrictElectionResultsTest(unittest.TestCase):
@@ -29,6 +30,35 @@ class DistrictElectionResultsTest(unittest.TestCase):
         self.assertEqual(self.results.winner['last_name'], None)
         self.assertEqual(self.results.winner['first_name'], None)
 
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.results, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.results.foo = 1
+
+    def test_creates_winner_when_accessed(self):
+        data = {
+            'votes_dem': 120,
+            'votes_rep': 10,
+            'votes_total': 130,
+            'winner': {'party': 'dem', 'last_name': 'foo', 'first_name': 'bar'}
+        }
+        r = Results(year=2014, state='NY', legislative_body_code=0, district=1, data=data)
+
+        self.assertEqual(r._winner, ('dem', 'foo', 'bar'))
+        self.assertEqual(r.winner, {'party': 'dem', 'last_name': 'foo', 'first_name': 'bar'})
+        self.assertIs(r.winner, r.winner)
+
+        r.winner['party'] = 'rep'
+        self.assertEqual(r.winner['party'], 'rep')
+
+    def test_as_dict(self):
+        d = self.results.as_dict()
+
+        self.assertEqual(d['state'], 'NY')
+        self.assertEqual(d['votes_dem'], None)
+        self.assertEqual(d['winner']['party'], None)
+        self.assertNotIn('_winner', d)
+
     def test_sets_votes_to_0_if_row_didnt_include_votes_for_a_party(self):
         # Happens in elections where a candidate ran unopposed
         data = {
@@ -87,3 +117,53 @@ class DistrictElectionResultsTest(unittest.TestCase):
     def test_calculates_wasted_votes_raises_VotesError_if_total_votes_less_than_sum_of_reps_and_dems(self):
         self.assertRaises(utils.VotesError, self.results.calc_wasted_votes, votes_rep=58, votes_dem=43, votes_total=100)
         self.assertRaises(utils.VotesError, self.results.calc_wasted_votes, votes_rep=43, votes_dem=58, votes_total=100)
+
+    def test_calculates_wasted_votes_arrays(self):
+        votes = [(25, 75, 100), (57, 43, 100), (26, 75, 101), (58, 43, 101), (45, 43, 100), (50, 50, 100)]
+
+        votes_wasted_rep, votes_wasted_dem, votes_wasted_net = calc_wasted_votes_arrays(*zip(*votes))
+
+        for i, (votes_rep, votes_dem, votes_total) in enumerate(votes):
+            self.results.calc_wasted_votes(votes_rep=votes_rep, votes_dem=votes_dem, votes_total=votes_total)
+            self.assertEqual(votes_wasted_rep[i], self.results.votes_wasted_rep)
+            self.assertEqual(votes_wasted_dem[i], self.results.votes_wasted_dem)
+            self.assertEqual(votes_wasted_net[i], self.results.votes_wasted_net)
+
+    def test_creates_results_from_arrays(self):
+        results = Results.from_arrays(
+            year=2014,
+            legislative_body_code=0,
+            state=['NY', 'NY', 'AL'],
+            district=[1, 2, 1],
+            votes_dem=[75, 43, 0],
+            votes_rep=[25, 57, 90],
+            votes_other=[0, 0, 10],
+            votes_scattered=[0, 0, 0],
+            votes_total=[100, 100, 100]
+        )
+
+        self.assertEqual(len(results), 3)
+        for r, (state, district, votes_dem, votes_rep, votes_other) in zip(results, [('NY', 1, 75, 25, 0), ('NY', 2, 43, 57, 0), ('AL', 1, 0, 90, 10)]):
+            expected = Results(year=2014, state=state, legislative_body_code=0, district=district, data={
+                'votes_dem': votes_dem,
+                'votes_rep': votes_rep,
+                'votes_other': votes_other,
+                'votes_scattered': 0,
+                'votes_total': 100,
+                'winner': {'party': '', 'last_name': '', 'first_name': ''}
+            })
+            self.assertIsInstance(r, Results)
+            self.assertEqual(r.as_dict(), expected.as_dict())
+            self.assertIsInstance(r.votes_dem, int)
+
+    def test_validates_arrays_once(self):
+        def from_arrays(state=('NY',), district=(1,), votes_total=(100,), legislative_body_code=0):
+            return Results.from_arrays(year=2014, legislative_body_code=legislative_body_code, state=state,
+                district=district, votes_dem=[60], votes_rep=[40], votes_other=[0], votes_scattered=[0],
+                votes_total=votes_total)
+
+        self.assertRaises(utils.USStateError, from_arrays, state=['XX'])
+        self.assertRaises(utils.DistrictError, from_arrays, district=[0])
+        self.assertRaises(utils.VotesError, from_arrays, votes_total=[90])
+        self.assertRaises(utils.LegislativeBodyError, from_arrays, legislative_body_code=9)
+        self.assertEqual(Results.from_arrays(2014, 0, [], [], [], [], [], [], []), [])
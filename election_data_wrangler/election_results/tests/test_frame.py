@@ -0,0 +1,51 @@
+import numpy as np
+from election_results.national import NationalElectionResults
+from election_results.frame import ResultsFrame
+from election_results.tests.factories import ResultsTestCase
+
+class TestResultsFrame(ResultsTestCase):
+
+    votes = {'NY': [(60, 40), (30, 70), (55, 45)], 'AL': [(20, 80), (45, 55)], 'AK': [(40, 60)]}
+
+    def setUp(self):
+        super(__class__, self).setUp()
+        self.frame = self.results.frame
+
+    def test_sorts_districts_by_state(self):
+        self.assertIsInstance(self.frame, ResultsFrame)
+        self.assertEqual(self.frame.states, ['AK', 'AL', 'NY'])
+        self.assertEqual(self.frame.state_offsets.tolist(), [0, 1, 3, 6])
+        self.assertEqual(self.frame.state_index().tolist(), [0, 1, 1, 2, 2, 2])
+        self.assertEqual(self.frame.districts['district'].tolist(), [1, 1, 2, 1, 2, 3])
+        self.assertEqual(self.frame.districts['votes_dem'].tolist(), [40, 20, 45, 60, 30, 55])
+        self.assertEqual(len(self.frame), 6)
+
+    def test_state_views_share_memory(self):
+        view = self.frame.state_view('NY')
+
+        self.assertEqual(view['votes_rep'].tolist(), [40, 70, 45])
+        self.assertTrue(np.shares_memory(view['votes_rep'], self.frame.districts['votes_rep']))
+
+    def test_matches_state_results(self):
+        for i, state in enumerate(self.frame.states):
+            sr = self.results.state_results[state]
+            view = self.frame.state_view(state)
+
+            self.assertEqual(self.frame.efficiency_gaps()[i], sr.efficiency_gap)
+            self.assertEqual(self.frame.state_totals['votes_total'][i], sr.votes_total)
+            self.assertEqual(view['votes_wasted_net'].sum(), sr.votes_wasted_net)
+            self.assertEqual(self.frame.number_of_districts()[i], len(sr.districts_won_dem + sr.districts_won_rep))
+            self.assertEqual(self.frame.seat_advantages()[i], round(sr.efficiency_gap * self.frame.number_of_districts()[i], 2))
+
+    def test_is_rebuilt_when_votes_are_summarized(self):
+        self.assertIs(self.results.frame, self.frame)
+
+        self.results.summarize_votes({'NY': self.results.state_results['NY']})
+        self.assertEqual(self.results.frame.states, ['NY'])
+
+    def test_builds_empty_frame(self):
+        frame = NationalElectionResults(year=2014, legislative_body_code=0).frame
+
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.states, [])
+        self.assertEqual(frame.number_of_districts().tolist(), [])
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from election_results.state import StateElectionResults
+from election_results.national import NationalElectionResults
+from election_results.imputation import (beta_parameters, simulate_imputation, imputation_bands,
+    IMPUTATION_DISTRIBUTIONS)
+from election_results.tests.factories import district_results
+
+class TestImputation(unittest.TestCase):
+
+    def setUp(self):
+        # Imputed as HouseElectionsProcessor would from 100,000 votes
+        state_results = {
+            'NY': StateElectionResults(year=2014, state='NY', legislative_body_code=0, district_results=[
+                district_results('NY', 1, 60000, 40000),
+                district_results('NY', 2, 69999, 30000, imputed='dem_unopposed'),
+                district_results('NY', 3, 31999, 68000, imputed='rep_unopposed')
+            ]),
+            'AL': StateElectionResults(year=2014, state='AL', legislative_body_code=0, district_results=[
+                district_results('AL', 1, 20000, 80000),
+                district_results('AL', 2, 45000, 55000)
+            ])
+        }
+        self.results = NationalElectionResults(year=2014, legislative_body_code=0, state_results=state_results)
+
+    def tearDown(self):
+        del self.results
+
+    def test_beta_parameters(self):
+        for distribution in IMPUTATION_DISTRIBUTIONS.values():
+            alpha, beta = beta_parameters(distribution['mean'], distribution['interval'])
+            self.assertAlmostEqual(alpha / (alpha + beta), distribution['mean'])
+
+            draws = np.random.RandomState(0).beta(alpha, beta, size=100000)
+            low, high = np.percentile(draws, [5, 95])
+            self.assertAlmostEqual(low, distribution['interval'][0], delta=0.03)
+            self.assertAlmostEqual(high, distribution['interval'][1], delta=0.03)
+
+        self.assertRaises(ValueError, beta_parameters, 0.95, (0.05, 1))
+
+    def test_is_reproducible_across_shards_and_processes(self):
+        simulation = simulate_imputation(self.results, draws=250, seed=7, shard_size=100)
+
+        self.assertEqual(simulation['states'], ['AL', 'NY'])
+        self.assertEqual(simulation['state_gaps'].shape, (250, 2))
+        self.assertEqual(simulation['national_gaps'].shape, (250,))
+
+        sharded = simulate_imputation(self.results, draws=250, seed=7, shard_size=100, jobs=2)
+        self.assertTrue(np.array_equal(simulation['state_gaps'], sharded['state_gaps']))
+        self.assertTrue(np.array_equal(simulation['national_gaps'], sharded['national_gaps']))
+
+        other = simulate_imputation(self.results, draws=250, seed=8, shard_size=100)
+        self.assertFalse(np.array_equal(simulation['state_gaps'], other['state_gaps']))
+
+    def test_only_imputed_districts_vary(self):
+        simulation = simulate_imputation(self.results, draws=500, seed=0)
+        al = self.results.state_results['AL']
+        ny = self.results.state_results['NY']
+
+        self.assertTrue(np.all(simulation['state_gaps'][:, 0] == al.votes_wasted_net / al.votes_total))
+        self.assertGreater(simulation['state_gaps'][:, 1].std(), 0)
+        self.assertAlmostEqual(np.median(simulation['state_gaps'][:, 1]), ny.efficiency_gap, delta=0.05)
+
+    def test_bands_collapse_to_imputed_shares(self):
+        distributions = dict(
+            (rule, {'mean': d['mean'], 'interval': (d['mean'] - 0.00001, d['mean'] + 0.00001)})
+            for rule, d in IMPUTATION_DISTRIBUTIONS.items()
+        )
+        bands = imputation_bands(simulate_imputation(self.results, draws=100, seed=0, distributions=distributions))
+
+        self.assertEqual(list(bands['states'].keys()), ['AL', 'NY'])
+        for state, band in bands['states'].items():
+            self.assertEqual(len(band), 3)
+            for gap in band:
+                self.assertAlmostEqual(gap, self.results.state_results[state].efficiency_gap, places=3)
+
+        for gap in bands['national']:
+            self.assertAlmostEqual(gap, self.results.votes_wasted_net / self.results.votes_total, places=3)
+
+    def test_bands_are_around_shares_of_imputation_rules(self):
+        rules = {
+            'rep_unopposed': {'votes_rep': 0.75, 'votes_dem': 0.25},
+            'dem_unopposed': {'votes_rep': 0.2, 'votes_dem': 0.8}
+        }
+        ny = StateElectionResults(year=2014, state='NY', legislative_body_code=0, district_results=[
+            district_results('NY', 1, 60000, 40000),
+            district_results('NY', 2, 79999, 20000, imputed='dem_unopposed'),
+            district_results('NY', 3, 24999, 75000, imputed='rep_unopposed')
+        ])
+        results = NationalElectionResults(year=2014, legislative_body_code=0, state_results={'NY': ny})
+
+        simulation = simulate_imputation(results, draws=500, seed=0, imputation_rules=rules)
+        self.assertAlmostEqual(np.median(simulation['state_gaps'][:, 0]), ny.efficiency_gap, delta=0.02)
+
+        distributions = dict(
+            (rule, {'mean': d['mean'], 'interval': (d['mean'] - 0.00001, d['mean'] + 0.00001)})
+            for rule, d in IMPUTATION_DISTRIBUTIONS.items()
+        )
+        bands = imputation_bands(simulate_imputation(results, draws=100, seed=0, imputation_rules=rules,
+            distributions=distributions))
+        for gap in bands['states']['NY']:
+            self.assertAlmostEqual(gap, ny.efficiency_gap, places=3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import unittest
+import numpy as np
+from election_results.metrics import calc_metrics, METRICS
+from election_results.national import NationalElectionResults
+from election_results.tests.factories import ResultsTestCase, state_results
+
+class TestMetrics(ResultsTestCase):
+
+    votes = {'NY': [(70, 30), (40, 60), (45, 55), (80, 20)], 'MA': [(60, 40), (75, 25)], 'WY': [(30, 70)]}
+
+    def test_calc_metrics(self):
+        metrics = calc_metrics(
+            state_index=[0, 0, 0, 0, 1],
+            number_of_states=3,
+            votes_dem=[70, 40, 45, 80, 60],
+            votes_rep=[30, 60, 55, 20, 40],
+            votes_wasted_net=[-10, 20, 0],
+            votes_total=[400, 100, 0]
+        )
+
+        self.assertEqual(sorted(metrics.keys()), sorted(METRICS))
+        self.assertEqual(metrics['efficiency_gap'][:2].tolist(), [-0.025, 0.2])
+        self.assertAlmostEqual(metrics['mean_median'][0], 0.5875 - 0.575)
+        self.assertAlmostEqual(metrics['partisan_bias'][0], 0)
+        self.assertAlmostEqual(metrics['declination'][0], 2 * (math.atan(1) - math.atan(0.3)) / math.pi)
+
+        self.assertEqual(metrics['mean_median'][1], 0)
+        self.assertEqual(metrics['partisan_bias'][1], 0)
+
+        # Not defined for a state a party won no districts of, or one without districts
+        self.assertTrue(np.isnan(metrics['declination'][1]))
+        for metric in METRICS:
+            self.assertTrue(np.isnan(metrics[metric][2]))
+
+    def test_declination_follows_warrington(self):
+        # Equations (1) and (2) of Warrington, "Quantifying Gerrymandering Using the Vote
+        # Distribution" (2018): theta_D = arctan((2 * y_D - 1) / (d / N)), theta_R =
+        # arctan((1 - 2 * y_R) / (r / N)) and declination = 2 * (theta_D - theta_R) / pi
+        shares = [0.92, 0.88, 0.81, 0.45, 0.44, 0.42, 0.41, 0.40, 0.39, 0.38]
+        y_dem = sum(shares[:3]) / 3
+        y_rep = sum(shares[3:]) / 7
+        expected = 2 * (math.atan((2 * y_dem - 1) / 0.3) - math.atan((1 - 2 * y_rep) / 0.7)) / math.pi
+
+        metrics = calc_metrics(
+            state_index=[0] * 10 + [1] * 10,
+            number_of_states=2,
+            votes_dem=[int(s * 100) for s in shares] + [100 - int(s * 100) for s in shares],
+            votes_rep=[100 - int(s * 100) for s in shares] + [int(s * 100) for s in shares],
+            votes_wasted_net=[0, 0],
+            votes_total=[1000, 1000]
+        )
+
+        self.assertAlmostEqual(metrics['declination'][0], expected)
+
+        # Packing Democrats favors Republicans, and swapping the parties negates it
+        self.assertAlmostEqual(metrics['declination'][1], -expected)
+
+        # A distribution symmetric about 50 percent has no declination
+        symmetric = calc_metrics([0] * 4, 1, [70, 60, 40, 30], [30, 40, 60, 70], [0], [400])
+        self.assertAlmostEqual(symmetric['declination'][0], 0)
+
+    def test_sets_metrics_of_state_results(self):
+        ny = self.results.state_results['NY']
+
+        self.assertEqual(ny.mean_median, 0.013)
+        self.assertEqual(ny.partisan_bias, 0)
+        self.assertEqual(ny.declination, 0.314)
+        self.assertEqual(self.results.state_results['MA'].declination, None)
+        self.assertEqual(self.results.state_results['WY'].partisan_bias, 0)
+        self.assertIn('declination', ny.as_dict())
+
+        frame = self.results.frame
+        self.assertEqual(frame.state_totals['mean_median'].tolist(), [0, 0.013, 0])
+        self.assertEqual(frame.state_totals['efficiency_gap'].tolist(), frame.efficiency_gaps().tolist())
+
+    def test_updates_metrics_of_upserted_state(self):
+        self.results.upsert_state(state_results('MA', [(60, 40), (45, 55)]))
+
+        self.assertEqual(self.results.state_results['MA'].declination, round(2 * (math.atan(0.4) - math.atan(0.2)) / math.pi, 3))
+
+    def test_upsert_only_updates_upserted_state(self):
+        results = NationalElectionResults.from_frame(self.results.frame)
+        frame = results.frame
+        # Left alone unless the other states' metrics are recalculated
+        frame.state_totals['mean_median'][1] = 1
+
+        ma = state_results('MA', [(60, 40), (45, 55)])
+        results.upsert_state(ma)
+
+        self.assertIs(results.frame, frame)
+        self.assertEqual(results.state_results.built(), [ma])
+        self.assertEqual(frame.state_totals['mean_median'].tolist(), [ma.mean_median, 1, 0])
+        self.assertEqual(frame.state_totals['declination'][0], ma.declination)
+        self.assertEqual(frame.state_view('MA')['votes_dem'].tolist(), [60, 45])
+        self.assertEqual(results.metrics_table.top_k('mean_median', 1), [('NY', 1)])
+
+        # A state whose number of districts changed is rebuilt with the frame
+        results.upsert_state(state_results('MA', [(60, 40)]))
+        self.assertIsNot(results.frame, frame)
+        self.assertEqual(results.frame.number_of_districts().tolist(), [1, 4, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -92,3 +92,52 @@ class TestNationalElectionResults(unittest.TestCase):
             'votes_wasted_net': 0
         })
         self.assertRaises(utils.ElectionResultsError, self.results.summarize_votes, {'AL': s})
+
+    def test_upserts_states(self):
+        def state_results(state, votes_total_dem, votes_total_rep):
+            return StateElectionResults(year='2016', state=state, legislative_body_code=0, data={
+                'votes_total_dem': votes_total_dem,
+                'votes_total_rep': votes_total_rep,
+                'votes_total_other': 0,
+                'votes_total_scattered': 0,
+                'votes_total': votes_total_dem + votes_total_rep,
+                'votes_wasted_total_dem': 10,
+                'votes_wasted_total_rep': 20,
+                'votes_wasted_net': -10
+            })
+
+        self.results.upsert_state(state_results('AL', 100, 150))
+        self.results.upsert_state(state_results('AK', 80, 120))
+        self.assertEqual(self.results.votes_total_dem, 180)
+        self.assertEqual(self.results.votes_wasted_net, -20)
+        self.assertEqual(sorted(self.results.state_results.keys()), ['AK', 'AL'])
+
+        al = state_results('AL', 200, 150)
+        self.results.upsert_state(al)
+        self.assertIs(self.results.state_results['AL'], al)
+        self.assertEqual(self.results.votes_total_dem, 280)
+        self.assertEqual(self.results.votes_total, 550)
+        self.assertEqual(self.results.votes_wasted_net, -20)
+
+        # A state changed in place is upserted again
+        al.votes_total_dem = 100
+        al.votes_total = 250
+        self.results.upsert_state(al)
+        self.assertEqual(self.results.votes_total_dem, 180)
+        self.assertEqual(self.results.votes_total, 450)
+        self.assertEqual(self.results.frame.states, ['AK', 'AL'])
+
+    def test_upsert_keeps_totals_if_state_does_not_belong(self):
+        s = StateElectionResults(year='2015', state='AL', legislative_body_code=0, data={
+            'votes_total_dem': 1,
+            'votes_total_rep': 0,
+            'votes_total_other': 0,
+            'votes_total_scattered': 0,
+            'votes_total': 1,
+            'votes_wasted_total_dem': 0,
+            'votes_wasted_total_rep': 0,
+            'votes_wasted_net': 0
+        })
+        self.assertRaises(utils.ElectionResultsError, self.results.upsert_state, s)
+        self.assertEqual(self.results.votes_total, 0)
+        self.assertEqual(self.results.state_results, {})
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import election_results.utils as utils
+from election_results.storage import save_results
+from election_results.panel import ElectionPanel
+from election_results.tests.factories import national_results
+
+class TestElectionPanel(unittest.TestCase):
+
+    def setUp(self):
+        self.results = [
+            national_results({'NY': [(60, 40), (30, 70)], 'AL': [(20, 80), (45, 55)]}, year=2016),
+            national_results({'NY': [(50, 49), (30, 70)], 'AK': [(40, 60)]}, year=2012),
+            national_results({'NY': [(70, 30), (35, 65)], 'AL': [(25, 75), (40, 60)]}, year=2014)
+        ]
+        self.panel = ElectionPanel(self.results)
+
+    def tearDown(self):
+        del self.panel
+
+    def test_indexes_years_states_and_districts(self):
+        self.assertEqual(self.panel.years, [2012, 2014, 2016])
+        self.assertEqual(self.panel.year_offsets.tolist(), [0, 3, 7, 11])
+        self.assertEqual(self.panel.districts['year'][self.panel.year_slice(2014)].tolist(), [2014] * 4)
+
+        d = self.panel.district(2014, 'NY', 2)
+        self.assertEqual((d['votes_dem'], d['votes_rep']), (35, 65))
+        self.assertEqual(d['votes_wasted_net'], self.results[2].state_results['NY'].districts_won_rep[0].votes_wasted_net)
+
+        self.assertRaises(KeyError, self.panel.district, 2014, 'AK', 1)
+        self.assertRaises(utils.ElectionResultsError, self.panel.year_slice, 2010)
+
+    def test_gets_state_time_series(self):
+        years, gaps = self.panel.state_time_series('NY')
+
+        self.assertEqual(years.tolist(), [2012, 2014, 2016])
+        self.assertEqual(gaps.tolist(), [self.results[i].state_results['NY'].efficiency_gap for i in [1, 2, 0]])
+
+        years, votes = self.panel.state_time_series('AL', column='votes_total_dem')
+        self.assertEqual(years.tolist(), [2014, 2016])
+        self.assertEqual(votes.tolist(), [65, 65])
+
+        self.assertEqual(sorted(self.panel.gaps_vs_year().keys()), ['AK', 'AL', 'NY'])
+        self.assertEqual(self.panel.gaps_vs_year()['AK'], [(2012, self.results[1].state_results['AK'].efficiency_gap)])
+
+    def test_finds_districts_above_threshold(self):
+        above = self.panel.districts_above(20, column='votes_wasted_dem')
+
+        self.assertEqual(list(zip(above['year'].tolist(), above['state'].tolist(), above['district'].tolist())), [
+            (2012, 'AK', 1), (2012, 'NY', 2), (2014, 'AL', 1), (2014, 'AL', 2), (2014, 'NY', 2),
+            (2016, 'AL', 2), (2016, 'NY', 2)
+        ])
+        self.assertTrue((above['votes_wasted_dem'] > 20).all())
+
+        above = self.panel.districts_above(20, column='votes_wasted_net', magnitude=True)
+        expected = sorted(
+            (int(r.year), d.state, int(d.district))
+            for r in self.results
+            for sr in r.state_results.values()
+            for d in sr.districts_won_dem + sr.districts_won_rep
+            if abs(d.votes_wasted_net) > 20
+        )
+        self.assertEqual(list(zip(above['year'].tolist(), above['state'].tolist(), above['district'].tolist())), expected)
+        self.assertIn(-49, above['votes_wasted_net'].tolist())
+
+    def test_calculates_year_over_year_deltas(self):
+        deltas = self.panel.year_over_year(column='votes_total_dem')
+
+        self.assertEqual(deltas['state'].tolist(), ['AL', 'NY', 'NY'])
+        self.assertEqual(deltas['year'].tolist(), [2016, 2014, 2016])
+        self.assertEqual(deltas['previous_year'].tolist(), [2014, 2012, 2014])
+        self.assertEqual(deltas['delta'].tolist(), [0, 25, -15])
+
+    def test_loads_results_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filepath = os.path.join(directory, 'results.npy')
+            save_results(filepath, self.results)
+            panel = ElectionPanel.load(filepath)
+
+            self.assertEqual(panel.years, self.panel.years)
+            self.assertEqual(panel.district_keys.tolist(), self.panel.district_keys.tolist())
+            self.assertEqual(panel.gaps_vs_year(), self.panel.gaps_vs_year())
+        finally:
+            shutil.rmtree(directory)
@@ -2,6 +2,7 @@ import unittest
 from election_results.election_results import ElectionResults
 from election_results.state import StateElectionResults
 from election_results.district import DistrictElectionResults
+import election_results.utils as utils
 
 class StateElectionResultsTest(unittest.TestCase):
 
@@ -132,3 +133,89 @@ class StateElectionResultsTest(unittest.TestCase):
         self.assertEqual(self.results.efficiency_gap, 0.202)
         self.assertEqual(len(self.results.districts_won_rep), 3)
         self.assertEqual(len(self.results.districts_won_dem), 2)
+
+    def test_adds_and_removes_districts(self):
+        def district_results(district, votes_dem, votes_rep):
+            return DistrictElectionResults(year=2014, state='NY', legislative_body_code=0, district=district, data={
+                'votes_dem': votes_dem,
+                'votes_rep': votes_rep,
+                'votes_total': votes_dem + votes_rep
+            })
+
+        dist1 = district_results(1, 75, 25)
+        dist2 = district_results(2, 40, 60)
+        dist3 = district_results(3, 43, 57)
+
+        self.results.add_district(dist1)
+        self.results.add_district(dist2)
+        self.results.add_district(dist3)
+        summarized = StateElectionResults(year=2014, state='NY', legislative_body_code=0, district_results=[dist1, dist2, dist3])
+
+        for field in ['votes_total_dem', 'votes_total', 'votes_wasted_total_rep', 'votes_wasted_net', 'efficiency_gap']:
+            self.assertEqual(getattr(self.results, field), getattr(summarized, field))
+        self.assertEqual(self.results.districts_won_rep, [dist2, dist3])
+
+        corrected = district_results(3, 57, 43)
+        self.results.replace_district(dist3, corrected)
+        self.assertEqual(self.results.districts_won_dem, [dist1, corrected])
+        self.assertEqual(self.results.districts_won_rep, [dist2])
+
+        self.results.remove_district(dist1)
+        summarized = StateElectionResults(year=2014, state='NY', legislative_body_code=0, district_results=[dist2, corrected])
+        self.assertEqual(self.results.votes_total_rep, summarized.votes_total_rep)
+        self.assertEqual(self.results.votes_wasted_net, summarized.votes_wasted_net)
+        self.assertEqual(self.results.efficiency_gap, summarized.efficiency_gap)
+
+    def test_raises_exception_if_district_isnt_in_state(self):
+        dist = DistrictElectionResults(year=2014, state='AL', legislative_body_code=0, district=1, data={
+            'votes_dem': 60,
+            'votes_rep': 40,
+            'votes_total': 100
+        })
+
+        self.assertRaises(utils.ElectionResultsError, self.results.add_district, dist)
+        self.assertRaises(utils.ElectionResultsError, self.results.remove_district, dist)
+        self.assertEqual(self.results.votes_total, None)
+
+    def test_removes_only_tied_districts_in_state(self):
+        def district_results(district, votes_dem, votes_rep):
+            return DistrictElectionResults(year=2014, state='NY', legislative_body_code=0, district=district, data={
+                'votes_dem': votes_dem,
+                'votes_rep': votes_rep,
+                'votes_total': votes_dem + votes_rep
+            })
+
+        tie = district_results(1, 50, 50)
+        self.results.add_district(district_results(2, 60, 40))
+
+        self.assertRaises(utils.ElectionResultsError, self.results.remove_district, tie)
+        self.assertEqual(self.results.votes_total, 100)
+
+        self.results.add_district(tie)
+        self.assertEqual(self.results.votes_total, 200)
+        self.results.remove_district(tie)
+        self.assertEqual(self.results.votes_total, 100)
+
+    def test_replace_district_leaves_state_unchanged_if_it_fails(self):
+        def district_results(state, district, votes_dem, votes_rep):
+            return DistrictElectionResults(year=2014, state=state, legislative_body_code=0, district=district, data={
+                'votes_dem': votes_dem,
+                'votes_rep': votes_rep,
+                'votes_total': votes_dem + votes_rep
+            })
+
+        dist = district_results('NY', 1, 60, 40)
+        self.results.add_district(dist)
+        before = self.results.as_dict()
+
+        self.assertRaises(utils.ElectionResultsError, self.results.replace_district, dist, district_results('AL', 1, 40, 60))
+        self.assertRaises(utils.ElectionResultsError, self.results.replace_district, district_results('NY', 1, 60, 40),
+            district_results('NY', 1, 40, 60))
+
+        # Fails while it's added to the totals, after the old district was removed
+        broken = district_results('NY', 1, 40, 60)
+        broken.votes_wasted_net = None
+        self.assertRaises(TypeError, self.results.replace_district, dist, broken)
+
+        self.assertEqual(self.results.as_dict(), before)
+        self.assertEqual(self.results.districts_won_dem, [dist])
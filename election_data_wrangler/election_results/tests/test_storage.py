@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import election_results.utils as utils
+from election_results.national import NationalElectionResults
+from election_results.storage import save_results, load_results, RESULTS_COLUMNS, RESULTS_FORMAT_VERSION
+from election_results.tests.factories import national_results
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.dir, 'results.npy')
+        self.results = [
+            national_results({'NY': [(60, 40), (30, 70), (55, 45)], 'AL': [(20, 80), (45, 55)]}, votes_other=5),
+            national_results({'NY': [(50, 49), (30, 70)], 'AK': [(40, 60)]}, votes_other=5, year=2012)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertSameResults(self, results, expected):
+        self.assertEqual(results.year, expected.year)
+        self.assertEqual(sorted(results.state_results.keys()), sorted(expected.state_results.keys()))
+
+        for field in ['votes_total_dem', 'votes_total_rep', 'votes_total_other', 'votes_total', 'votes_wasted_net']:
+            self.assertEqual(getattr(results, field), getattr(expected, field))
+
+        for state, expected_state_results in expected.state_results.items():
+            state_results = results.state_results[state]
+            self.assertEqual(state_results.efficiency_gap, expected_state_results.efficiency_gap)
+            self.assertEqual(state_results.votes_wasted_total_rep, expected_state_results.votes_wasted_total_rep)
+            self.assertEqual(state_results.mean_median, expected_state_results.mean_median)
+            self.assertEqual(state_results.declination, expected_state_results.declination)
+            # Winners aren't saved
+            self.assertEqual(
+                [dict(d.as_dict(), winner=None) for d in state_results.districts_won_dem + state_results.districts_won_rep],
+                [dict(d.as_dict(), winner=None) for d in expected_state_results.districts_won_dem + expected_state_results.districts_won_rep]
+            )
+
+    def test_saves_and_loads_many_years(self):
+        save_results(self.filepath, self.results)
+        loaded = load_results(self.filepath)
+
+        self.assertEqual(sorted(loaded.keys()), ['2012', '2014'])
+        self.assertSameResults(loaded['2014'], self.results[0])
+        self.assertSameResults(loaded['2012'], self.results[1])
+
+    def test_frame_columns_are_views_of_memory_map(self):
+        save_results(self.filepath, self.results)
+        rows = np.load(self.filepath, mmap_mode='r')
+        frame = load_results(self.filepath)['2014'].frame
+
+        self.assertTrue(rows.flags['F_CONTIGUOUS'])
+        self.assertEqual(rows.shape[1], len(RESULTS_COLUMNS))
+        self.assertIsInstance(frame.districts['votes_dem'], np.memmap)
+        self.assertEqual(frame.districts['votes_dem'].tolist(), self.results[0].frame.districts['votes_dem'].tolist())
+        self.assertEqual(frame.state_offsets.tolist(), self.results[0].frame.state_offsets.tolist())
+        self.assertEqual(frame.efficiency_gaps().tolist(), self.results[0].frame.efficiency_gaps().tolist())
+
+    def test_builds_state_results_as_they_are_accessed(self):
+        save_results(self.filepath, self.results)
+        loaded = load_results(self.filepath)['2014']
+
+        self.assertEqual(loaded.state_results.built(), [])
+        self.assertEqual(sorted(loaded.state_results), ['AL', 'NY'])
+        self.assertEqual(loaded.votes_total, self.results[0].votes_total)
+        self.assertEqual(loaded.metrics_table.top_k('number_of_districts'), [('NY', 3), ('AL', 2)])
+        self.assertEqual(loaded.state_results.built(), [])
+
+        ny = loaded.state_results['NY']
+        self.assertEqual(loaded.state_results.built(), [ny])
+        self.assertIs(loaded.state_results['NY'], ny)
+        self.assertEqual(ny.partisan_bias, self.results[0].state_results['NY'].partisan_bias)
+
+        # Changing a state rebuilds the frame from every state
+        ny.remove_district(ny.districts_won_dem[0])
+        self.assertEqual(loaded.frame.number_of_districts().tolist(), [2, 2])
+        self.assertEqual(loaded.votes_total, self.results[0].votes_total - 105)
+
+    def test_saves_to_the_path_given(self):
+        filepath = os.path.join(self.dir, 'results.bin')
+        save_results(filepath, self.results)
+
+        self.assertEqual(os.listdir(self.dir), ['results.bin'])
+        self.assertSameResults(load_results(filepath)['2012'], self.results[1])
+
+    def test_saves_and_loads_imputed_districts(self):
+        self.results[0].state_results['AL'].districts_won_rep[0].imputed = 'rep_unopposed'
+        self.results[0].summarize_votes(self.results[0].state_results)
+        save_results(self.filepath, self.results[0])
+        loaded = load_results(self.filepath)['2014']
+
+        self.assertEqual(loaded.state_results['AL'].districts_won_rep[0].imputed, 'rep_unopposed')
+        self.assertEqual(loaded.frame.districts['imputed'].tolist(), [1, 0, 0, 0, 0])
+        self.assertSameResults(loaded, self.results[0])
+
+    def test_saves_and_loads_one_year(self):
+        self.results[0].save(self.filepath)
+
+        self.assertSameResults(NationalElectionResults.load(self.filepath), self.results[0])
+        self.assertSameResults(NationalElectionResults.load(self.filepath, year=2014, mmap=False), self.results[0])
+        self.assertRaises(utils.ElectionResultsError, NationalElectionResults.load, self.filepath, year=2016)
+
+    def test_raises_exception_for_duplicate_years(self):
+        self.assertRaises(utils.ElectionResultsError, save_results, self.filepath, [self.results[0], self.results[0]])
+
+    def test_raises_exception_for_unknown_versions(self):
+        save_results(self.filepath, self.results)
+        rows = np.load(self.filepath)
+        rows[0, 1] = RESULTS_FORMAT_VERSION + 1
+        np.save(self.filepath, rows)
+
+        self.assertRaises(utils.ResultsFileError, load_results, self.filepath)
+
+        np.save(self.filepath, np.zeros((2, 4), dtype=np.int64))
+        self.assertRaises(utils.ResultsFileError, load_results, self.filepath)
+
+        np.save(self.filepath, np.zeros(3, dtype=np.int64))
+        self.assertRaises(utils.ResultsFileError, load_results, self.filepath)
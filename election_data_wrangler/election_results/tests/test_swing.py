@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import election_results.utils as utils
+from election_results.swing import SwingSweep, swing_grid
+from election_results.tests.factories import ResultsTestCase, state_results
+
+class TestSwingSweep(ResultsTestCase):
+
+    votes = {'NY': [(60, 40), (30, 70), (52, 48)], 'AL': [(20, 80), (45, 55)]}
+    votes_other = 10
+
+    def setUp(self):
+        super(__class__, self).setUp()
+        self.swings = [-0.1, -0.03, 0, 0.06, 1]
+        self.sweep = SwingSweep(self.results, self.swings)
+
+    def test_swing_grid(self):
+        grid = swing_grid()
+
+        self.assertEqual(len(grid), 201)
+        self.assertEqual(grid[0], -0.1)
+        self.assertEqual(grid[100], 0)
+        self.assertEqual(grid[-1], 0.1)
+        self.assertEqual(len(swing_grid(-0.05, 0.05, 0.01)), 11)
+
+    def test_matches_results_without_swing(self):
+        self.assertEqual(self.sweep.states, ['AL', 'NY'])
+
+        for state, sr in self.results.state_results.items():
+            i = self.sweep.state_index(state)
+            self.assertEqual(self.sweep.votes_wasted_net[2, i], sr.votes_wasted_net)
+            self.assertEqual(self.sweep.seats_dem[2, i], len(sr.districts_won_dem))
+            self.assertEqual(round(self.sweep.gap_curve(state)[2], 3), sr.efficiency_gap)
+
+        self.assertEqual(self.sweep.gap_curve()[2], self.results.votes_wasted_net / self.results.votes_total)
+        self.assertRaises(utils.USStateError, self.sweep.gap_curve, 'XX')
+
+    def test_matches_results_rebuilt_per_swing(self):
+        for i, swing in enumerate(self.swings):
+            for state, votes in self.votes.items():
+                swung = []
+                for votes_dem, votes_rep in votes:
+                    votes_swung = min(max(votes_dem + int(round(swing * (votes_dem + votes_rep))), 0), votes_dem + votes_rep)
+                    swung.append((votes_swung, votes_dem + votes_rep - votes_swung))
+
+                sr = state_results(state, swung, votes_other=self.votes_other)
+                j = self.sweep.state_index(state)
+
+                self.assertEqual(self.sweep.votes_wasted_net[i, j], sr.votes_wasted_net)
+                self.assertEqual(self.sweep.seats_dem[i, j], len(sr.districts_won_dem))
+                self.assertEqual(self.sweep.seats_rep[i, j], len(sr.districts_won_rep))
+                self.assertEqual(self.sweep.efficiency_gaps()[i, j], sr.votes_wasted_net / sr.votes_total)
+
+    def test_seats_votes_curve(self):
+        votes_share, seats_share = self.sweep.seats_votes_curve()
+
+        self.assertTrue(np.all(np.diff(votes_share) > 0))
+        self.assertTrue(np.all(np.diff(seats_share) >= 0))
+        self.assertEqual(votes_share[2], 207 / 500)
+        self.assertEqual(seats_share[2], 2 / 5)
+        self.assertEqual((votes_share[-1], seats_share[-1]), (1, 1))
+
+        votes_share, seats_share = self.sweep.seats_votes_curve('AL')
+        self.assertEqual(seats_share.tolist(), [0, 0, 0, 0.5, 1])
+
+if __name__ == '__main__':
+    unittest.main()
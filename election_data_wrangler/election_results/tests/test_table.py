@@ -0,0 +1,64 @@
+import unittest
+import election_results.utils as utils
+from election_results.table import StateMetricsTable
+from election_results.tests.factories import ResultsTestCase, district_results, state_results
+
+class TestStateMetricsTable(ResultsTestCase):
+
+    votes = {'NY': [(60, 40), (30, 70), (55, 45)], 'AL': [(20, 80), (45, 55)], 'AK': [(40, 60)], 'WY': [(30, 70)]}
+
+    def setUp(self):
+        super(__class__, self).setUp()
+        self.table = self.results.metrics_table
+
+    def test_is_cached_until_frame_is_rebuilt(self):
+        self.assertIsInstance(self.table, StateMetricsTable)
+        self.assertIs(self.results.metrics_table, self.table)
+
+        self.results.upsert_state(state_results('AK', [(70, 30)]))
+        self.assertIsNot(self.results.metrics_table, self.table)
+        self.assertEqual(self.results.metrics_table.column('efficiency_gap')[0], -0.11)
+
+    def test_is_rebuilt_when_districts_of_a_state_change(self):
+        ak = self.results.state_results['AK']
+        votes_total = self.results.votes_total
+        ak.add_district(district_results('AK', 2, 70, 30))
+
+        self.assertEqual(self.results.votes_total, votes_total + 100)
+        self.assertEqual(self.results.frame.number_of_districts().tolist(), [2, 2, 3, 1])
+        self.assertIsNot(self.results.metrics_table, self.table)
+        self.assertEqual(self.results.metrics_table.column('efficiency_gap')[0], ak.efficiency_gap)
+        self.assertEqual(self.results.metrics_table.rank('number_of_districts', 'AK'), 1)
+        self.assertEqual(self.results.frame.state_totals['declination'][0], ak.declination)
+
+        # A state replaced by another no longer changes the national results
+        self.results.upsert_state(state_results('AK', [(40, 60)]))
+        ak.add_district(district_results('AK', 3, 70, 30))
+        self.assertEqual(self.results.votes_total, votes_total)
+
+    def test_top_k(self):
+        gaps = dict((state, sr.efficiency_gap) for state, sr in self.results.state_results.items())
+
+        self.assertEqual(self.table.top_k('efficiency_gap'), sorted(gaps.items(), key=lambda t: -t[1]))
+        self.assertEqual(self.table.top_k('efficiency_gap', 2), sorted(gaps.items(), key=lambda t: -t[1])[:2])
+        self.assertEqual(
+            self.table.top_k('efficiency_gap', 3, magnitude=True),
+            sorted(gaps.items(), key=lambda t: -abs(t[1]))[:3]
+        )
+
+        # Ties keep the order of states
+        self.assertEqual(self.table.top_k('number_of_districts'), [('NY', 3), ('AL', 2), ('AK', 1), ('WY', 1)])
+        self.assertEqual(self.table.top_k('number_of_districts', 0), [])
+
+    def test_rank(self):
+        self.assertEqual(self.table.rank('number_of_districts', 'NY'), 0)
+        self.assertEqual(self.table.rank('number_of_districts', 'WY'), 3)
+
+        for i, (state, _) in enumerate(self.table.top_k('seat_advantage', magnitude=True)):
+            self.assertEqual(self.table.rank('seat_advantage', state, magnitude=True), i)
+
+        self.assertRaises(utils.USStateError, self.table.rank, 'efficiency_gap', 'CA')
+        self.assertRaises(utils.ElectionResultsError, self.table.top_k, 'votes_total')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,3 +63,11 @@ class DistrictError(ElectionResultsError):
         msg = "Invalid district number {}".format(district)
         super(__class__, self).__init__(msg)
         self.district = district
+
+class ResultsFileError(ElectionResultsError):
+    """Exception for errors raised in reading results files. See election_results/storage.py
+    """
+
+    def __init__(self, filepath, msg):
+        super(__class__, self).__init__('{}: {}'.format(filepath, msg))
+        self.filepath = filepath
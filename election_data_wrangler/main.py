@@ -2,122 +2,114 @@
 
 import os
 import sys
+import time
 import config
-import operator
+import numpy as np
 import election_results.utils as utils
-from processor.house_election_results import HouseElectionsProcessor
+from election_results.state import StateElectionResults
+from processor.house_election_results import HouseElectionsProcessor, IMPUTATION_RULES
+from processor.columnar_house_election_results import ColumnarHouseElectionsProcessor
+from processor.chunked_house_election_results import ChunkedHouseElectionsProcessor
+from processor.batch import process_election_years, process_election_year, year_from_filepath
+from processor.cache import ResultsCache, DEFAULT_MAX_SIZE
+from processor.compression import is_results_file, RESULTS_FILE_EXTENSIONS
+from processor.audit import audit_election_results, summarize_audit, write_audit_report
+from election_results.storage import save_results
+from db.loader import load_state_results, create_unique_indexes, delete_states, LoadReport
+from db.pipeline import pipelined_ingest
+from db.parallel import connection_pool, parallel_load
+from election_results.imputation import simulate_imputation, imputation_bands, DEFAULT_PERCENTILES
+from election_results.bootstrap import bootstrap_efficiency_gaps, set_confidence_intervals, significance
 
 
 def print_states_and_properties(results):
     for state in results.state_results:
         state_results = results.state_results[state]
         print('\nstate: {}'.format(state))
-        for field in state_results.__dict__:
-            print('{}: {}'.format(field, state_results.__dict__[field]))
+        fields = state_results.as_dict()
+        for field in fields:
+            print('{}: {}'.format(field, fields[field]))
 
 
 def get_states_and_eff_gaps(results):
-    return [
-        (
-            state_results.state,
-            state_results.efficiency_gap
-        )
-        for state_results in results.state_results.values()
-    ]
-
-
-def get_number_of_dists(state_results):
-    return len(
-        state_results.districts_won_rep +
-        state_results.districts_won_dem
-    )
+    table = results.metrics_table
+    return list(zip(table.states, table.column('efficiency_gap').tolist()))
 
 
 def get_states_and_number_of_districts(results):
-    state_results_dict = results.state_results
-    return [
-        (
-            sr.state,
-            get_number_of_dists(sr)
-        )
-        for sr in state_results_dict.values()
-    ]
+    table = results.metrics_table
+    return list(zip(table.states, table.column('number_of_districts').tolist()))
 
 
 def print_states_by_eff_gap(results):
-    state_gap_tuples = get_states_and_eff_gaps(results)
-
-    sorted_tuples = sorted(
-        state_gap_tuples,
-        key=operator.itemgetter(1),
-        reverse=True
-    )
-
-    for i, t in enumerate(sorted_tuples):
+    for i, t in enumerate(results.metrics_table.top_k('efficiency_gap')):
         print('{}: {}'.format(i, t))
 
 
 def print_states_by_eff_gap_magnitude(results):
-    state_gap_tuples = get_states_and_eff_gaps(results)
-
-    sorted_tuples = sorted(
-        state_gap_tuples,
-        key=lambda t: abs(t[1]),
-        reverse=True
-    )
-
     print('Magnitude of efficiency gap per state')
-    for i, t in enumerate(sorted_tuples):
+    for i, t in enumerate(results.metrics_table.top_k('efficiency_gap', magnitude=True)):
         print('{}: {}'.format(i, t))
 
 
-def print_states_by_number_of_districts(results):
-    tuples = get_states_and_number_of_districts(results)
+def print_states_by_eff_gap_significance(results):
+    """Prints states in descending order of how far their efficiency gap's confidence interval
+        is from 0, then of the efficiency gap's magnitude. See set_confidence_intervals
+    """
+    frame = results.frame
+    gaps = frame.efficiency_gaps()
+    intervals = [results.state_results[state].efficiency_gap_interval for state in frame.states]
+
+    order = np.lexsort((-np.abs(gaps), -np.array([significance(interval) for interval in intervals])))
+
+    print('Significance of efficiency gap per state')
+    for i, j in enumerate(order.tolist()):
+        print('{}: {}'.format(i, (frame.states[j], gaps[j].item(), intervals[j])))
+
+    print('National efficiency gap interval: {}'.format(results.efficiency_gap_interval))
 
-    sorted_tuples = sorted(
-        tuples,
-        key=operator.itemgetter(1),
-        reverse=True
-    )
 
+def print_states_by_number_of_districts(results):
     print('Number of districts per state')
-    for i, t in enumerate(sorted_tuples):
+    for i, t in enumerate(results.metrics_table.top_k('number_of_districts')):
         print('{}: {}'.format(i, t))
 
 
 def print_states_by_magnitude_of_seat_advantage(results):
-    state_results_dict = results.state_results
-
-    tuples = [
-        (
-            sr.state,
-            round(sr.efficiency_gap * get_number_of_dists(sr), 2)
-        )
-        for sr in state_results_dict.values()
-    ]
-
-    sorted_tuples = sorted(
-        tuples,
-        key=lambda t: abs(t[1]),
-        reverse=True
-    )
+    seat_advantages = results.metrics_table.column('seat_advantage')
 
     print('Magnitude of seat advantage per state')
-    for i, t in enumerate(sorted_tuples):
+    for i, t in enumerate(results.metrics_table.top_k('seat_advantage', magnitude=True)):
         print('{}: {}'.format(i, t))
 
-    gross_net_seat_advantage = sum([s[1] for s in tuples])
+    gross_net_seat_advantage = sum(seat_advantages.tolist())
     print('Gross net national seat advantage: {}'.format(
         gross_net_seat_advantage
     ))
 
     # Because there are no fractions of seats
-    real_net_seat_advantage = sum([int(s[1]) for s in tuples])
+    real_net_seat_advantage = int(np.trunc(seat_advantages).sum())
     print('Real net national seat advantage: {}'.format(
         real_net_seat_advantage
     ))
 
 
+def print_imputation_bands(results, draws, imputation_rules, seed=None, jobs=1):
+    """Prints the efficiency gap bands of draws of the votes imputed by the processor's
+       imputation_rules
+    """
+    bands = imputation_bands(simulate_imputation(results, draws=draws, seed=seed, jobs=jobs,
+        imputation_rules=imputation_rules))
+
+    print('Efficiency gap per state over {} draws of imputed votes (percentiles {})'.format(
+        draws, ', '.join(str(p) for p in DEFAULT_PERCENTILES)
+    ))
+    for state in bands['states']:
+        print('{}: {}'.format(state, tuple(round(gap, 3) for gap in bands['states'][state])))
+
+    print('National: {}'.format(tuple(round(gap, 3) for gap in bands['national'])))
+
+
 #################
 # DB operations #
 #################
@@ -249,10 +241,21 @@ def create_tables(db_connection):
                     votes_wasted_dem    int                                                             not null,
                     votes_wasted_rep    int                                                             not null,
                     votes_wasted_net    int                                                             not null,
-                    efficiency_gap      numeric(3,3)                                                    not null
+                    efficiency_gap      numeric(3,3)                                                    not null,
+                    mean_median         numeric(4,3),
+                    partisan_bias       numeric(4,3),
+                    declination         numeric(4,3)
                 );
             """
             cursor.execute(create_state_election_results_table)
+
+            # Tables created before the metrics were added
+            cursor.execute("""
+                alter table state_election_results
+                    add column if not exists mean_median      numeric(4,3),
+                    add column if not exists partisan_bias    numeric(4,3),
+                    add column if not exists declination      numeric(4,3);
+            """)
             print('Created state_election_results table...')
 
         except psycopg2.Error as e:
@@ -282,6 +285,22 @@ def create_tables(db_connection):
         except psycopg2.Error as e:
             raise e
 
+        ##########################
+        # Create unique indexes #
+        ##########################
+        # Tables created before the indexes may have duplicate rows, which are only deleted
+        # when asked to with --deduplicate
+        try:
+            create_unique_indexes(cursor, deduplicate=opts["deduplicate"])
+            print('Created unique indexes...')
+
+        except psycopg2.IntegrityError as e:
+            raise psycopg2.IntegrityError('Duplicate rows prevent creating the unique indexes ({}). Run with '
+                '--deduplicate to delete them, keeping the rows with the lowest ids'.format(e)) from e
+
+        except psycopg2.Error as e:
+            raise e
+
         #############################
         # Populate the States table #
         #############################
@@ -292,17 +311,13 @@ def create_tables(db_connection):
         ]
 
         try:
-            insert_state = """
+            insert_states = """
                 insert into states (iso_a2, name)
-                select %s, %s
-                where not exists (select state_id from states where iso_a2 = %s)
-                returning state_id;
-            """
+                values {}
+                on conflict (iso_a2) do nothing;
+            """.format(', '.join(['(%s, %s)'] * len(states)))
 
-            for state in states:
-                iso_a2 = state[0]
-                name = state[1]
-                cursor.execute(insert_state, [iso_a2, name, iso_a2])
+            cursor.execute(insert_states, [value for state in states for value in state])
 
         except psycopg2.Error as e:
             raise e
@@ -310,71 +325,73 @@ def create_tables(db_connection):
         # Persist the changes to the db
         db_connection.commit()
 
+    except psycopg2.IntegrityError as e:
+        # Raised past the handler below, which only prints db errors, since results can't be
+        # upserted without the unique indexes
+        raise e
+
     except psycopg2.Error as e:
         print('Error: {}'.format(e))
 
 
-def populate_tables(db_connection, national_election_results):
-    cursor = db_connection.cursor()
+def populate_tables(db_connection, national_election_results, states=None, replace=False, removed_states=None):
+    """Writes the results of all states, or only of the given states, to the db
+
+       If replace is set, the states' existing results for the year are
+       deleted first so that corrected results are written. The results and
+       elections of removed_states, e.g. states no longer in the results file,
+       are deleted in the same transaction.
+    """
     state_results = national_election_results.state_results
 
-    rows_in_elections_before = get_number_of_rows(cursor, 'elections')
-    rows_in_state_election_results_before = get_number_of_rows(cursor, 'state_election_results')
-    rows_in_district_election_results_before = get_number_of_rows(cursor, 'district_election_results')
-
-    for state in state_results:
-
-        sr = state_results[state]
-
-        # Get the state_id
-        cursor.execute("""
-            select state_id from states where iso_a2 = %s;
-        """, (state,))
-        state_id = cursor.fetchone()[0]
-
-        # Insert into elections table
-        cursor.execute("""
-            insert into elections (state, year)
-            select %s, %s
-            where not exists (select election_id from elections where state = %s and year = %s)
-            returning election_id;
-        """, [state, int(sr.year), state, int(sr.year)])
-        election_id = cursor.fetchone()[0]
-        print('Created row in election for {} {}'.format(state, sr.year))
-
-        # Insert into state_election_results table
-        cursor.execute("""
-            insert into state_election_results (election_id, votes_dem, votes_rep, votes_other, votes_total, votes_wasted_dem, votes_wasted_rep, votes_wasted_net, efficiency_gap)
-            select %s, %s, %s, %s, %s, %s, %s, %s, %s
-            where not exists (select * from state_election_results where election_id = %s);
-        """, [election_id, sr.votes_total_dem, sr.votes_total_rep, sr.votes_total_other, sr.votes_total, sr.votes_wasted_total_dem, sr.votes_wasted_total_rep, sr.votes_wasted_net, sr.efficiency_gap, election_id])
-        print('Created row in state_election_results for {} {}'.format(state, sr.year))
-
-        # Insert into district_election_results table
-        district_results = sr.districts_won_dem + sr.districts_won_rep
-        for dr in district_results:
-            number = int(dr.district)
-            cursor.execute("""
-                insert into district_election_results (election_id, number, votes_dem, votes_rep, votes_other, votes_total, votes_wasted_dem, votes_wasted_rep, votes_wasted_net)
-                select %s, %s, %s, %s, %s, %s, %s, %s, %s
-                where not exists (select * from district_election_results where election_id = %s and number = %s);
-            """, [election_id, number, dr.votes_dem, dr.votes_rep, dr.votes_other, dr.votes_total, dr.votes_wasted_dem, dr.votes_wasted_rep, dr.votes_wasted_net, election_id, number])
-            print('Created row in district_election_results for district {} {} {}'.format(dr.district, state, sr.year))
+    return populate_tables_from_state_results(
+        db_connection,
+        [[state_results[s] for s in (state_results if states is None else states)]],
+        replace=replace,
+        removed_states={national_election_results.year: removed_states or []}
+    )
+
+
+def stream_tables(db_connection, processor, filepath):
+    """Populates the tables with each state's results as soon as the processor
+       has read them instead of waiting for the whole file to be processed
+    """
+    def batches():
+        for r in processor.iter_results(filepath):
+            if isinstance(r, StateElectionResults):
+                # Calculated here since streamed states aren't summarized nationally
+                r.update_metrics()
+                yield [r]
+
+    return populate_tables_from_state_results(db_connection, batches())
+
+
+def populate_tables_from_state_results(db_connection, batches, replace=False, removed_states=None):
+    """Bulk loads batches, lists of StateElectionResults, in one transaction. See db/loader.py
+
+       removed_states is a dict of years to lists of states whose results and
+       elections are deleted in the transaction
+
+       Returns a LoadReport of the rows written, counted from the statements
+       that wrote them rather than by counting the tables' rows
+    """
+    cursor = db_connection.cursor()
+    report = LoadReport()
+    start = time.time()
+
+    for year, states in (removed_states or {}).items():
+        report.add(delete_states(cursor, year, states))
+
+    for batch in batches:
+        report.add(load_state_results(cursor, batch, replace=replace))
 
     db_connection.commit()
+    report.seconds = time.time() - start
 
     # Summary
-    print("{} rows inserted into elections table.".format(
-        get_number_of_rows(cursor, 'elections') - rows_in_elections_before
-    ))
+    report.print_summary()
 
-    print("{} rows inserted into state_election_results table.".format(
-        get_number_of_rows(cursor, 'state_election_results') - rows_in_state_election_results_before
-    ))
-
-    print("{} rows inserted into district_election_results table.".format(
-        get_number_of_rows(cursor, 'district_election_results') - rows_in_district_election_results_before
-    ))
+    return report
 
 
 def tables_exist(db_connection):
@@ -391,9 +408,18 @@ def tables_exist(db_connection):
     return True
 
 
+def flag_value(flags, flag):
+    """Returns the argument following a flag that takes a value
+    """
+    try:
+        return next(flags)
+    except StopIteration:
+        raise NameError('{} needs a value'.format(flag))
+
+
 if __name__ == "__main__":
-    election_year = sys.argv[1]
-    flags = sys.argv[2:]
+    flags = iter(sys.argv[1:])
+    election_years = []
 
     # Options
     opts = {
@@ -401,15 +427,35 @@ if __name__ == "__main__":
         "only_check_for_unhandled_elections": False,
         "print_modifications": False,
         "verbose_read": False,          # Print rows as they're read
+        "columnar": False,              # Use ColumnarHouseElectionsProcessor
+        "chunked": False,               # Use ChunkedHouseElectionsProcessor
+        "stream": False,                # Write each state to the db as soon as it's read
+        "pipeline": False,              # Read and write states to the db in parallel threads
+        "jobs": None,                   # Number of processes when processing many years, and of
+                                        # years loaded into the db at once
+        "cache": False,                 # Load unchanged results files from the results cache
+        "refresh_cache": False,         # Re-process results files even if they're cached
+        "clear_cache": False,
+        "incremental": False,           # Only re-process and reload the states that changed
+        "unordered_input": False,       # Rows aren't grouped by state and district, e.g. merged files
+        "audit_report": None,           # Path of a JSON or csv report of every unhandled election
+        "save_results": None,           # Path of a results file to save every year's results to
+        "load_report": None,            # Path of a JSON report of the rows written to the db
+        "imputation_draws": None,       # Number of draws of imputed votes to print efficiency gap bands from
+        "bootstrap_draws": None,        # Number of resamples to rank states by significance of efficiency gap with
+        "seed": None,                   # Seed of the draws of imputed votes and resamples
 
         # For this script
         "create_tables": False,
         "quiet_mode": False,
-        "drop_tables": False
+        "drop_tables": False,
+        "deduplicate": False            # Delete duplicate rows so the unique indexes can be created
     }
 
     for flag in flags:
-        if flag == '--check-only' or flag == '-c':
+        if not flag.startswith('-'):
+            election_years.append(flag)
+        elif flag == '--check-only' or flag == '-c':
             opts["only_check_for_unhandled_elections"] = True
         elif flag == '--print-mods' or flag == '-p':
             opts["print_modifications"] = True
@@ -421,45 +467,242 @@ if __name__ == "__main__":
             opts["verbose_read"] = True
         elif flag == '--drop-tables':
             opts["drop_tables"] = True
+        elif flag == '--deduplicate':
+            opts["deduplicate"] = True
+        elif flag == '--columnar':
+            opts["columnar"] = True
+        elif flag == '--chunked':
+            opts["chunked"] = True
+        elif flag == '--stream' or flag == '-s':
+            opts["stream"] = True
+        elif flag == '--pipeline':
+            opts["pipeline"] = True
+        elif flag == '--jobs' or flag == '-j':
+            opts["jobs"] = int(flag_value(flags, flag))
+        elif flag == '--cache':
+            opts["cache"] = True
+        elif flag == '--refresh-cache':
+            opts["cache"] = True
+            opts["refresh_cache"] = True
+        elif flag == '--clear-cache':
+            opts["clear_cache"] = True
+        elif flag == '--incremental' or flag == '-i':
+            opts["cache"] = True
+            opts["incremental"] = True
+        elif flag == '--unordered' or flag == '-u':
+            opts["unordered_input"] = True
+        elif flag == '--save':
+            opts["save_results"] = flag_value(flags, flag)
+        elif flag == '--imputation-bands':
+            opts["imputation_draws"] = int(flag_value(flags, flag))
+        elif flag == '--bootstrap':
+            opts["bootstrap_draws"] = int(flag_value(flags, flag))
+        elif flag == '--seed':
+            opts["seed"] = int(flag_value(flags, flag))
+        elif flag == '--load-report':
+            opts["load_report"] = flag_value(flags, flag)
+        elif flag == '--audit-report':
+            opts["only_check_for_unhandled_elections"] = True
+            opts["audit_report"] = flag_value(flags, flag)
         else:
             raise NameError('Unsupported flag {}'.format(flag))
 
-    filename = election_year if election_year.endswith('.csv') \
-        else election_year + '.csv'
+    filepaths = []
+    for election_year in election_years:
+        if is_results_file(election_year):
+            filename = election_year
+        else:
+            # Use whichever of 2014.csv, 2014.csv.gz, ... is in the data directory
+            filenames = [election_year + extension for extension in RESULTS_FILE_EXTENSIONS]
+            filename = next(
+                (f for f in filenames if os.path.exists(os.path.join(config.PATH_TO_HOUSE_ELECTION_RESULTS_DATA, f))),
+                filenames[0]
+            )
+
+        filepaths.append(os.path.join(
+            config.PATH_TO_HOUSE_ELECTION_RESULTS_DATA,
+            filename
+        ))
 
-    filepath = os.path.join(
-        config.PATH_TO_HOUSE_ELECTION_RESULTS_DATA,
-        filename
-    )
+    if opts["chunked"] and len(filepaths) > 1:
+        raise NameError('--chunked only supports processing one year')
 
-    processor = HouseElectionsProcessor(
-        year=election_year,
+    Processor = ColumnarHouseElectionsProcessor if opts["columnar"] else HouseElectionsProcessor
 
-        # Options
-        only_check_for_unhandled_elections=opts["only_check_for_unhandled_elections"],
-        print_modifications=opts["print_modifications"],
-        verbose_read=opts["verbose_read"]
-    )
+    processor_opts = {
+        "only_check_for_unhandled_elections": opts["only_check_for_unhandled_elections"],
+        "print_modifications": opts["print_modifications"],
+        "verbose_read": opts["verbose_read"],
+        "unordered_input": opts["unordered_input"],
+        # Also the rules the imputation bands are drawn around
+        "imputation_rules": IMPUTATION_RULES
+    }
+
+    # The chunks of the file are processed by --jobs processes
+    if opts["chunked"]:
+        Processor = ChunkedHouseElectionsProcessor
+        processor_opts["jobs"] = opts["jobs"]
+
+    if opts["incremental"] and (len(filepaths) > 1 or opts["stream"]):
+        raise NameError('--incremental only supports processing one year without --stream')
+
+    if opts["save_results"] is not None and (opts["stream"] or opts["pipeline"]):
+        raise NameError('--save isn\'t supported with --stream or --pipeline')
+
+    if opts["pipeline"] and (opts["stream"] or opts["incremental"] or opts["chunked"]):
+        raise NameError('--pipeline isn\'t supported with --stream, --incremental or --chunked')
+
+    # Both split the file where a state's rows start
+    if opts["unordered_input"] and (opts["chunked"] or opts["incremental"]):
+        raise NameError('--unordered isn\'t supported with --chunked or --incremental')
+
+    cache = None
+    if opts["cache"] or opts["clear_cache"]:
+        default_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.results_cache')
+
+        cache = ResultsCache(
+            getattr(config, 'PATH_TO_RESULTS_CACHE', default_cache_dir),
+            max_size=getattr(config, 'RESULTS_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE)
+        )
+
+        if opts["clear_cache"]:
+            cache.clear()
+            if not opts["cache"]:
+                cache = None
 
     try:
-        results = processor.read_and_process_election_results(filepath)
+        # Dict of election years to NationalElectionResults
+        all_results = {}
+
+        # States to load into the db. All of them if None
+        changed_states = None
+        # States to delete from the db, since they're no longer in the results file
+        removed_states = []
+
+        # Each file is read once and every unhandled election is written to the report
+        if opts["audit_report"] is not None:
+            unhandled_elections = []
+            for filepath in filepaths:
+                unhandled_elections += audit_election_results(filepath, processor_class=Processor, **processor_opts)
+
+            write_audit_report(unhandled_elections, opts["audit_report"])
+
+            summary = summarize_audit(unhandled_elections)
+            print('Unhandled elections: {}'.format(len(unhandled_elections)))
+            for rule in summary:
+                print('    {}: {}'.format(rule, summary[rule]))
+
+            sys.exit()
+
+        # The rankings need every state's results so they aren't printed when streaming
+        if opts["stream"] or opts["pipeline"]:
+            pass
+        elif opts["incremental"]:
+            processor = Processor(year=year_from_filepath(filepaths[0]), **processor_opts)
+            results, changed_states, removed_states = cache.read_and_process_election_results_incrementally(
+                processor, filepaths[0])
+            all_results[processor.year] = results
+            print('Processed states: {}'.format(', '.join(changed_states)))
+
+            if removed_states:
+                print('Removed states: {}'.format(', '.join(removed_states)))
+        elif len(filepaths) == 1 and (opts["jobs"] is None or opts["chunked"]):
+            year, results, _ = process_election_year(
+                filepaths[0],
+                processor_class=Processor,
+                cache=cache,
+                refresh_cache=opts["refresh_cache"],
+                **processor_opts
+            )
+            all_results[year] = results
+        else:
+            all_results = process_election_years(
+                filepaths,
+                jobs=opts["jobs"],
+                processor_class=Processor,
+                quiet=opts["quiet_mode"],
+                cache=cache,
+                refresh_cache=opts["refresh_cache"],
+                **processor_opts
+            )
+
+        if opts["only_check_for_unhandled_elections"]:
+            sys.exit()
+
+        # See election_results/storage.py
+        if opts["save_results"] is not None:
+            save_results(opts["save_results"], list(all_results.values()))
 
         if not opts["quiet_mode"]:
-            print_states_by_eff_gap_magnitude(results)
-            print_states_by_magnitude_of_seat_advantage(results)
+            for year in sorted(all_results):
+                print('\n{}'.format(year))
+
+                if opts["bootstrap_draws"] is None:
+                    print_states_by_eff_gap_magnitude(all_results[year])
+                else:
+                    bootstrap = bootstrap_efficiency_gaps(all_results[year], draws=opts["bootstrap_draws"],
+                        seed=opts["seed"], jobs=opts["jobs"] or 1)
+                    set_confidence_intervals(all_results[year], bootstrap)
+                    print_states_by_eff_gap_significance(all_results[year])
+
+                print_states_by_magnitude_of_seat_advantage(all_results[year])
+
+                if opts["imputation_draws"] is not None:
+                    print_imputation_bands(all_results[year], opts["imputation_draws"], processor_opts["imputation_rules"],
+                        seed=opts["seed"], jobs=opts["jobs"] or 1)
 
         try:
             import psycopg2
 
-            conn = psycopg2.connect(
+            connect_kwargs = dict(
                 dbname=config.DB_NAME_DEV,
                 host=config.DB_HOST_DEV,
                 user=config.DB_USER_DEV,
                 password=config.DB_PASSWORD_DEV
             )
+            conn = psycopg2.connect(**connect_kwargs)
 
             create_tables(conn)
-            populate_tables(conn, results)
+            load_report = LoadReport()
+
+            if opts["pipeline"]:
+                pipeline_report, timings = pipelined_ingest(
+                    conn,
+                    [(Processor(year=year_from_filepath(filepath), **processor_opts), filepath) for filepath in filepaths]
+                )
+                pipeline_report.print_summary()
+                load_report.add(pipeline_report)
+
+                print('Seconds per stage')
+                for stage in timings:
+                    print('    {}: {:.2f}'.format(stage, timings[stage]))
+            elif opts["stream"]:
+                for filepath in filepaths:
+                    processor = Processor(year=year_from_filepath(filepath), **processor_opts)
+                    load_report.add(stream_tables(conn, processor, filepath))
+            elif opts["incremental"]:
+                for year in all_results:
+                    load_report.add(populate_tables(conn, all_results[year], states=changed_states, replace=True,
+                        removed_states=removed_states))
+            elif opts["jobs"] is not None and opts["jobs"] > 1 and len(all_results) > 1:
+                # Each year is loaded in its own transaction, --jobs years at once
+                pool = connection_pool(opts["jobs"], **connect_kwargs)
+
+                try:
+                    parallel_report, _ = parallel_load(pool, all_results, jobs=opts["jobs"])
+                finally:
+                    pool.closeall()
+
+                parallel_report.print_summary()
+                load_report.add(parallel_report)
+            else:
+                # Every year is loaded by one COPY per staging table
+                load_report.add(populate_tables_from_state_results(conn, [[
+                    sr for year in sorted(all_results) for sr in all_results[year].state_results.values()
+                ]]))
+
+            if opts["load_report"] is not None:
+                load_report.write(opts["load_report"])
 
         except psycopg2.Error as e:
             raise e
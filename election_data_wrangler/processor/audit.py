@@ -0,0 +1,52 @@
+"""Defines functions for auditing results files for elections that need case analysis
+"""
+
+import csv
+import json
+from collections import OrderedDict
+from processor.batch import year_from_filepath
+from processor.house_election_results import HouseElectionsProcessor, UNHANDLED_ELECTION_RULES
+
+AUDIT_REPORT_FIELDS = ['year', 'state', 'district', 'rule', 'votes_dem', 'votes_rep', 'votes_other',
+    'votes_scattered', 'votes_total']
+
+
+def audit_election_results(filepath, processor_class=HouseElectionsProcessor, **options):
+    """Reads a results file once and returns every election that needs case analysis rather than
+        stopping at the first one
+
+    Returns a list of dicts with AUDIT_REPORT_FIELDS, in the order the elections were read. The
+    rule is one of UNHANDLED_ELECTION_RULES.
+    """
+    options['only_check_for_unhandled_elections'] = True
+    processor = processor_class(year=year_from_filepath(filepath), **options)
+    processor.read_and_process_election_results(filepath)
+
+    return processor.unhandled_elections
+
+
+def summarize_audit(unhandled_elections):
+    """Returns a dict of each of UNHANDLED_ELECTION_RULES to the number of elections it flagged
+    """
+    summary = OrderedDict((rule, 0) for rule in UNHANDLED_ELECTION_RULES)
+
+    for election in unhandled_elections:
+        summary[election['rule']] += 1
+
+    return summary
+
+
+def write_audit_report(unhandled_elections, filepath):
+    """Writes the elections returned by audit_election_results as csv if filepath ends with .csv,
+        JSON otherwise
+    """
+    with open(filepath, 'w', newline='') as file:
+        if filepath.endswith('.csv'):
+            writer = csv.DictWriter(file, fieldnames=AUDIT_REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(unhandled_elections)
+        else:
+            json.dump({
+                'summary': summarize_audit(unhandled_elections),
+                'unhandled_elections': unhandled_elections
+            }, file, indent=2)
@@ -0,0 +1,76 @@
+"""Defines functions for processing the election results of many years in parallel
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from processor.house_election_results import HouseElectionsProcessor
+
+
+def year_from_filepath(filepath):
+    """Gets the election year from a results file named after it
+
+    Examples
+        /data/2014.csv => 2014
+        2016.csv       => 2016
+    """
+    return os.path.basename(filepath).split('.')[0]
+
+
+def process_election_year(filepath, processor_class=HouseElectionsProcessor, cache=None, refresh_cache=False, **options):
+    """Processes one year's results file. Runs in a worker process.
+
+    Returns the year, its NationalElectionResults and the seconds it took
+    """
+    start = time.time()
+    year = year_from_filepath(filepath)
+    processor = processor_class(year=year, **options)
+
+    if cache is None:
+        results = processor.read_and_process_election_results(filepath)
+    else:
+        results = cache.read_and_process_election_results(processor, filepath, refresh=refresh_cache)
+
+    return year, results, time.time() - start
+
+
+def process_election_years(filepaths, jobs=None, processor_class=HouseElectionsProcessor, quiet=False,
+    cache=None, refresh_cache=False, **options):
+    """Processes the results files of many years across a pool of processes
+
+    Attributes:
+        filepaths (List) - Paths of the results files, each named after its election year
+        jobs (Int) - Number of worker processes. Defaults to the number of CPUs
+        processor_class (Class) - HouseElectionsProcessor or a subclass of it
+        quiet (Bool) - Option indicating the time taken per year won't be printed
+        cache (ResultsCache) - Cache of processed results files. Not used if None
+        refresh_cache (Bool) - Option indicating cached results files will be re-processed
+        options - Passed to processor_class
+
+    Returns a dict of election years to NationalElectionResults
+    """
+    results = {}
+    start = time.time()
+
+    def collect(year, national_results, seconds):
+        results[year] = national_results
+        if not quiet:
+            print('Processed {} in {:.2f}s'.format(year, seconds))
+
+    if jobs == 1:
+        for filepath in filepaths:
+            collect(*process_election_year(filepath, processor_class, cache, refresh_cache, **options))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(process_election_year, filepath, processor_class, cache, refresh_cache, **options)
+                for filepath in filepaths
+            ]
+
+            for future in as_completed(futures):
+                collect(*future.result())
+
+    if not quiet:
+        print('Processed {} years in {:.2f}s'.format(len(results), time.time() - start))
+
+    return results
@@ -0,0 +1,199 @@
+"""Defines an on-disk cache of processed election results
+"""
+
+import os
+import csv
+import json
+import zlib
+import pickle
+import hashlib
+from processor.compression import open_results_file
+from processor.incremental import process_election_results_csv_incrementally
+
+# Bump when the pickled ElectionResults classes change so stale entries aren't loaded
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024    # bytes
+CACHE_FILE_EXTENSION = '.results'
+
+
+class ResultsCache:
+    """Caches the NationalElectionResults of results files so unchanged files aren't re-processed
+
+    Entries are keyed by a hash of the results file's content and the processor's options, so
+    an entry is never used for a file that has changed or for different imputation rules. Each
+    entry is the pickled NationalElectionResults, along with its StateElectionResults and
+    DistrictElectionResults, compressed with zlib.
+
+    Attributes:
+        directory (String) - Path of the directory the entries are written to
+        max_size (Int) - Max total size of the entries in bytes. The least recently used
+            entries are evicted when it's exceeded.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, filepath, processor):
+        """Returns the key of a results file processed by a HouseElectionsProcessor
+        """
+        h = hashlib.sha256()
+
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                h.update(chunk)
+
+        h.update(self.options_key(processor).encode('utf-8'))
+
+        return h.hexdigest()
+
+    def options_key(self, processor):
+        """Returns the part of a key that depends on the processor's year and options
+        """
+        return json.dumps({
+            'version': CACHE_FORMAT_VERSION,
+            'year': str(processor.year),
+            'only_check_for_unhandled_elections': processor.only_check_for_unhandled_elections,
+            'imputation_rules': processor.imputation_rules,
+            'unordered_input': processor.unordered_input
+        }, sort_keys=True)
+
+    def snapshot_key(self, processor):
+        """Returns the key of the snapshot of per-state fingerprints used for incremental
+            processing. It doesn't depend on the file's content, so a revised file of the
+            same year finds the snapshot of the previous version.
+        """
+        h = hashlib.sha256(b'snapshot')
+        h.update(self.options_key(processor).encode('utf-8'))
+
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key):
+        """Returns the cached entry, usually a NationalElectionResults, or None if there's no
+            entry for key
+        """
+        path = self.path(key)
+
+        try:
+            with open(path, 'rb') as file:
+                results = pickle.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError):
+            # A corrupt or outdated entry is treated as a miss
+            self.invalidate(key)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(path, None)
+
+        return results
+
+    def put(self, key, results):
+        """Writes an entry, then evicts entries until the cache fits in max_size
+        """
+        path = self.path(key)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+
+        with open(tmp_path, 'wb') as file:
+            file.write(zlib.compress(pickle.dumps(results, pickle.HIGHEST_PROTOCOL)))
+
+        # Readers never see a partially written entry
+        os.replace(tmp_path, path)
+
+        self.evict()
+
+    def entries(self):
+        """Returns (last used time, size, path) of every entry, least recently used first
+        """
+        entries = []
+
+        for filename in os.listdir(self.directory):
+            if filename.endswith(CACHE_FILE_EXTENSION):
+                path = os.path.join(self.directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in max_size
+        """
+        entries = self.entries()
+        size = sum(size for _, size, _ in entries)
+
+        for _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+
+    def invalidate(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def read_and_process_election_results(self, processor, filepath, refresh=False):
+        """Returns the NationalElectionResults of a results file, processing it only if it
+            isn't cached
+
+        Attributes:
+            processor (HouseElectionsProcessor) - Processes the file on a cache miss
+            filepath (String) - Path of the results file
+            refresh (Bool) - Option indicating the file will be re-processed and its entry
+                replaced even if it's cached
+        """
+        key = self.key(filepath, processor)
+        results = None if refresh else self.get(key)
+
+        if results is None:
+            results = processor.read_and_process_election_results(filepath)
+
+            if results is not None:
+                self.put(key, results)
+
+        return results
+
+    def read_and_process_election_results_incrementally(self, processor, filepath):
+        """Returns the NationalElectionResults of a results file, processing only the states
+            whose rows changed since the last time a file of the same year was processed
+
+        Returns a tuple of the NationalElectionResults, a list of the states that were
+        processed and a list of the states that are no longer in the file. See
+        processor/incremental.py
+        """
+        key = self.snapshot_key(processor)
+
+        with open_results_file(filepath) as file:
+            results, snapshot, changed_states, removed_states = process_election_results_csv_incrementally(
+                processor, csv.reader(file), previous=self.get(key))
+
+        if results is not None:
+            self.put(key, snapshot)
+
+        return results, changed_states, removed_states
@@ -0,0 +1,161 @@
+"""Defines a processor that reads chunks of a results file in parallel
+"""
+
+import io
+import os
+import csv
+import mmap
+import locale
+from concurrent.futures import ProcessPoolExecutor
+from fixtures.states import states
+from election_results.national import NationalElectionResults
+from election_results.state import StateElectionResults
+from processor.house_election_results import HouseElectionsProcessor
+from processor.compression import detect_compression
+
+
+def read_line(mm, start):
+    """Returns the offset where the line after the one starting at start begins
+    """
+    end = mm.find(b'\n', start)
+    return len(mm) if end == -1 else end + 1
+
+
+def read_state(line):
+    """Returns the state column of a line of the csv
+    """
+    if not line.strip():
+        return ''
+
+    row = next(csv.reader([line.decode(locale.getpreferredencoding(False), 'replace')]), [''])
+    return row[0].strip() if len(row) > 0 else ''
+
+
+def find_next_state(mm, start):
+    """Returns the offset of the first line at or after start that begins a new state's block
+        of rows, i.e. whose state differs from that of the previous line of a US state
+    """
+    current_state = None
+    line_start = start
+
+    while line_start < len(mm):
+        line_end = read_line(mm, line_start)
+        state = read_state(mm[line_start:line_end])
+
+        if state in states:
+            if current_state is None:
+                current_state = state
+            elif state != current_state:
+                return line_start
+
+        line_start = line_end
+
+    return len(mm)
+
+
+def find_chunk_boundaries(mm, number_of_chunks):
+    """Splits the rows of a memory-mapped csv into about number_of_chunks chunks of
+        similar size. Chunks only start where a state's block of rows starts.
+
+    Returns the offset where the header ends, which is where the first chunk starts,
+    followed by the offset where each chunk ends
+    """
+    header_end = read_line(mm, 0)
+    boundaries = [header_end]
+
+    for k in range(1, number_of_chunks):
+        target = header_end + (len(mm) - header_end) * k // number_of_chunks
+
+        # Move to the start of a line
+        if target > boundaries[-1] and mm[target - 1:target] != b'\n':
+            target = read_line(mm, target)
+
+        boundary = find_next_state(mm, max(target, boundaries[-1]))
+
+        if boundaries[-1] < boundary < len(mm):
+            boundaries.append(boundary)
+
+    boundaries.append(len(mm))
+
+    return boundaries
+
+
+def process_chunk(processor, filepath, header_end, start, end):
+    """Processes the rows between start and end of a results file. Runs in a worker process.
+
+    The chunk is read as if it were the whole file: the header is read before it, and the
+    first line of the next chunk is read after it since it's what closes the chunk's last
+    district.
+
+    Returns the StateElectionResults of the states in the chunk in the order they were read, and
+    the unhandled elections flagged while only checking for them
+    """
+    with open(filepath, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            next_line_end = read_line(mm, end) if end < len(mm) else end
+            text = (mm[:header_end] + mm[start:next_line_end]).decode(locale.getpreferredencoding(False))
+
+    chunk_processor = processor.copy()
+    state_results = [
+        r for r in chunk_processor.iter_election_results_csv(csv.reader(io.StringIO(text, newline='')))
+        if isinstance(r, StateElectionResults)
+    ]
+
+    # The last state pushed is that of the next chunk's first line
+    if next_line_end > end:
+        state_results = state_results[:-1]
+
+    return state_results, chunk_processor.unhandled_elections
+
+
+class ChunkedHouseElectionsProcessor(HouseElectionsProcessor):
+    """Reads csv of election results into ElectionResults objects, processing chunks of the
+    file in parallel
+
+    The file is memory-mapped and split into chunks that start where a state's rows start, so
+    each state is processed entirely by one worker. The workers' StateElectionResults are
+    merged into the NationalElectionResults. Produces the same results as
+    HouseElectionsProcessor as long as no field contains a line break.
+
+    Attributes:
+        jobs (Int) - Number of worker processes. Defaults to the number of CPUs
+        number_of_chunks (Int) - Defaults to jobs
+    """
+
+    def __init__(self, year, jobs=None, number_of_chunks=None, **options):
+        super(__class__, self).__init__(year, **options)
+
+        self.jobs = jobs if jobs is not None else os.cpu_count()
+        self.number_of_chunks = number_of_chunks if number_of_chunks is not None else self.jobs
+
+    def read_and_process_election_results(self, filepath):
+        # Compressed files can't be memory-mapped and split, so they're read by one process
+        if os.path.getsize(filepath) == 0 or detect_compression(filepath) is not None:
+            return super(__class__, self).read_and_process_election_results(filepath)
+
+        with open(filepath, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                boundaries = find_chunk_boundaries(mm, self.number_of_chunks)
+
+        header_end = boundaries[0]
+        chunks = [(filepath, header_end, start, end) for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+        if self.jobs == 1 or len(chunks) == 1:
+            chunk_results = [process_chunk(self, *chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = [executor.submit(process_chunk, self, *chunk) for chunk in chunks]
+                chunk_results = [future.result() for future in futures]
+
+        # Merged in file order so a state that's read again replaces its earlier results
+        for state_results, unhandled_elections in chunk_results:
+            for r in state_results:
+                self.state_results[r.state] = r
+            self.unhandled_elections += unhandled_elections
+
+        if not self.only_check_for_unhandled_elections:
+            return NationalElectionResults(
+                year=self.year,
+                legislative_body_code=self.legislative_body_code,
+                state_results=self.state_results
+            )
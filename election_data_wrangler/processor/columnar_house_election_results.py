@@ -0,0 +1,255 @@
+"""Defines a columnar engine for processing congressional election results from the FEC
+"""
+
+import itertools
+import numpy as np
+from fixtures.states import states
+from election_results.district import DistrictElectionResults, IMPUTED_CODES
+from processor.house_election_results import HouseElectionsProcessor, COLUMN_INDEX
+
+# Fields of current_district_results that a row's votes can be read into. A row's
+# party class is its index in this list, or IGNORED if its votes aren't counted.
+PARTY_CLASSES = ['votes_dem', 'votes_rep', 'votes_other', 'votes_scattered', 'votes_total']
+IGNORED = len(PARTY_CLASSES)
+
+# Marks rows whose district column isn't numeric
+NO_DISTRICT = -1
+
+
+class ColumnarHouseElectionsProcessor(HouseElectionsProcessor):
+    """Reads csv of election results into ElectionResults objects using column arrays
+
+    Produces the same NationalElectionResults as HouseElectionsProcessor. Instead of walking
+    every row through the state machine, the whole csv is parsed into typed columns and the
+    state/district grouping and party bucketing are done with vectorized reductions. Only
+    checking for unhandled elections is done per district in Python. The DistrictElectionResults
+    are validated and created in one batch. See DistrictElectionResults.from_arrays
+
+    Notes
+        Districts are delimited the same way as in HouseElectionsProcessor: a district is a
+        contiguous run of rows with the same district number and is closed by the next row of
+        a US state. Its state is that of its last row.
+
+        verbose_read only prints the pushed districts and states, not every row.
+    """
+
+    def to_int_array(self, values):
+        """Vectorized to_int. Returns the converted ints and a mask of which values were numeric
+        """
+        stripped = np.char.replace(np.char.strip(values), ',', '')
+        numeric = np.char.isdigit(stripped)
+        ints = np.zeros(len(values), dtype=np.int64)
+        ints[numeric] = stripped[numeric].astype(np.int64)
+
+        return ints, numeric
+
+    def to_int_district_array(self, values):
+        """Vectorized to_int_district. Non-numeric districts are set to NO_DISTRICT
+        """
+        districts, numeric = self.to_int_array(values)
+        districts[districts == 0] = 1
+        districts[~numeric] = NO_DISTRICT
+
+        return districts
+
+    def read_votes_array(self, ge_votes, ge_votes_runoff, ge_votes_combined):
+        """Vectorized read_votes. Combined votes have priority over runoff votes, which have
+            priority over general election votes.
+        """
+        ge, ge_numeric = self.to_int_array(ge_votes)
+        runoff, runoff_numeric = self.to_int_array(ge_votes_runoff)
+        combined, combined_numeric = self.to_int_array(ge_votes_combined)
+
+        return np.where(combined_numeric, combined,
+            np.where(runoff_numeric, runoff,
+                np.where(ge_numeric, ge, 0)))
+
+    def classify_parties(self, party, total_votes_label):
+        """Vectorized party bucketing of read_row_data. Returns the index in PARTY_CLASSES that
+            each row's votes are read into.
+        """
+        p = np.char.lower(np.char.strip(party))
+        is_total = np.char.find(np.char.strip(total_votes_label), 'District Votes') >= 0
+
+        return np.select(
+            [
+                (p == 'd') | (p == 'dem'),
+                (p == 'r') | (p == 'rep'),
+                p == 'w',
+                p != '',
+                is_total
+            ],
+            [
+                PARTY_CLASSES.index('votes_dem'),
+                PARTY_CLASSES.index('votes_rep'),
+                PARTY_CLASSES.index('votes_scattered'),
+                PARTY_CLASSES.index('votes_other'),
+                PARTY_CLASSES.index('votes_total')
+            ],
+            default=IGNORED
+        )
+
+    def read_columns(self, csv_reader_obj):
+        """Parses the rows of US states into typed columns
+
+        Returns a dict with
+            state (Array of String) - Two-letter state abbreviation of each row
+            district (Array of Int) - District number of each row, NO_DISTRICT if it isn't numeric
+            party_class (Array of Int) - Index in PARTY_CLASSES the row's votes are read into
+            votes (Array of Int) - Votes read from the row
+        """
+        rows = itertools.islice(csv_reader_obj, 1, None)    # skip column names
+
+        # Short rows are padded so that a blank line can't shift the columns
+        columns = list(itertools.zip_longest(*rows, fillvalue=''))
+
+        def column(name):
+            index = COLUMN_INDEX[name]
+            return np.array(columns[index] if index < len(columns) else [], dtype=str)
+
+        state = np.char.strip(column('state'))
+        in_states = np.isin(state, list(states.keys()))
+
+        def rows_in_states(name):
+            return column(name)[in_states]
+
+        return {
+            'state': state[in_states],
+            'district': self.to_int_district_array(rows_in_states('district')),
+            'party_class': self.classify_parties(
+                rows_in_states('party'),
+                rows_in_states('total_votes_label')
+            ),
+            'votes': self.read_votes_array(
+                rows_in_states('ge_votes'),
+                rows_in_states('ge_votes_runoff'),
+                rows_in_states('ge_votes_combined')
+            )
+        }
+
+    def find_runs(self, values):
+        """Finds the runs of contiguous equal values
+
+        Returns the index where each run starts and the run index of each value
+        """
+        is_start = np.ones(len(values), dtype=bool)
+        is_start[1:] = values[1:] != values[:-1]
+
+        return np.flatnonzero(is_start), np.cumsum(is_start) - 1
+
+    def group_districts(self, columns):
+        """Groups rows into districts and sums each district's votes per party class
+
+        Returns a dict with
+            state (List of String) - State of each closed district
+            district (List of Int) - Number of each closed district
+            votes (Array of Int) - Matrix of votes with a row per closed district and a
+                column per PARTY_CLASSES
+            state_run (Array of Int) - Index of the contiguous run of a state's rows that each
+                closed district belongs to
+            state_run_states (List of String) - State of each run of a state's rows
+        """
+        district = columns['district']
+        state = columns['state']
+
+        district_starts, district_run = self.find_runs(district)
+        state_starts, state_run = self.find_runs(state)
+
+        votes = np.zeros((len(district_starts), IGNORED + 1), dtype=np.int64)
+        np.add.at(votes, (district_run, columns['party_class']), columns['votes'])
+
+        # A district is only closed by the row after it and belongs to the state of its last row
+        last_rows = district_starts[1:] - 1
+        closed = district[last_rows] != NO_DISTRICT
+        last_rows = last_rows[closed]
+
+        return {
+            'state': state[last_rows].tolist(),
+            'district': district[last_rows].tolist(),
+            'votes': votes[:-1][closed, :IGNORED],
+            'state_run': state_run[last_rows],
+            'state_run_states': state[state_starts].tolist()
+        }
+
+    def aggregate_districts(self, columns):
+        """Sums each district's votes per party class keyed by (state, district), so rows can be
+            in any order. See HouseElectionsProcessor.iter_aggregated_election_results_csv
+
+        Returns a dict like group_districts with a state run per state, in the order states were
+        first read, and its districts sorted by number
+        """
+        in_district = columns['district'] != NO_DISTRICT
+        state = columns['state'][in_district]
+        district = columns['district'][in_district]
+
+        state_names, first_rows, state_index = np.unique(state, return_index=True, return_inverse=True)
+
+        # Number states in the order they were first read
+        state_order = np.argsort(first_rows, kind='mergesort')
+        state_number = np.empty_like(state_order)
+        state_number[state_order] = np.arange(len(state_order))
+
+        width = int(district.max()) + 1 if len(district) > 0 else 1
+        keys, district_index = np.unique(state_number[state_index] * width + district, return_inverse=True)
+
+        votes = np.zeros((len(keys), IGNORED + 1), dtype=np.int64)
+        np.add.at(votes, (district_index, columns['party_class'][in_district]), columns['votes'][in_district])
+
+        state_run = keys // width
+
+        return {
+            'state': state_names[state_order][state_run].tolist(),
+            'district': (keys % width).tolist(),
+            'votes': votes[:, :IGNORED],
+            'state_run': state_run,
+            'state_run_states': state_names[state_order].tolist()
+        }
+
+    def iter_election_results_csv(self, csv_reader_obj):
+        """Yields each DistrictElectionResults and StateElectionResults in the order
+            HouseElectionsProcessor would. The whole csv is read before the first is yielded.
+        """
+        columns = self.read_columns(csv_reader_obj)
+        districts = self.aggregate_districts(columns) if self.unordered_input else self.group_districts(columns)
+        votes = districts['votes'].tolist()
+        imputed = [0] * len(votes)
+        state_run = districts['state_run']
+
+        # Index of the first district of each state run
+        first_districts = np.searchsorted(state_run, np.arange(len(districts['state_run_states']) + 1))
+
+        # Each district is checked for an unhandled election, which may impute its votes, then
+        # every district's DistrictElectionResults is created in one batch
+        for i in range(len(votes)):
+            self.current_state = districts['state'][i]
+            self.current_district = districts['district'][i]
+            self.reset_current_district_results()
+            self.current_district_results.update(zip(PARTY_CLASSES, votes[i]))
+
+            self.check_for_unhandled_elections()
+            votes[i] = [self.current_district_results[party] for party in PARTY_CLASSES]
+            imputed[i] = IMPUTED_CODES.index(self.current_district_results.get('imputed'))
+
+        if self.only_check_for_unhandled_elections:
+            return
+
+        votes = np.array(votes, dtype=np.int64).reshape(len(votes), len(PARTY_CLASSES))
+        district_results = DistrictElectionResults.from_arrays(
+            year=self.year,
+            legislative_body_code=self.legislative_body_code,
+            state=districts['state'],
+            district=districts['district'],
+            imputed=imputed,
+            **dict((party, votes[:, i]) for i, party in enumerate(PARTY_CLASSES))
+        )
+
+        for run, state in enumerate(districts['state_run_states']):
+            self.current_state = state
+            self.district_results = district_results[first_districts[run]:first_districts[run + 1]]
+
+            for r in self.district_results:
+                if self.verbose_read:
+                    print('pushed district: {}\n'.format(r.as_dict()))
+                yield r
+
+            yield self.push_current_state_results()
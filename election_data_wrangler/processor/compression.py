@@ -0,0 +1,74 @@
+"""Opens results files that may be compressed
+"""
+
+import io
+import bz2
+import gzip
+import lzma
+import locale
+import zipfile
+from contextlib import contextmanager
+
+# Leading bytes of each compressed format
+MAGIC_BYTES = [
+    ('gzip', b'\x1f\x8b'),
+    ('bz2', b'BZh'),
+    ('xz', b'\xfd7zXZ\x00'),
+    ('zip', b'PK\x03\x04')
+]
+
+RESULTS_FILE_EXTENSIONS = ['.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.zip']
+
+OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open
+}
+
+
+def is_results_file(filepath):
+    """Returns whether filepath is named like a csv of results, compressed or not
+    """
+    return any(filepath.endswith(extension) for extension in RESULTS_FILE_EXTENSIONS)
+
+
+def detect_compression(filepath):
+    """Returns the compression format of a file from its leading bytes, or None if it isn't
+        compressed
+    """
+    with open(filepath, 'rb') as file:
+        head = file.read(max(len(magic) for _, magic in MAGIC_BYTES))
+
+    for compression, magic in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+@contextmanager
+def open_results_file(filepath):
+    """Opens a results file as text, decompressing it as it's read if it's a gzip, bz2 or xz
+        file or a zip archive of a single file. The format is detected from the file's leading
+        bytes rather than its name.
+    """
+    compression = detect_compression(filepath)
+
+    if compression is None:
+        with open(filepath) as file:
+            yield file
+
+    elif compression == 'zip':
+        with zipfile.ZipFile(filepath) as archive:
+            members = [info for info in archive.infolist() if not info.filename.endswith('/')]
+
+            if len(members) != 1:
+                raise ValueError('{} must contain exactly one file, found {}'.format(filepath, len(members)))
+
+            with archive.open(members[0]) as member:
+                with io.TextIOWrapper(member, encoding=locale.getpreferredencoding(False)) as file:
+                    yield file
+
+    else:
+        with OPENERS[compression](filepath, 'rt') as file:
+            yield file
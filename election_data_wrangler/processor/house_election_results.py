@@ -4,6 +4,7 @@
 
 import csv
 import json
+from collections import OrderedDict
 import config
 import math
 import election_results.utils as utils
@@ -11,6 +12,49 @@ from fixtures.states import states
 from election_results.national import NationalElectionResults
 from election_results.state import StateElectionResults
 from election_results.district import DistrictElectionResults
+from processor.compression import is_results_file, open_results_file
+
+# Map of column names to indices in source data
+#
+# Notes (based on 2014 FEC results)
+#     1. ge = General Election
+#     2. ge_votes_runoff applies to LA only if no candidate won a majority in the first round
+#     3. ge_votes_combined applies to CT, NY, SC because minor parties coalesce around major party
+COLUMN_INDEX = {
+    'state': 0,
+    'district': 1,
+    'incumbent_indicator': 2,
+    'first_name': 3,
+    'last_name': 4,
+    'total_votes_label': 5,
+    'party': 6,
+    'ge_votes': 7,
+    'ge_percent': 8,
+    'ge_votes_runoff': 9,
+    'ge_votes_runoff_percent': 10,
+    'ge_votes_combined': 11,
+    'ge_votes_combined_percent': 12,
+    'ge_winner_indicator': 13
+}
+
+# Rules for imputing votes in elections where a major party candidate ran unopposed.
+# See the Notes of HouseElectionsProcessor.
+#     unopposed_threshold - Minimum share of the vote for a candidate to be treated as unopposed
+#     rep_unopposed - Shares of the vote total given to each party when a Republican was unopposed
+#     dem_unopposed - Shares of the vote total given to each party when a Democrat was unopposed
+IMPUTATION_RULES = {
+    'unopposed_threshold': 0.75,
+    'rep_unopposed': {'votes_rep': 0.68, 'votes_dem': 0.32},
+    'dem_unopposed': {'votes_rep': 0.3, 'votes_dem': 0.7}
+}
+
+# Rules that flag elections which need case analysis, and their messages. See check_for_unhandled_elections.
+UNHANDLED_ELECTION_RULES = OrderedDict([
+    ('no_rep_or_dem', 'No R or D candidates'),
+    ('rep_below_threshold', 'no D candidate and R < {:.0%}'),
+    ('dem_below_threshold', 'no R candidate and D < {:.0%}'),
+    ('no_votes', 'no votes logged')
+])
 
 class HouseElectionsProcessor:
     """Reads csv of election results into ElectionResults objects
@@ -62,7 +106,8 @@ class HouseElectionsProcessor:
                 corresponding major party.
     """
 
-    def __init__(self, year, only_check_for_unhandled_elections=False, print_modifications=False, verbose_read=False):
+    def __init__(self, year, only_check_for_unhandled_elections=False, print_modifications=False, verbose_read=False, imputation_rules=None,
+        unordered_input=False):
         """Initializes a HouseElectionsProcessor
 
         Attributes:
@@ -71,12 +116,17 @@ class HouseElectionsProcessor:
                 elections and not create any ElectionResults objects
             print_modifications (Bool) - Option indicating whether potential modifications to unhandled elections
                 will be printed during checking
+            imputation_rules (Dict) - Overrides IMPUTATION_RULES
+            unordered_input (Bool) - Option indicating the rows aren't grouped by state and district, e.g. merged files.
+                Votes are summed per (state, district) in one pass and every district is finalized at the end
             current_district_results (Dict) - Accumulates the votes in a congressional election
             legislative_body_code (Int) - Corresponds to a legislative body, the House of Representatives in this case
             current_state (String) - The current state's two-letter abbreviation
             current_district (Int) - The current congressional district
             districts_results (List) - Collection of DistrictElectionResults for the current_state
             state_results (Dict) - Keys are two-letter state abbreviations and values are the state's corresponding districts_results list
+            unhandled_elections (List) - Every election flagged while only checking for unhandled elections. See
+                unhandled_election_record
         """
         self.current_district_results = {
             'votes_dem': 0,
@@ -93,6 +143,7 @@ class HouseElectionsProcessor:
         self.current_district = None
         self.district_results = []
         self.state_results = {}
+        self.unhandled_elections = []
         self.current_state = None
         self.legislative_body_code = 0
         self.year = year
@@ -101,6 +152,20 @@ class HouseElectionsProcessor:
         self.only_check_for_unhandled_elections = only_check_for_unhandled_elections
         self.print_modifications = print_modifications
         self.verbose_read = verbose_read
+        self.imputation_rules = IMPUTATION_RULES if imputation_rules is None else imputation_rules
+        self.unordered_input = unordered_input
+
+    def copy(self):
+        """Returns a new processor of the same class with the same year and options
+        """
+        return self.__class__(
+            year=self.year,
+            only_check_for_unhandled_elections=self.only_check_for_unhandled_elections,
+            print_modifications=self.print_modifications,
+            verbose_read=self.verbose_read,
+            imputation_rules=self.imputation_rules,
+            unordered_input=self.unordered_input
+        )
 
     def to_int(self, x):
         """Converts x to int if it's numeric
@@ -147,7 +212,8 @@ class HouseElectionsProcessor:
         }
 
     def push_current_district_results(self):
-        """Raise exception if election is unhandled. If it's okay, pust to districts_results list.
+        """Raise exception if election is unhandled. If it's okay, pust to districts_results list
+            and return it.
         """
         # print('current state={} dist={}\n'.format(self.current_state, self.current_district))
 
@@ -162,13 +228,14 @@ class HouseElectionsProcessor:
         )
 
         if self.verbose_read:
-            print('pushed district: {}\n'.format(r.__dict__))
+            print('pushed district: {}\n'.format(r.as_dict()))
 
         self.district_results.append(r)
+        return r
 
     def push_current_state_results(self):
         """When all of a state's district congressional elections have been read,
-            append it to state_results.
+            return its StateElectionResults.
         """
         r = StateElectionResults(
             year=self.year,
@@ -179,9 +246,9 @@ class HouseElectionsProcessor:
 
         if self.verbose_read:
             print('current state={} dist={}'.format(self.current_state, self.current_district))
-            print('pushed state: {}\n'.format(r.__dict__))
+            print('pushed state: {}\n'.format(r.as_dict()))
 
-        self.state_results[self.current_state] = r
+        return r
 
     def set_winner(self, party, candidate_last_name, candidate_first_name):
         self.current_district_results['winner'] = {}
@@ -248,17 +315,21 @@ class HouseElectionsProcessor:
 
     def modify_votes_for_R_unopposed(self):
         votes_total = self.current_district_results['votes_total']
-        self.current_district_results['votes_rep'] = math.floor(0.68 * votes_total)
-        self.current_district_results['votes_dem'] = math.floor(0.32 * votes_total)
+        shares = self.imputation_rules['rep_unopposed']
+        self.current_district_results['votes_rep'] = math.floor(shares['votes_rep'] * votes_total)
+        self.current_district_results['votes_dem'] = math.floor(shares['votes_dem'] * votes_total)
         self.current_district_results['votes_other'] = 0
         self.current_district_results['votes_scattered'] = 1
+        self.current_district_results['imputed'] = 'rep_unopposed'
 
     def modify_votes_for_D_unopposed(self):
         votes_total = self.current_district_results['votes_total']
-        self.current_district_results['votes_rep'] = math.floor(0.3 * votes_total)
-        self.current_district_results['votes_dem'] = math.floor(0.7 * votes_total)
+        shares = self.imputation_rules['dem_unopposed']
+        self.current_district_results['votes_rep'] = math.floor(shares['votes_rep'] * votes_total)
+        self.current_district_results['votes_dem'] = math.floor(shares['votes_dem'] * votes_total)
         self.current_district_results['votes_other'] = 0
         self.current_district_results['votes_scattered'] = 1
+        self.current_district_results['imputed'] = 'dem_unopposed'
 
     def check_for_unhandled_elections(self):
         """Check if a congressional election is unhandled by the efficiency gap theory
@@ -283,88 +354,126 @@ class HouseElectionsProcessor:
                 => Individual case analysis
         """
 
+        rule = self.classify_current_district()
+
+        if rule == 'rep_unopposed':
+            self.modify_votes_for_R_unopposed()
+        elif rule == 'dem_unopposed':
+            self.modify_votes_for_D_unopposed()
+
+        if rule in ('rep_unopposed', 'dem_unopposed'):
+            if self.print_modifications:
+                print('{} >= {:.0%} in {} {}... votes modified'.format(
+                    'R' if rule == 'rep_unopposed' else 'D',
+                    self.imputation_rules['unopposed_threshold'],
+                    self.current_state,
+                    self.current_district
+                ))
+                self.print_current_district_votes()
+                print()
+
+        elif rule is not None:
+            msg = 'Case analysis needed in {} {}: {}'.format(
+                self.current_state,
+                self.current_district,
+                UNHANDLED_ELECTION_RULES[rule].format(self.imputation_rules['unopposed_threshold'])
+            )
+
+            if self.only_check_for_unhandled_elections:
+                self.unhandled_elections.append(self.unhandled_election_record(rule))
+                print(msg)
+                print()
+            else:
+                raise utils.ElectionResultsError(msg)
+
+    def classify_current_district(self):
+        """Returns which case of check_for_unhandled_elections the current district's election is
+
+        Returns
+            None if both major parties ran
+            'rep_unopposed' or 'dem_unopposed' if its votes are imputed
+            One of UNHANDLED_ELECTION_RULES if it needs case analysis
+        """
         votes_rep = self.current_district_results['votes_rep']
         votes_dem = self.current_district_results['votes_dem']
         votes_total = self.current_district_results['votes_total']
+        threshold = self.imputation_rules['unopposed_threshold']
 
-        if votes_dem == 0 or votes_rep == 0:
-            # Offer suggestions for modifying results
-            if isinstance(self.current_district_results['votes_total'], int):
-                if votes_rep == 0 and votes_dem == 0:
-                    msg = 'Case analysis needed in {} {}: No R or D candidates'.format(self.current_state, self.current_district)
-                    if self.only_check_for_unhandled_elections:
-                        print(msg)
-                        print()
-                    else:
-                        raise utils.ElectionResultsError(msg)
-                elif isinstance(votes_rep, int) and votes_dem == 0:
-                    if round(votes_rep / votes_total, 2) >= 0.75:
-                        self.modify_votes_for_R_unopposed()
-                        if self.print_modifications:
-                            print('R >= 75% in {} {}... votes modified'.format(self.current_state, self.current_district))
-                            self.print_current_district_votes()
-                            print()
-                    else:
-                        msg = 'Case analysis needed {} {}: no D candidate and R < 75%'.format(self.current_state, self.current_district)
-                        if self.only_check_for_unhandled_elections:
-                            print(msg)
-                            print()
-                        else:
-                            raise utils.ElectionResultsError(msg)
-
-                elif isinstance(votes_dem, int) and votes_rep == 0:
-                    if round(votes_dem / votes_total, 2) >= 0.75:
-                        self.modify_votes_for_D_unopposed()
-                        if self.print_modifications:
-                            print('D >= 75% in {} {}... votes modified'.format(self.current_state, self.current_district))
-                            self.print_current_district_votes()
-                            print()
-                    else:
-                        msg = 'Case analysis needed in {} {}: no R candidate D < 75%'.format(self.current_state, self.current_district)
-                        if self.only_check_for_unhandled_elections:
-                            print(msg)
-                            print()
-                        else:
-                            raise utils.ElectionResultsError(msg)
-            else:
-                msg = 'Case analysis needed in {} {}: no votes logged'.format(self.current_state, self.current_district)
-                if self.only_check_for_unhandled_elections:
-                    print(msg)
-                else:
-                    raise utils.ElectionResultsError(msg)
+        if votes_dem != 0 and votes_rep != 0:
+            return None
+
+        if not isinstance(votes_total, int) or votes_total == 0:
+            return 'no_votes'
+
+        if votes_rep == 0 and votes_dem == 0:
+            return 'no_rep_or_dem'
+
+        if votes_dem == 0:
+            return 'rep_unopposed' if round(votes_rep / votes_total, 2) >= threshold else 'rep_below_threshold'
+
+        return 'dem_unopposed' if round(votes_dem / votes_total, 2) >= threshold else 'dem_below_threshold'
+
+    def unhandled_election_record(self, rule):
+        """Returns a dict describing the current district's election, flagged by rule, for an audit report
+        """
+        record = OrderedDict([
+            ('year', self.year),
+            ('state', self.current_state),
+            ('district', self.current_district),
+            ('rule', rule)
+        ])
+
+        for party in ['votes_dem', 'votes_rep', 'votes_other', 'votes_scattered', 'votes_total']:
+            record[party] = self.current_district_results[party]
+
+        return record
 
     def read_and_process_election_results(self, filepath):
-        with open(filepath) as file:
-            if filepath.endswith(".csv"):
+        """Processes a csv file, which may be compressed. See processor/compression.py
+        """
+        if is_results_file(filepath):
+            with open_results_file(filepath) as file:
                 return self.process_election_results_csv(csv.reader(file))
 
+    def iter_results(self, filepath):
+        """Yields the results of a csv file as they're read. See iter_election_results_csv.
+        """
+        if is_results_file(filepath):
+            with open_results_file(filepath) as file:
+                for r in self.iter_election_results_csv(csv.reader(file)):
+                    yield r
+
     def process_election_results_csv(self, csv_reader_obj):
         """Returns a populated NationalElectionResults object
         """
+        for r in self.iter_election_results_csv(csv_reader_obj):
+            if isinstance(r, StateElectionResults):
+                self.state_results[r.state] = r
 
-        """Map of column names to indices in source data
+        if not self.only_check_for_unhandled_elections:
+            return NationalElectionResults(
+                year=self.year,
+                legislative_body_code=self.legislative_body_code,
+                state_results=self.state_results
+            )
+
+    def iter_election_results_csv(self, csv_reader_obj):
+        """Yields each DistrictElectionResults as soon as its district is closed and each
+            StateElectionResults as soon as its state is closed
 
-        Notes (based on 2014 FEC results)
-            1. ge = General Election
-            2. ge_votes_runoff applies to LA only if no candidate won a majority in the first round
-            3. ge_votes_combined applies to CT, NY, SC because minor parties coalesce around major party
+        Only the districts of the current state are kept, so consumers can process results
+        before the whole file is read without holding every state in memory. Nothing is
+        yielded if only_check_for_unhandled_elections is set.
+
+        If unordered_input is set, nothing is yielded until the whole file is read. See
+        iter_aggregated_election_results_csv.
         """
-        column_index = {
-            'state': 0,
-            'district': 1,
-            'incumbent_indicator': 2,
-            'first_name': 3,
-            'last_name': 4,
-            'total_votes_label': 5,
-            'party': 6,
-            'ge_votes': 7,
-            'ge_percent': 8,
-            'ge_votes_runoff': 9,
-            'ge_votes_runoff_percent': 10,
-            'ge_votes_combined': 11,
-            'ge_votes_combined_percent': 12,
-            'ge_winner_indicator': 13
-        }
+        if self.unordered_input:
+            for r in self.iter_aggregated_election_results_csv(csv_reader_obj):
+                yield r
+            return
+
+        column_index = COLUMN_INDEX
 
         for i, row in enumerate(csv_reader_obj):
             if i > 0:
@@ -394,7 +503,7 @@ class HouseElectionsProcessor:
                             if self.only_check_for_unhandled_elections:
                                 self.check_for_unhandled_elections()
                             else:
-                                self.push_current_district_results()
+                                yield self.push_current_district_results()
 
                             self.reset_current_district_results()
 
@@ -402,7 +511,7 @@ class HouseElectionsProcessor:
 
                     if self.current_state != state:
                         if not self.only_check_for_unhandled_elections:
-                            self.push_current_state_results()
+                            yield self.push_current_state_results()
 
                         self.current_state = state
                         self.reset_district_results()
@@ -413,10 +522,70 @@ class HouseElectionsProcessor:
 
         # Push the last state
         if not self.only_check_for_unhandled_elections:
-            self.push_current_state_results()
+            yield self.push_current_state_results()
 
-            return NationalElectionResults(
-                year=self.year,
-                legislative_body_code=self.legislative_body_code,
-                state_results=self.state_results
-            )
+    def aggregate_district_results(self, csv_reader_obj):
+        """Sums the votes of every district in one pass over rows in any order
+
+        Returns an OrderedDict of two-letter state abbreviations, in the order they were first read, to dicts
+        of district numbers to the district's votes
+        """
+        column_index = COLUMN_INDEX
+        districts_by_state = OrderedDict()
+
+        for i, row in enumerate(csv_reader_obj):
+            if i > 0:
+                state = row[column_index['state']].strip()
+                district = self.to_int_district(row[column_index['district']])
+
+                if state in states and isinstance(district, int):
+                    districts = districts_by_state.setdefault(state, {})
+
+                    if district not in districts:
+                        self.reset_current_district_results()
+                        districts[district] = self.current_district_results
+
+                    self.current_state = state
+                    self.current_district = district
+                    self.current_district_results = districts[district]
+
+                    self.read_row_data(
+                        i,
+                        state,
+                        district,
+                        row[column_index['party']].strip(),
+                        row[column_index['ge_winner_indicator']].strip(),
+                        row[column_index['last_name']].strip(),
+                        row[column_index['first_name']].strip(),
+                        self.to_int_votes(row[column_index['ge_votes']]),
+                        self.to_int_votes(row[column_index['ge_votes_runoff']]),
+                        self.to_int_votes(row[column_index['ge_votes_combined']]),
+                        row[column_index['total_votes_label']].strip()
+                    )
+
+        return districts_by_state
+
+    def iter_aggregated_election_results_csv(self, csv_reader_obj):
+        """Yields the results of every district and state of rows in any order
+
+        The rows don't need to be grouped by state and district, so a district's rows can be split
+        across the file. Once every row is read, each state's districts are finalized in order of
+        district number, then the state. States are yielded in the order they were first read.
+        """
+        districts_by_state = self.aggregate_district_results(csv_reader_obj)
+
+        for state, districts in districts_by_state.items():
+            self.current_state = state
+            self.reset_district_results()
+
+            for district in sorted(districts):
+                self.current_district = district
+                self.current_district_results = districts[district]
+
+                if self.only_check_for_unhandled_elections:
+                    self.check_for_unhandled_elections()
+                else:
+                    yield self.push_current_district_results()
+
+            if not self.only_check_for_unhandled_elections:
+                yield self.push_current_state_results()
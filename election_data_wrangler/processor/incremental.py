@@ -0,0 +1,114 @@
+"""Defines functions for re-processing only the states that changed in a revised results file
+"""
+
+import hashlib
+from fixtures.states import states
+from election_results.national import NationalElectionResults
+from election_results.state import StateElectionResults
+from processor.house_election_results import COLUMN_INDEX
+
+
+def read_state_blocks(csv_reader_obj):
+    """Splits the rows of a results csv into blocks of contiguous rows of a US state
+
+    Rows that aren't of a US state are left out since the processors skip them.
+
+    Returns the row of column names and a list of (state, rows) in the order they were read
+    """
+    rows = iter(csv_reader_obj)
+    header = next(rows, None)
+    blocks = []
+
+    for row in rows:
+        state = row[COLUMN_INDEX['state']].strip() if len(row) > COLUMN_INDEX['state'] else ''
+
+        if state in states:
+            if len(blocks) == 0 or blocks[-1][0] != state:
+                blocks.append((state, []))
+
+            blocks[-1][1].append(row)
+
+    return header, blocks
+
+
+def fingerprint_rows(rows):
+    """Returns a hash of the content of rows
+    """
+    h = hashlib.sha256()
+
+    for row in rows:
+        h.update('\x1f'.join(row).encode('utf-8'))
+        h.update(b'\n')
+
+    return h.hexdigest()
+
+
+def process_state_block(processor, header, rows, next_row=None):
+    """Processes a state's block of rows the same as if it were read along with the rest of
+        the file. Returns its StateElectionResults.
+
+    Attributes:
+        processor (HouseElectionsProcessor) - A copy of it processes the rows
+        header (List) - Row of column names
+        rows (List) - The state's rows
+        next_row (List) - First row of the next state's block. In the whole file it's the row
+            that closes the state's last district, so it's read after the state's rows.
+    """
+    rows = [header] + rows + ([] if next_row is None else [next_row])
+
+    for r in processor.copy().iter_election_results_csv(rows):
+        if isinstance(r, StateElectionResults):
+            return r
+
+
+def process_election_results_csv_incrementally(processor, csv_reader_obj, previous=None):
+    """Processes a results csv, re-using the StateElectionResults of the states whose rows
+        are unchanged since a previous run
+
+    Attributes:
+        processor (HouseElectionsProcessor) - Processes the states that changed
+        csv_reader_obj - Rows of the results csv
+        previous (Dict) - The snapshot returned by a previous run on an earlier version of the
+            file. Every state is processed if None.
+
+    Returns a tuple of
+        national_results (NationalElectionResults) - None if the processor only checks for
+            unhandled elections
+        snapshot (Dict) - Two-letter state abbreviations to a dict of the fingerprint of the
+            state's rows and its StateElectionResults
+        changed_states (List) - The states that were processed, in the order they were read
+        removed_states (List) - The states of the previous snapshot that aren't in the revised
+            file, in alphabetical order. They're left out of the results and the snapshot
+    """
+    previous = {} if previous is None else previous
+    header, blocks = read_state_blocks(csv_reader_obj)
+    snapshot = {}
+    changed_states = []
+
+    for i, (state, rows) in enumerate(blocks):
+        next_row = blocks[i + 1][1][0] if i + 1 < len(blocks) else None
+        fingerprint = fingerprint_rows(rows + ([] if next_row is None else [next_row]))
+
+        if state in previous and previous[state]['fingerprint'] == fingerprint:
+            state_results = previous[state]['state_results']
+        else:
+            state_results = process_state_block(processor, header, rows, next_row)
+            changed_states.append(state)
+
+        snapshot[state] = {
+            'fingerprint': fingerprint,
+            'state_results': state_results
+        }
+
+    removed_states = sorted(state for state in previous if state not in snapshot)
+
+    if processor.only_check_for_unhandled_elections:
+        return None, snapshot, changed_states, removed_states
+
+    national_results = NationalElectionResults(
+        year=processor.year,
+        legislative_body_code=processor.legislative_body_code,
+        state_results=dict((state, s['state_results']) for state, s in snapshot.items())
+    )
+
+    return national_results, snapshot, changed_states, removed_states
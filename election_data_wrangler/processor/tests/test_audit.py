@@ -0,0 +1,95 @@
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from processor.audit import audit_election_results, summarize_audit, write_audit_report, AUDIT_REPORT_FIELDS
+from processor.columnar_house_election_results import ColumnarHouseElectionsProcessor
+from processor.chunked_house_election_results import ChunkedHouseElectionsProcessor
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+ROWS = [
+    row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+    # Handled
+    row('AL', '01', 'R', '100'),
+    row('AL', '01', 'D', '60'),
+    row('AL', '01', '', '160', label='District Votes:'),
+    # R unopposed, votes are imputed
+    row('AL', '02', 'R', '90'),
+    row('AL', '02', 'LIB', '10'),
+    row('AL', '02', '', '100', label='District Votes:'),
+    # R < 75%
+    row('AL', '03', 'R', '60'),
+    row('AL', '03', 'LIB', '40'),
+    row('AL', '03', '', '100', label='District Votes:'),
+    row('AL', '', '', '', label='Party Votes:'),
+    # No R or D
+    row('AK', '00', 'LIB', '50'),
+    row('AK', '00', 'IND', '40'),
+    row('AK', '00', '', '90', label='District Votes:'),
+    row('AK', '', '', '', label='Party Votes:'),
+    # D < 75%
+    row('AZ', '01', 'D', '50'),
+    row('AZ', '01', 'GRE', '50'),
+    row('AZ', '01', '', '100', label='District Votes:'),
+    # No votes
+    row('AZ', '02', 'D', 'Unopposed'),
+    row('AZ', '02', '', '', label='District Votes:'),
+    row('AZ', '', '', '', label='Party Votes:')
+]
+
+class TestAudit(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.dir, '2014.csv')
+
+        with open(self.filepath, 'w') as file:
+            csv.writer(file).writerows(ROWS)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_collects_every_unhandled_election(self):
+        unhandled_elections = audit_election_results(self.filepath)
+
+        self.assertEqual(
+            [(e['state'], e['district'], e['rule']) for e in unhandled_elections],
+            [('AL', 3, 'rep_below_threshold'), ('AK', 1, 'no_rep_or_dem'), ('AZ', 1, 'dem_below_threshold'), ('AZ', 2, 'no_votes')]
+        )
+        self.assertEqual(unhandled_elections[0]['votes_rep'], 60)
+        self.assertEqual(unhandled_elections[0]['votes_other'], 40)
+        self.assertEqual(unhandled_elections[0]['year'], '2014')
+        self.assertEqual(summarize_audit(unhandled_elections), {
+            'no_rep_or_dem': 1,
+            'rep_below_threshold': 1,
+            'dem_below_threshold': 1,
+            'no_votes': 1
+        })
+
+    def test_collects_same_elections_with_every_processor(self):
+        expected = audit_election_results(self.filepath)
+
+        self.assertEqual(audit_election_results(self.filepath, ColumnarHouseElectionsProcessor), expected)
+        self.assertEqual(audit_election_results(self.filepath, ChunkedHouseElectionsProcessor, jobs=1, number_of_chunks=3), expected)
+
+    def test_writes_report_as_json_or_csv(self):
+        unhandled_elections = audit_election_results(self.filepath)
+
+        json_filepath = os.path.join(self.dir, 'audit.json')
+        write_audit_report(unhandled_elections, json_filepath)
+        with open(json_filepath) as file:
+            report = json.load(file)
+        self.assertEqual(report['summary']['no_votes'], 1)
+        self.assertEqual(len(report['unhandled_elections']), 4)
+
+        csv_filepath = os.path.join(self.dir, 'audit.csv')
+        write_audit_report(unhandled_elections, csv_filepath)
+        with open(csv_filepath) as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], AUDIT_REPORT_FIELDS)
+        self.assertEqual(rows[1][:4], ['2014', 'AL', '3', 'rep_below_threshold'])
+        self.assertEqual(len(rows), 5)
@@ -0,0 +1,54 @@
+import os
+import csv
+import shutil
+import tempfile
+import unittest
+from processor.batch import year_from_filepath, process_election_years
+from processor.columnar_house_election_results import ColumnarHouseElectionsProcessor
+from election_results.national import NationalElectionResults
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filepaths = []
+
+        for year, votes_dem in [('2012', '60'), ('2014', '70'), ('2016', '80')]:
+            filepath = os.path.join(self.dir, '{}.csv'.format(year))
+            with open(filepath, 'w') as file:
+                csv.writer(file).writerows([
+                    row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+                    row('AL', '01', 'R', '100'),
+                    row('AL', '01', 'D', votes_dem),
+                    row('AL', '01', '', '200', label='District Votes:'),
+                    row('AL', '', '', '', label='Party Votes:')
+                ])
+            self.filepaths.append(filepath)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_gets_year_from_filepath(self):
+        self.assertEqual(year_from_filepath('/data/2014.csv'), '2014')
+        self.assertEqual(year_from_filepath('2016.csv'), '2016')
+
+    def test_processes_election_years_sequentially(self):
+        results = process_election_years(self.filepaths, jobs=1, quiet=True)
+
+        self.assertEqual(sorted(results.keys()), ['2012', '2014', '2016'])
+        for year, national_results in results.items():
+            self.assertIsInstance(national_results, NationalElectionResults)
+            self.assertEqual(national_results.year, year)
+
+        self.assertEqual(results['2014'].votes_total_dem, 70)
+
+    def test_processes_election_years_in_parallel(self):
+        results = process_election_years(self.filepaths, jobs=2, quiet=True,
+            processor_class=ColumnarHouseElectionsProcessor)
+
+        self.assertEqual(sorted(results.keys()), ['2012', '2014', '2016'])
+        self.assertEqual(results['2012'].votes_total_dem, 60)
+        self.assertEqual(results['2016'].state_results['AL'].votes_total_dem, 80)
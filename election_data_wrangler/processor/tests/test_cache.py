@@ -0,0 +1,118 @@
+import os
+import csv
+import shutil
+import tempfile
+import unittest
+from processor.cache import ResultsCache
+from processor.house_election_results import HouseElectionsProcessor, IMPUTATION_RULES
+from election_results.national import NationalElectionResults
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+class CountingProcessor(HouseElectionsProcessor):
+    calls = 0
+
+    def read_and_process_election_results(self, filepath):
+        CountingProcessor.calls += 1
+        return super(__class__, self).read_and_process_election_results(filepath)
+
+class TestResultsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = ResultsCache(os.path.join(self.dir, 'cache'))
+        self.filepath = os.path.join(self.dir, '2014.csv')
+        self.write_results_file('60')
+        CountingProcessor.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_results_file(self, votes_dem):
+        with open(self.filepath, 'w') as file:
+            csv.writer(file).writerows([
+                row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+                row('AL', '01', 'R', '100'),
+                row('AL', '01', 'D', votes_dem),
+                row('AL', '01', '', '200', label='District Votes:'),
+                row('AL', '', '', '', label='Party Votes:')
+            ])
+
+    def test_loads_cached_results_if_file_is_unchanged(self):
+        first = self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+        second = self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+
+        self.assertEqual(CountingProcessor.calls, 1)
+        self.assertIsInstance(second, NationalElectionResults)
+        self.assertEqual(second.votes_total_dem, first.votes_total_dem)
+        self.assertEqual(second.state_results['AL'].efficiency_gap, first.state_results['AL'].efficiency_gap)
+        self.assertEqual(len(second.state_results['AL'].districts_won_rep), 1)
+
+    def test_reprocesses_file_if_its_content_changed(self):
+        self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+        self.write_results_file('70')
+        results = self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+
+        self.assertEqual(CountingProcessor.calls, 2)
+        self.assertEqual(results.votes_total_dem, 70)
+
+    def test_key_depends_on_processor_options(self):
+        rules = dict(IMPUTATION_RULES, unopposed_threshold=0.8)
+        keys = set([
+            self.cache.key(self.filepath, HouseElectionsProcessor(2014)),
+            self.cache.key(self.filepath, HouseElectionsProcessor(2014, only_check_for_unhandled_elections=True)),
+            self.cache.key(self.filepath, HouseElectionsProcessor(2014, imputation_rules=rules))
+        ])
+        self.assertEqual(len(keys), 3)
+
+    def test_refresh_reprocesses_cached_file(self):
+        self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+        self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath, refresh=True)
+        self.assertEqual(CountingProcessor.calls, 2)
+
+    def test_treats_corrupt_entry_as_a_miss(self):
+        processor = CountingProcessor(2014)
+        key = self.cache.key(self.filepath, processor)
+        with open(self.cache.path(key), 'wb') as file:
+            file.write(b'foo')
+
+        results = self.cache.read_and_process_election_results(processor, self.filepath)
+        self.assertEqual(CountingProcessor.calls, 1)
+        self.assertEqual(results.votes_total_dem, 60)
+
+    def test_evicts_least_recently_used_entries(self):
+        results = HouseElectionsProcessor(2014).read_and_process_election_results(self.filepath)
+
+        self.cache.put('a', results)
+        entry_size = self.cache.size()
+        self.cache.max_size = 2 * entry_size
+        os.utime(self.cache.path('a'), (0, 0))
+
+        self.cache.put('b', results)
+        self.cache.put('c', results)
+
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertIsInstance(self.cache.get('b'), NationalElectionResults)
+        self.assertIsInstance(self.cache.get('c'), NationalElectionResults)
+
+    def test_clears_entries(self):
+        self.cache.read_and_process_election_results(CountingProcessor(2014), self.filepath)
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_processes_only_states_that_changed_since_last_run(self):
+        results, changed_states, _ = self.cache.read_and_process_election_results_incrementally(
+            HouseElectionsProcessor(2014), self.filepath)
+        self.assertEqual(changed_states, ['AL'])
+
+        results, changed_states, _ = self.cache.read_and_process_election_results_incrementally(
+            HouseElectionsProcessor(2014), self.filepath)
+        self.assertEqual(changed_states, [])
+        self.assertEqual(results.votes_total_dem, 60)
+
+        self.write_results_file('70')
+        results, changed_states, _ = self.cache.read_and_process_election_results_incrementally(
+            HouseElectionsProcessor(2014), self.filepath)
+        self.assertEqual(changed_states, ['AL'])
+        self.assertEqual(results.votes_total_dem, 70)
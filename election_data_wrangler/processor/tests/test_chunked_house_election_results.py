@@ -0,0 +1,95 @@
+import os
+import csv
+import mmap
+import shutil
+import tempfile
+import unittest
+from processor.house_election_results import HouseElectionsProcessor
+from processor.chunked_house_election_results import ChunkedHouseElectionsProcessor as processor
+from processor.chunked_house_election_results import find_chunk_boundaries, find_next_state, read_state
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+def state_rows(state, number_of_districts):
+    rows = []
+    for d in range(1, number_of_districts + 1):
+        district = '00' if number_of_districts == 1 else '{:02d}'.format(d)
+        rows += [
+            row(state, district, 'R', '{:,}'.format(1000 + 10 * d)),
+            row(state, district, 'D', '{:,}'.format(900 + 30 * d)),
+            row(state, district, '', '{:,}'.format(1900 + 40 * d), label='District Votes:')
+        ]
+    return rows + [row(state, '', '', '', label='Party Votes:'), row('', '', '', '')]
+
+class TestChunkedHouseElectionsProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.dir, '2014.csv')
+
+        rows = [row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES')]
+        for state, number_of_districts in [('AL', 7), ('AK', 1), ('AZ', 9), ('AR', 4), ('CA', 53), ('CO', 7)]:
+            rows += state_rows(state, number_of_districts)
+
+        with open(self.filepath, 'w') as file:
+            csv.writer(file).writerows(rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertSameResults(self, results, expected):
+        self.assertEqual(sorted(results.state_results.keys()), sorted(expected.state_results.keys()))
+        self.assertEqual(results.votes_total, expected.votes_total)
+        self.assertEqual(results.votes_wasted_net, expected.votes_wasted_net)
+
+        for state, expected_state_results in expected.state_results.items():
+            state_results = results.state_results[state]
+            self.assertEqual(state_results.votes_total_dem, expected_state_results.votes_total_dem)
+            self.assertEqual(state_results.efficiency_gap, expected_state_results.efficiency_gap)
+            self.assertEqual(
+                len(state_results.districts_won_dem + state_results.districts_won_rep),
+                len(expected_state_results.districts_won_dem + expected_state_results.districts_won_rep)
+            )
+
+    def test_reads_state_of_line(self):
+        self.assertEqual(read_state(b'AL,01,,foo\r\n'), 'AL')
+        self.assertEqual(read_state(b'" NY ",01\n'), 'NY')
+        self.assertEqual(read_state(b'\r\n'), '')
+
+    def test_chunks_start_where_a_state_starts(self):
+        with open(self.filepath, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                boundaries = find_chunk_boundaries(mm, 4)
+
+                self.assertEqual(boundaries[0], mm.find(b'\n') + 1)
+                self.assertEqual(boundaries[-1], len(mm))
+                self.assertEqual(boundaries, sorted(set(boundaries)))
+
+                # Every state is in only one chunk
+                chunk_states = []
+                for start, end in zip(boundaries[:-1], boundaries[1:]):
+                    lines = mm[start:end].splitlines()
+                    chunk_states.append(set(read_state(line) for line in lines) - set(['']))
+
+                self.assertGreater(len(chunk_states), 1)
+                self.assertEqual(sum(len(s) for s in chunk_states), 6)
+
+    def test_finds_next_state(self):
+        with open(self.filepath, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ak = mm.find(b'AK,')
+                self.assertEqual(find_next_state(mm, mm.find(b'AL,01')), ak)
+                self.assertEqual(find_next_state(mm, mm.find(b'AL,07')), ak)
+                self.assertEqual(find_next_state(mm, ak), mm.find(b'AZ,'))
+                self.assertEqual(find_next_state(mm, mm.find(b'CO,')), len(mm))
+
+    def test_processes_chunks_same_as_HouseElectionsProcessor(self):
+        expected = HouseElectionsProcessor(2014).read_and_process_election_results(self.filepath)
+
+        self.assertSameResults(processor(2014, jobs=1).read_and_process_election_results(self.filepath), expected)
+        self.assertSameResults(processor(2014, jobs=1, number_of_chunks=20).read_and_process_election_results(self.filepath), expected)
+        self.assertSameResults(processor(2014, jobs=2).read_and_process_election_results(self.filepath), expected)
+
+    def test_returns_None_if_only_checking_for_unhandled_elections(self):
+        self.assertEqual(processor(2014, jobs=1, only_check_for_unhandled_elections=True).read_and_process_election_results(self.filepath), None)
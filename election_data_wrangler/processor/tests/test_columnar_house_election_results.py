@@ -0,0 +1,153 @@
+import unittest
+import numpy as np
+import election_results.utils as utils
+from processor.house_election_results import HouseElectionsProcessor
+from processor.columnar_house_election_results import ColumnarHouseElectionsProcessor as processor
+from processor.columnar_house_election_results import PARTY_CLASSES, IGNORED, NO_DISTRICT
+from election_results.national import NationalElectionResults
+
+HEADER = ['STATE ABBREVIATION', 'D', '(I)', 'FIRST NAME', 'LAST NAME', 'TOTAL VOTES', 'PARTY',
+    'GENERAL VOTES', 'GE%', 'GE RUNOFF', 'RUNOFF%', 'COMBINED', 'COMBINED%', 'GE WINNER']
+
+def row(state, district, party, votes, label='', runoff='', combined=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', runoff, '', combined, '', '']
+
+ROWS = [
+    HEADER,
+    row('AL', '01', 'R', '103,758'),
+    row('AL', '01', 'D', '52,000'),
+    row('AL', '01', 'W', '151'),
+    row('AL', '01', '', '155,909', label='District Votes:'),
+    row('AL', '02', 'R', '113,103'),
+    row('AL', '02', '', '113,103', label='District Votes:'),
+    row('AL', '', '', '', label='Party Votes:'),
+    row('', '', '', ''),
+    row('AK', '00', 'R', '142,572'),
+    row('AK', '00', 'D', '114,602'),
+    row('AK', '00', 'LIB', '15,028'),
+    row('AK', '00', '', '272,202', label='District Votes:'),
+    row('AK', '', '', '', label='Party Votes:'),
+    row('LA', '05', 'R', '80,000', runoff='120,000'),
+    row('LA', '05', 'D', '70,000', runoff='100,000'),
+    row('LA', '05', '', '220,000', label='District Votes:'),
+    row('LA', '', '', '', label='Party Votes:'),
+    row('NY', '01', 'D', '90,000', combined='100,000'),
+    row('NY', '01', 'R', '95,000'),
+    row('NY', '01', '', '195,000', label='District Votes:'),
+    row('NY', '', '', '', label='Party Votes:'),
+    ['Total', '', '', '', '', '', '', '', '', '', '', '', '', '']
+]
+
+class TestColumnarHouseElectionsProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.proc = processor(2014)
+
+    def tearDown(self):
+        del self.proc
+
+    def test_converts_values_to_int_if_numeric(self):
+        ints, numeric = self.proc.to_int_array(np.array(['01', '11', '123,456', 'H', '', 'Unopposed']))
+        self.assertEqual(ints.tolist(), [1, 11, 123456, 0, 0, 0])
+        self.assertEqual(numeric.tolist(), [True, True, True, False, False, False])
+
+    def test_converts_00_districts_to_1(self):
+        districts = self.proc.to_int_district_array(np.array(['00', '01', '11', 'H', '']))
+        self.assertEqual(districts.tolist(), [1, 1, 11, NO_DISTRICT, NO_DISTRICT])
+
+    def test_reads_votes_by_priority(self):
+        votes = self.proc.read_votes_array(
+            np.array(['1', '1', '1', '', 'Unopposed']),
+            np.array(['', '2', '2', '', '']),
+            np.array(['', '', '3', '', ''])
+        )
+        self.assertEqual(votes.tolist(), [1, 2, 3, 0, 0])
+
+    def test_classifies_parties(self):
+        party_classes = self.proc.classify_parties(
+            np.array(['R', 'rep', ' D ', 'DEM', 'W', 'LIB', '', '']),
+            np.array(['', '', '', '', '', '', 'District Votes:', 'Party Votes:'])
+        )
+        self.assertEqual(party_classes.tolist(), [
+            PARTY_CLASSES.index('votes_rep'),
+            PARTY_CLASSES.index('votes_rep'),
+            PARTY_CLASSES.index('votes_dem'),
+            PARTY_CLASSES.index('votes_dem'),
+            PARTY_CLASSES.index('votes_scattered'),
+            PARTY_CLASSES.index('votes_other'),
+            PARTY_CLASSES.index('votes_total'),
+            IGNORED
+        ])
+
+    def test_groups_districts(self):
+        districts = self.proc.group_districts(self.proc.read_columns(iter(ROWS)))
+
+        self.assertEqual(districts['state'], ['AL', 'AL', 'AK', 'LA', 'NY'])
+        self.assertEqual(districts['district'], [1, 2, 1, 5, 1])
+        self.assertEqual(districts['state_run_states'], ['AL', 'AK', 'LA', 'NY'])
+        self.assertEqual(districts['state_run'].tolist(), [0, 0, 1, 2, 3])
+        self.assertEqual(districts['votes'][0].tolist(), [52000, 103758, 0, 151, 155909])
+        self.assertEqual(districts['votes'][3].tolist(), [100000, 120000, 0, 0, 220000])
+        self.assertEqual(districts['votes'][4].tolist(), [100000, 95000, 0, 0, 195000])
+
+    def test_aggregates_districts_of_unordered_rows(self):
+        rows = [ROWS[0]] + list(reversed(ROWS[1:]))
+        districts = self.proc.aggregate_districts(self.proc.read_columns(iter(rows)))
+
+        self.assertEqual(districts['state'], ['NY', 'LA', 'AK', 'AL', 'AL'])
+        self.assertEqual(districts['district'], [1, 5, 1, 1, 2])
+        self.assertEqual(districts['state_run_states'], ['NY', 'LA', 'AK', 'AL'])
+        self.assertEqual(districts['state_run'].tolist(), [0, 1, 2, 3, 3])
+        self.assertEqual(districts['votes'][3].tolist(), [52000, 103758, 0, 151, 155909])
+
+        results = processor(2014, unordered_input=True).process_election_results_csv(iter(rows))
+        expected = HouseElectionsProcessor(2014).process_election_results_csv(iter(ROWS))
+        self.assertEqual(results.votes_wasted_net, expected.votes_wasted_net)
+        self.assertEqual(results.state_results['AL'].efficiency_gap, expected.state_results['AL'].efficiency_gap)
+
+    def test_processes_election_results_csv_same_as_HouseElectionsProcessor(self):
+        results = self.proc.process_election_results_csv(iter(ROWS))
+        expected = HouseElectionsProcessor(2014).process_election_results_csv(iter(ROWS))
+
+        self.assertIsInstance(results, NationalElectionResults)
+        self.assertEqual(sorted(results.state_results.keys()), sorted(expected.state_results.keys()))
+        self.assertEqual(results.votes_total, expected.votes_total)
+        self.assertEqual(results.votes_wasted_net, expected.votes_wasted_net)
+
+        for state, expected_state_results in expected.state_results.items():
+            state_results = results.state_results[state]
+            self.assertEqual(state_results.votes_total_dem, expected_state_results.votes_total_dem)
+            self.assertEqual(state_results.votes_total_rep, expected_state_results.votes_total_rep)
+            self.assertEqual(state_results.votes_total_other, expected_state_results.votes_total_other)
+            self.assertEqual(state_results.efficiency_gap, expected_state_results.efficiency_gap)
+
+            districts = state_results.districts_won_dem + state_results.districts_won_rep
+            expected_districts = expected_state_results.districts_won_dem + expected_state_results.districts_won_rep
+            self.assertEqual(
+                [(d.district, d.votes_dem, d.votes_rep, d.votes_wasted_net, d.imputed) for d in districts],
+                [(d.district, d.votes_dem, d.votes_rep, d.votes_wasted_net, d.imputed) for d in expected_districts]
+            )
+            for d in districts:
+                self.assertIsInstance(d.votes_dem, int)
+
+    def test_modifies_votes_of_unopposed_candidate(self):
+        results = self.proc.process_election_results_csv(iter(ROWS))
+        al_2 = results.state_results['AL'].districts_won_rep[1]
+
+        self.assertEqual(al_2.district, '2')
+        self.assertEqual(al_2.votes_rep, 76910)
+        self.assertEqual(al_2.votes_dem, 36192)
+        self.assertEqual(al_2.imputed, 'rep_unopposed')
+        self.assertEqual(results.state_results['AL'].districts_won_rep[0].imputed, None)
+
+    def test_raises_exception_for_unhandled_election(self):
+        rows = ROWS[:5] + [
+            row('AL', '02', 'R', '60,000'),
+            row('AL', '02', 'LIB', '40,000'),
+            row('AL', '02', '', '100,000', label='District Votes:'),
+            row('AL', '', '', '', label='Party Votes:')
+        ]
+        self.assertRaises(utils.ElectionResultsError, self.proc.process_election_results_csv, iter(rows))
+
+        self.proc = processor(2014, only_check_for_unhandled_elections=True)
+        self.assertEqual(self.proc.process_election_results_csv(iter(rows)), None)
@@ -0,0 +1,92 @@
+import os
+import bz2
+import csv
+import gzip
+import lzma
+import shutil
+import zipfile
+import tempfile
+import unittest
+from processor.compression import detect_compression, is_results_file, open_results_file
+from processor.house_election_results import HouseElectionsProcessor as processor
+from processor.chunked_house_election_results import ChunkedHouseElectionsProcessor
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+ROWS = [
+    row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+    row('AL', '01', 'R', '100'),
+    row('AL', '01', 'D', '60'),
+    row('AL', '01', '', '160', label='District Votes:'),
+    row('AL', '', '', '', label='Party Votes:')
+]
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.csv_filepath = os.path.join(self.dir, '2014.csv')
+
+        with open(self.csv_filepath, 'w') as file:
+            csv.writer(file).writerows(ROWS)
+
+        with open(self.csv_filepath, 'rb') as file:
+            self.content = file.read()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_compressed_files(self):
+        filepaths = {}
+
+        for compression, extension, opener in [('gzip', '.csv.gz', gzip.open), ('bz2', '.csv.bz2', bz2.open), ('xz', '.csv.xz', lzma.open)]:
+            filepaths[compression] = os.path.join(self.dir, '2014' + extension)
+            with opener(filepaths[compression], 'wb') as file:
+                file.write(self.content)
+
+        filepaths['zip'] = os.path.join(self.dir, '2014.zip')
+        with zipfile.ZipFile(filepaths['zip'], 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(self.csv_filepath, '2014.csv')
+
+        return filepaths
+
+    def test_detects_compression_from_leading_bytes(self):
+        self.assertEqual(detect_compression(self.csv_filepath), None)
+
+        for compression, filepath in self.write_compressed_files().items():
+            # The name doesn't matter
+            renamed = os.path.join(self.dir, 'renamed')
+            shutil.copy(filepath, renamed)
+            self.assertEqual(detect_compression(renamed), compression)
+
+    def test_is_results_file(self):
+        for filename in ['2014.csv', '2014.csv.gz', '2014.csv.bz2', '2014.csv.xz', '2014.zip']:
+            self.assertTrue(is_results_file(filename))
+        self.assertFalse(is_results_file('2014.txt'))
+
+    def test_reads_compressed_files(self):
+        for filepath in self.write_compressed_files().values():
+            with open_results_file(filepath) as file:
+                self.assertEqual(list(csv.reader(file)), ROWS)
+
+    def test_raises_exception_for_zip_of_many_files(self):
+        filepath = os.path.join(self.dir, '2014.zip')
+        with zipfile.ZipFile(filepath, 'w') as archive:
+            archive.write(self.csv_filepath, '2014.csv')
+            archive.write(self.csv_filepath, '2016.csv')
+
+        with self.assertRaises(ValueError):
+            with open_results_file(filepath):
+                pass
+
+    def test_processes_compressed_files(self):
+        expected = processor(2014).read_and_process_election_results(self.csv_filepath)
+
+        for filepath in self.write_compressed_files().values():
+            for proc in [processor(2014), ChunkedHouseElectionsProcessor(2014, jobs=1)]:
+                results = proc.read_and_process_election_results(filepath)
+                self.assertEqual(results.votes_total_dem, expected.votes_total_dem)
+                self.assertEqual(results.state_results['AL'].efficiency_gap, expected.state_results['AL'].efficiency_gap)
+
+            self.assertEqual(len(list(processor(2014).iter_results(filepath))), 2)
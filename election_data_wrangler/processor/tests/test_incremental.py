@@ -0,0 +1,81 @@
+import unittest
+from processor.house_election_results import HouseElectionsProcessor as processor
+from processor.incremental import read_state_blocks, fingerprint_rows, process_election_results_csv_incrementally
+from election_results.national import NationalElectionResults
+
+def row(state, district, party, votes, label=''):
+    return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+def results_file(votes_dem_la='90'):
+    return [
+        row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+        row('AL', '01', 'R', '100'),
+        row('AL', '01', 'D', '60'),
+        row('AL', '01', '', '160', label='District Votes:'),
+        row('AL', '02', 'R', '80'),
+        row('AL', '02', 'D', '90'),
+        row('AL', '02', '', '170', label='District Votes:'),
+        row('', '', '', ''),
+        row('AK', '00', 'R', '50'),
+        row('AK', '00', 'D', '40'),
+        row('AK', '00', '', '90', label='District Votes:'),
+        row('AK', '', '', '', label='Party Votes:'),
+        row('LA', '01', 'R', '100'),
+        row('LA', '01', 'D', votes_dem_la),
+        row('LA', '01', '', str(100 + int(votes_dem_la)), label='District Votes:'),
+        row('LA', '', '', '', label='Party Votes:')
+    ]
+
+class TestIncremental(unittest.TestCase):
+
+    def assertSameResults(self, results, expected):
+        self.assertIsInstance(results, NationalElectionResults)
+        self.assertEqual(sorted(results.state_results.keys()), sorted(expected.state_results.keys()))
+        self.assertEqual(results.votes_total_dem, expected.votes_total_dem)
+        self.assertEqual(results.votes_wasted_net, expected.votes_wasted_net)
+
+        for state, expected_state_results in expected.state_results.items():
+            state_results = results.state_results[state]
+            self.assertEqual(state_results.votes_total, expected_state_results.votes_total)
+            self.assertEqual(state_results.efficiency_gap, expected_state_results.efficiency_gap)
+            self.assertEqual(len(state_results.districts_won_dem), len(expected_state_results.districts_won_dem))
+            self.assertEqual(len(state_results.districts_won_rep), len(expected_state_results.districts_won_rep))
+
+    def test_reads_state_blocks(self):
+        header, blocks = read_state_blocks(results_file())
+
+        self.assertEqual(header[0], 'STATE ABBREVIATION')
+        self.assertEqual([state for state, _ in blocks], ['AL', 'AK', 'LA'])
+        self.assertEqual([len(rows) for _, rows in blocks], [6, 4, 4])
+
+    def test_fingerprints_depend_on_content(self):
+        self.assertEqual(fingerprint_rows(results_file()[1:3]), fingerprint_rows(results_file()[1:3]))
+        self.assertNotEqual(fingerprint_rows(results_file()[1:3]), fingerprint_rows(results_file()[1:4]))
+
+    def test_processes_every_state_without_a_previous_snapshot(self):
+        results, snapshot, changed_states, removed_states = process_election_results_csv_incrementally(processor(2014), results_file())
+
+        self.assertEqual(changed_states, ['AL', 'AK', 'LA'])
+        self.assertEqual(removed_states, [])
+        self.assertEqual(sorted(snapshot.keys()), ['AK', 'AL', 'LA'])
+        self.assertSameResults(results, processor(2014).process_election_results_csv(results_file()))
+
+    def test_processes_only_states_that_changed(self):
+        _, snapshot, _, _ = process_election_results_csv_incrementally(processor(2014), results_file())
+        results, _, changed_states, _ = process_election_results_csv_incrementally(
+            processor(2014), results_file(votes_dem_la='120'), previous=snapshot)
+
+        self.assertEqual(changed_states, ['LA'])
+        self.assertIs(results.state_results['AL'], snapshot['AL']['state_results'])
+        self.assertEqual(results.state_results['LA'].votes_total_dem, 120)
+        self.assertSameResults(results, processor(2014).process_election_results_csv(results_file(votes_dem_la='120')))
+
+    def test_leaves_out_states_removed_from_the_file(self):
+        _, snapshot, _, _ = process_election_results_csv_incrementally(processor(2014), results_file())
+        results, snapshot, changed_states, removed_states = process_election_results_csv_incrementally(
+            processor(2014), results_file()[:-4], previous=snapshot)
+
+        self.assertEqual(removed_states, ['LA'])
+        self.assertEqual(sorted(snapshot.keys()), ['AK', 'AL'])
+        self.assertNotIn('LA', changed_states)
+        self.assertSameResults(results, processor(2014).process_election_results_csv(results_file()[:-4]))
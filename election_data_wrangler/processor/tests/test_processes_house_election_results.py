@@ -136,3 +136,80 @@ class TestHouseElectionsProcessor(unittest.TestCase):
                 self.assertGreaterEqual(len(districts), 1)
                 for district_results in districts:
                     self.assertIsInstance(district_results, DistrictElectionResults)
+
+    def test_iter_election_results_csv_yields_results_as_they_close(self):
+        def row(state, district, party, votes, label=''):
+            return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+        rows = [
+            row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES'),
+            row('AL', '01', 'R', '100'),
+            row('AL', '01', 'D', '60'),
+            row('AL', '01', '', '160', label='District Votes:'),
+            row('AL', '02', 'R', '80'),
+            row('AL', '02', 'D', '90'),
+            row('AL', '02', '', '170', label='District Votes:'),
+            row('AL', '', '', '', label='Party Votes:'),
+            row('AK', '00', 'R', '50'),
+            row('AK', '00', 'D', '40'),
+            row('AK', '00', '', '90', label='District Votes:'),
+            row('AK', '', '', '', label='Party Votes:')
+        ]
+        rows_read = []
+
+        def reader():
+            for i, r in enumerate(rows):
+                rows_read.append(i)
+                yield r
+
+        results = self.proc.iter_election_results_csv(reader())
+
+        al_1 = next(results)
+        self.assertIsInstance(al_1, DistrictElectionResults)
+        self.assertEqual((al_1.state, al_1.district), ('AL', '1'))
+        self.assertEqual(len(rows_read), 5)
+
+        al_2 = next(results)
+        self.assertEqual((al_2.state, al_2.district), ('AL', '2'))
+
+        al = next(results)
+        self.assertIsInstance(al, StateElectionResults)
+        self.assertEqual(al.state, 'AL')
+        self.assertEqual(al.votes_total, 330)
+        self.assertEqual(len(rows_read), 9)
+
+        remaining = list(results)
+        self.assertEqual([type(r) for r in remaining], [DistrictElectionResults, StateElectionResults])
+        self.assertEqual(remaining[1].state, 'AK')
+        self.assertEqual(self.proc.state_results, {})
+
+    def test_aggregates_districts_of_unordered_rows(self):
+        def row(state, district, party, votes, label=''):
+            return [state, district, '', 'foo', 'bar', label, party, votes, '', '', '', '', '', '']
+
+        header = row('STATE ABBREVIATION', 'D', 'PARTY', 'GENERAL VOTES')
+        rows = [
+            row('AL', '01', 'R', '100'),
+            row('AL', '01', 'D', '60'),
+            row('AL', '01', '', '160', label='District Votes:'),
+            row('AL', '02', 'R', '80'),
+            row('AL', '02', 'D', '90'),
+            row('AL', '02', '', '170', label='District Votes:'),
+            row('AK', '00', 'R', '50'),
+            row('AK', '00', 'D', '40'),
+            row('AK', '00', '', '90', label='District Votes:')
+        ]
+        expected = self.proc.process_election_results_csv([header] + rows + [row('AK', '', '', '', label='Party Votes:')])
+
+        # AL 02 is split by rows of other districts
+        unordered_rows = [rows[4], rows[6], rows[0], rows[8], rows[3], rows[2], rows[7], rows[1], rows[5]]
+        results = processor(2014, unordered_input=True).process_election_results_csv([header] + unordered_rows)
+
+        self.assertEqual(sorted(results.state_results.keys()), ['AK', 'AL'])
+        self.assertEqual(results.votes_total_dem, expected.votes_total_dem)
+        self.assertEqual(results.votes_wasted_net, expected.votes_wasted_net)
+
+        al = results.state_results['AL']
+        self.assertEqual([d.district for d in al.districts_won_rep + al.districts_won_dem], ['1', '2'])
+        self.assertEqual(al.efficiency_gap, expected.state_results['AL'].efficiency_gap)
+        self.assertEqual(al.districts_won_dem[0].votes_total, 170)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stateelectionresult',
+            name='mean_median',
+            field=models.DecimalField(decimal_places=3, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='stateelectionresult',
+            name='partisan_bias',
+            field=models.DecimalField(decimal_places=3, max_digits=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='stateelectionresult',
+            name='declination',
+            field=models.DecimalField(decimal_places=3, max_digits=4, null=True),
+        ),
+    ]
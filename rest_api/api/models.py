@@ -36,6 +36,9 @@ class StateElectionResult(models.Model):
     votes_wasted_rep = models.PositiveIntegerField()
     votes_wasted_net = models.PositiveIntegerField()
     efficiency_gap = models.DecimalField(max_digits=4, decimal_places=3)
+    mean_median = models.DecimalField(max_digits=4, decimal_places=3, null=True)
+    partisan_bias = models.DecimalField(max_digits=4, decimal_places=3, null=True)
+    declination = models.DecimalField(max_digits=4, decimal_places=3, null=True)
 
 class DistrictElectionResult(models.Model):
 